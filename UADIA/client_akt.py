@@ -1,5 +1,6 @@
 from akash.client import AkashClient
 from akash.wallet import AkashWallet
+from sec.uadia_rpc_pool import AKASH_RPC_NODES, RpcEndpointPool
 
 # 1. Создание или восстановление кошелька
 wallet = AkashWallet.generate()  # Новый кошелек
@@ -7,10 +8,13 @@ wallet = AkashWallet.generate()  # Новый кошелек
 
 print(f"Адрес: {wallet.address}")
 
-# 2. Подключение к сети
-client = AkashClient("https://rpc.akashnet.net:443")
-if client.health_check():
-    print("✅ Подключено к Akash mainnet")
+# 2. Подключение к сети: опрашиваем все ноды и берем самую здоровую
+pool = RpcEndpointPool.from_urls(AKASH_RPC_NODES, AkashClient)
+health = pool.probe("health_check")
+best_node = pool.best_endpoint()
+client = pool.clients[best_node]
+if health[best_node]:
+    print(f"✅ Подключено к Akash mainnet через {best_node}")
 
 # 3. Проверка баланса
 balance = client.bank.get_balance(wallet.address, "uakt")  # Баланс в микро-единицах
@@ -1,33 +1,37 @@
-import hvac
+from uadia_vault import UadiaVault
 
-# 1. Подключение к серверу Vault
-client = hvac.Client(
+# 1. Подключение к серверу Vault (один пул соединений и кэш на весь агент)
+vault = UadiaVault(
     url='http://127.0.0.1:8200',  # Или ваш адрес продакшн-сервера
-    token='ваш-токен'  # Используйте AppRole или другой метод для продакшена
+    token='ваш-токен',  # Используйте AppRole или другой метод для продакшена
+    cache_ttl=30.0
 )
+# Токен и аренды динамических секретов продлеваются в фоне
+vault.start_renewal()
 
 # 2. Запись секрета (используется движок KV v2)
 secret_data = {
     'telegram_token': '123456:ABC...',
     'akash_mnemonic': 'слово1 слово2 ...'
 }
-create_response = client.secrets.kv.v2.create_or_update_secret(
-    path='uaia/agents/architect',
-    secret=secret_data,
-)
-print(f"✅ Секрет записан. Версия: {create_response['version']}")
+version = vault.write('uaia/agents/architect', secret_data)
+print(f"✅ Секрет записан. Версия: {version}")
 
-# 3. Чтение секрета
-read_response = client.secrets.kv.v2.read_secret_version(
-    path='uaia/agents/architect'
-)
-retrieved_secret = read_response['data']['data']
+# 3. Чтение секрета: повторные чтения идут из кэша, а после TTL
+# сверяется только номер версии
+retrieved_secret = vault.read('uaia/agents/architect')
 print(f"✅ Токен Telegram: {retrieved_secret['telegram_token']}")
 
+# Секреты нескольких агентов - одним параллельным пакетом
+fleet = vault.read_many(['uaia/agents/architect', 'uaia/agents/infra', 'uaia/agents/security'])
+
 # 4. Работа с динамическими секретами (например, для БД)
-# database_creds = client.secrets.database.generate_credentials(
+# database_creds = vault.client.secrets.database.generate_credentials(
 #     name='uaia-postgres-role'
 # )
+# vault.register_lease(database_creds['lease_id'], database_creds['lease_duration'])
+
+vault.close()
 
 # Для продакшена настоятельно рекомендуется заменить простой токен на более безопасные методы аутентификации, такие как AppRole.
 # https://developer.hashicorp.com/vault/docs/get-started/developer-qs
@@ -1,5 +1,12 @@
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
 import requests
-from typing import List, Dict
+
+from uadia_metrics import METRICS
 
 class SimpleUaiaSecretFinder:
     """Упрощенный поиск через API блок-эксплорера."""
@@ -22,10 +29,14 @@ class SimpleUaiaSecretFinder:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            with METRICS.timer("rpc_page", method="explorer"):
+                response = requests.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                txs = response.json()
+            METRICS.inc("txs_scanned", len(txs))
+            return txs
         except Exception as e:
+            METRICS.inc("rpc_errors", method="explorer")
             print(f"❌ Ошибка API: {e}")
             return []
     
@@ -51,27 +62,251 @@ class SimpleUaiaSecretFinder:
             
             # Фильтруем self-транзакции
             for tx in txs:
-                if (tx.get("from_address") == wallet_address and 
-                    tx.get("to_address") == wallet_address):
-                    
-                    # Проверяем, что это банковский перевод
-                    if tx.get("type") == "cosmos-sdk/MsgSend":
-                        all_txs.append({
-                            "hash": tx["tx_hash"],
-                            "height": tx["height"],
-                            "amount": tx.get("amount", {}).get("amount", "0"),
-                            "memo": tx.get("memo", ""),
-                            "timestamp": tx.get("timestamp")
-                        })
+                self_tx = extract_self_transfer(tx, wallet_address)
+                if self_tx:
+                    all_txs.append(self_tx)
             
             offset += limit
             
             if len(txs) < limit:
                 break
         
+        METRICS.inc("self_transfers", len(all_txs))
         print(f"✅ Простой поиск: найдено {len(all_txs)} self-транзакций")
         return all_txs
 
+def extract_self_transfer(tx: Dict, wallet_address: str) -> Optional[Dict]:
+    """Возвращает self-транзакцию в формате УАДИА или None."""
+    if (tx.get("from_address") != wallet_address or
+            tx.get("to_address") != wallet_address):
+        return None
+    
+    # Проверяем, что это банковский перевод
+    if tx.get("type") != "cosmos-sdk/MsgSend":
+        return None
+    
+    return {
+        "hash": tx["tx_hash"],
+        "height": tx["height"],
+        "amount": tx.get("amount", {}).get("amount", "0"),
+        "memo": tx.get("memo", ""),
+        "timestamp": tx.get("timestamp")
+    }
+
+
+class MintscanAPIError(Exception):
+    """Ошибка API, которую не удалось исправить повторами (не конец данных)."""
+    
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов "ведро токенов".
+    
+    Args:
+        rate: Скорость пополнения (запросов в секунду)
+        capacity: Размер ведра (допустимый всплеск)
+    """
+    
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncUaiaSecretFinder:
+    """
+    Асинхронный поиск self-транзакций через API блок-эксплорера.
+    
+    Одна keep-alive сессия на все запросы, курсорная пагинация (searchAfter
+    из ответа или, для списочных ответов, граница по высоте со смещением
+    внутри высоты), ограничение
+    частоты и повторы с экспоненциальной паузой на 429/5xx. Ошибка после
+    исчерпания повторов поднимается как MintscanAPIError и не путается
+    с концом истории.
+    
+    Example:
+        >>> async with AsyncUaiaSecretFinder() as finder:
+        ...     txs = await finder.find_self_transfers("akash1...")
+    """
+    
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    def __init__(
+        self,
+        api_base: str = "https://api.mintscan.io/v1/akash",
+        rate_limit: float = 5.0,
+        burst: int = 5,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 30.0,
+        connections: int = 4
+    ):
+        self.api_base = api_base
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.connections = connections
+        self._bucket = TokenBucket(rate_limit, burst)
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.connections, keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+    
+    async def _get_json(self, url: str, params: Dict):
+        """GET с ограничением частоты и повторами; поднимает MintscanAPIError."""
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            retry_after = None
+            try:
+                with METRICS.timer("rpc_page", method="explorer"):
+                    async with session.get(url, params=params) as response:
+                        if response.status < 400:
+                            return await response.json(content_type=None)
+                        if response.status not in self.RETRY_STATUSES:
+                            raise MintscanAPIError(
+                                f"HTTP {response.status}: {(await response.text())[:200]}",
+                                response.status
+                            )
+                        error = MintscanAPIError(f"HTTP {response.status}", response.status)
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = MintscanAPIError(f"Сетевая ошибка: {e!r}")
+            METRICS.inc("rpc_errors", method="explorer")
+            
+            if attempt == self.max_retries:
+                raise error
+            
+            delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+            delay *= 0.5 + random.random() / 2
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            await asyncio.sleep(delay)
+    
+    async def iter_pages(
+        self,
+        wallet_address: str,
+        limit: int = 50
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Отдает страницы истории адреса от новых к старым до конца данных.
+        
+        Raises:
+            MintscanAPIError: API недоступен после всех повторов или отдал
+                страницу без новых транзакций
+        """
+        url = f"{self.api_base}/account/{wallet_address}/txs"
+        base = {"limit": limit, "order": "desc"}
+        params = dict(base)
+        seen = set()
+        # Без курсора позиция - граница по высоте (to_height) и число уже
+        # полученных транзакций этой высоты (offset внутри высоты)
+        bound, offset = None, 0
+        
+        while True:
+            data = await self._get_json(url, params)
+            
+            if isinstance(data, dict):
+                txs = data.get("transactions") or data.get("txs") or []
+                pagination = data.get("pagination") or {}
+                cursor = pagination.get("searchAfter") or pagination.get("search_after")
+            else:
+                txs, cursor = data or [], None
+            if not txs:
+                return
+            
+            fresh = [tx for tx in txs if tx.get("tx_hash") not in seen]
+            if not fresh:
+                # Повтор уже полученной страницы - продолжение потеряло бы
+                # часть истории или зациклилось
+                raise MintscanAPIError(f"Страница без новых транзакций, запрос {params}")
+            seen.update(tx.get("tx_hash") for tx in fresh)
+            yield fresh
+            
+            if cursor:
+                params = {**base, "search_after": cursor}
+                continue
+            if len(txs) < limit:
+                return
+            # Курсора нет - продолжаем с наименьшей высоты страницы, пропуская
+            # ее уже полученные транзакции: страница может целиком состоять
+            # из транзакций одной высоты
+            lowest = min(int(tx["height"]) for tx in txs)
+            at_lowest = sum(1 for tx in txs if int(tx["height"]) == lowest)
+            offset = offset + at_lowest if lowest == bound else at_lowest
+            bound = lowest
+            params = {**base, "to_height": bound, "offset": offset}
+    
+    async def find_self_transfers(
+        self,
+        wallet_address: str,
+        max_txs: Optional[int] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        Ищет self-транзакции во всей истории адреса.
+        
+        Args:
+            wallet_address: Адрес кошелька УАДИА
+            max_txs: Остановиться после стольких self-транзакций (None = без лимита)
+            limit: Размер страницы
+        """
+        all_txs = []
+        async for page in self.iter_pages(wallet_address, limit):
+            for tx in page:
+                self_tx = extract_self_transfer(tx, wallet_address)
+                if self_tx:
+                    all_txs.append(self_tx)
+            if max_txs is not None and len(all_txs) >= max_txs:
+                all_txs = all_txs[:max_txs]
+                break
+        
+        print(f"✅ Асинхронный поиск: найдено {len(all_txs)} self-транзакций")
+        return all_txs
+
 # Использование
-simple_finder = SimpleUaiaSecretFinder()
-self_txs = simple_finder.find_self_transfers_simple("akash1ваш_адрес")
+if __name__ == "__main__":
+    simple_finder = SimpleUaiaSecretFinder()
+    self_txs = simple_finder.find_self_transfers_simple("akash1ваш_адрес")
@@ -1,34 +1,226 @@
-import pickle
+import json
 import os
+import tempfile
+from typing import Dict, List, Optional
+
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_memo import MemoDecoder
+from uadia_tx_log import (
+    legacy_transaction_log_path,
+    open_transaction_log,
+    read_transaction_records,
+    transaction_log_path,
+)
 
 class UaiaSecretManager:
-    def __init__(self, wallet_address, encryption_key):
+    def __init__(
+        self,
+        wallet_address,
+        encryption_key,
+        checkpoint_path: str = "uaia_checkpoint.json",
+        chain_manager: Optional[UadiaBlockchainSecretManager] = None,
+        log_path: Optional[str] = None
+    ):
         self.address = wallet_address
         self.key = encryption_key
+        self.checkpoint_path = checkpoint_path
+        self.chain_manager = chain_manager
+        # None - журнал агента по умолчанию вместе со старым CSV-логом
+        self.log_path = log_path
+        # До какого байта журнала обработаны записи без имени сервиса
+        self.log_offset = 0
+
+        # Актуальные секреты в памяти: {service: запись секрета}
+        self.secrets: Dict[str, Dict] = {}
+        # Зашифрованные memo актуальных секретов - сохраняются в checkpoint,
+        # чтобы теплый старт не перечитывал историю
+        self._memos: Dict[str, Dict] = {}
+
         self.last_scanned_block = self.load_checkpoint()
-        
+
     def load_checkpoint(self) -> int:
-        """Загружаем номер последнего проверенного блока."""
-        if os.path.exists("uaia_checkpoint.pkl"):
-            with open("uaia_checkpoint.pkl", "rb") as f:
-                return pickle.load(f)
-        return 0  # Начинаем с начала
-    
+        """Загружаем номер последнего проверенного блока и известные секреты."""
+        if not os.path.exists(self.checkpoint_path):
+            return 0  # Начинаем с начала
+
+        with open(self.checkpoint_path, "r") as f:
+            checkpoint = json.load(f)
+
+        if checkpoint.get("address") != self.address:
+            print("⚠️ Checkpoint принадлежит другому кошельку, начинаем с начала")
+            return 0
+
+        # Расшифровываем только последние версии секретов - O(сервисов)
+        decoder = MemoDecoder(self.key)
+        for service, ref in checkpoint.get("secrets", {}).items():
+            try:
+                self._merge_secret(ref, decoder.decode(ref["memo"]))
+            except Exception as e:
+                print(f"⚠️ Не удалось расшифровать секрет '{service}' из checkpoint: {e}")
+                self.secrets.clear()
+                self._memos.clear()
+                return 0
+
+        self.log_offset = int(checkpoint.get("log_offset", 0))
+        return int(checkpoint.get("last_scanned_block", 0))
+
     def save_checkpoint(self, block_height: int):
-        """Сохраняем прогресс сканирования."""
-        with open("uaia_checkpoint.pkl", "wb") as f:
-            pickle.dump(block_height, f)
-    
-    def scan_new_transactions(self, rpc_url: str) -> List[Dict]:
-        """Сканирует только новые транзакции с последнего блока."""
-        # Реализация с пагинацией и обновлением checkpoint
-        # Возвращает новые секреты
-        pass
-    
-    def restore_all_secrets(self) -> Dict[str, any]:
+        """
+        Сохраняем прогресс сканирования атомарно: пишем во временный файл
+        рядом с checkpoint и переименовываем его поверх старого.
+        """
+        checkpoint = {
+            "address": self.address,
+            "last_scanned_block": block_height,
+            "log_offset": self.log_offset,
+            "secrets": self._memos,
+        }
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".uaia_checkpoint.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(checkpoint, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.checkpoint_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.last_scanned_block = block_height
+
+    def scan_new_transactions(
+        self,
+        rpc_url: str,
+        from_height: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Сканирует только новые транзакции с последнего блока.
+        Расшифровывает только новые memo, объединяет их с секретами в памяти
+        и сдвигает checkpoint. Возвращает новые секреты.
+
+        Args:
+            rpc_url: RPC-нода Akash
+            from_height: Первый блок сканирования (None = last_scanned_block + 1)
+        """
+        manager = self._get_chain_manager(rpc_url)
+        if from_height is None:
+            from_height = self.last_scanned_block + 1
+
+        transactions, next_height = manager.scan_new_blocks(self.address, from_height)
+        new_secrets = self._merge_transactions(transactions)
+
+        if next_height - 1 > self.last_scanned_block:
+            self.save_checkpoint(next_height - 1)
+
+        print(f"🆕 Новых секретов: {len(new_secrets)}, checkpoint: {self.last_scanned_block}")
+        return new_secrets
+
+    def restore_from_log(self, rpc_url: str) -> int:
+        """
+        Быстрая проверка: получает по хэшу только транзакции из локального
+        журнала, которые еще не обработаны, и расшифровывает их.
+
+        Последние версии секретов берутся из индекса журнала - без чтения
+        журнала целиком. Записи без имени сервиса индекс не хранит: они
+        дочитываются из хвоста журнала после log_offset (байтовое смещение),
+        а старый CSV-лог, который больше не пополняется, - только при
+        холодном старте.
+
+        Returns:
+            Наибольшая высота среди транзакций из журнала; 0, если новых нет
+            или часть хэшей не удалось получить из-за ошибки RPC
+        """
+        hashes = []
+        if self.log_path is None and not self.last_scanned_block:
+            legacy_path = legacy_transaction_log_path(self.address)
+            for entry in read_transaction_records(self.address, legacy_path):
+                hashes.append(entry["tx"])
+
+        log_end = self.log_offset
+        log_path = self.log_path or transaction_log_path(self.address)
+        if os.path.exists(log_path):
+            log = open_transaction_log(self.address, log_path)
+            tail, log_end = log.records_from(self.log_offset)
+            for entry in tail:
+                if not entry.get("secret"):
+                    hashes.extend(entry.get("chunks") or [entry["tx"]])
+            # Для секрета нужна только последняя версия, и только если она
+            # новее уже известной
+            for service, entry in log.latest_all().items():
+                known = self.secrets.get(service)
+                if known is None or entry.get("height") is None or entry["height"] > known["block"]:
+                    # У секрета из нескольких транзакций загружаются все чанки
+                    hashes.extend(entry.get("chunks") or [entry["tx"]])
+
+        transactions = []
+        failed = []
+        if hashes:
+            manager = self._get_chain_manager(rpc_url)
+            transactions, failed = manager.lookup_transactions_by_hash(self.address, hashes)
+            new_secrets = self._merge_transactions(transactions)
+            print(f"📒 Из журнала восстановлено секретов: {len(new_secrets)}")
+
+        # Хэши, которых нет в сети, пропускаются навсегда. Недоступные из-за
+        # ошибки RPC транзакции найдет сканирование событий, поэтому высоту
+        # журнала не отдаем и хвост журнала перечитаем при следующем запуске
+        if failed:
+            return 0
+        self.log_offset = log_end
+        return max((tx["height"] for tx in transactions), default=0)
+
+    def restore_all_secrets(self, rpc_url: str = "https://rpc.akashnet.net:443") -> Dict[str, any]:
         """Основной метод восстановления всех секретов при старте агента."""
         print("Восстановление секретов из блокчейна...")
         # 1. Сначала быстрая проверка по локальному логу tx_hash
-        # 2. Затем сканирование новых блоков
+        last_logged_height = self.restore_from_log(rpc_url)
+        # 2. Затем сканирование новых блоков. Блоки до последней записи лога
+        # пропускаются, только если ниже них все покрыто сохраненным
+        # checkpoint: лог хранит лишь записи этого агента, и при холодном
+        # старте по нему нельзя судить о полноте истории
+        from_height = self.last_scanned_block + 1
+        if self.last_scanned_block and last_logged_height > self.last_scanned_block:
+            from_height = last_logged_height + 1
+        self.scan_new_transactions(rpc_url, from_height=from_height)
         # 3. Объединение результатов
-        return decrypted_secrets
+        return {service: secret["data"] for service, secret in self.secrets.items()}
+
+    def _get_chain_manager(self, rpc_url: str) -> UadiaBlockchainSecretManager:
+        if self.chain_manager is None:
+            self.chain_manager = UadiaBlockchainSecretManager(rpc_url=rpc_url)
+        return self.chain_manager
+
+    def _merge_transactions(self, transactions: List[Dict]) -> List[Dict]:
+        """Расшифровывает транзакции и объединяет секреты с картой в памяти."""
+        # Старые версии сервисов не расшифровываются - в карте нужна только последняя
+        new_secrets = self.chain_manager.decrypt_transactions(
+            transactions, self.key, latest_only=True
+        )
+
+        memos = {tx["hash"]: tx["memo"] for tx in transactions}
+        for secret in new_secrets:
+            self._merge_secret(
+                {
+                    "tx_hash": secret["tx_hash"],
+                    "block": secret["block"],
+                    "amount_code": secret["amount_code"],
+                    # У чанкованных секретов memo собрано из нескольких транзакций
+                    "memo": secret.get("memo", memos.get(secret["tx_hash"])),
+                },
+                secret["data"],
+            )
+        return new_secrets
+
+    def _merge_secret(self, ref: Dict, secret_data: Dict):
+        """Добавляет секрет в карту, если он новее уже известной версии."""
+        service = secret_data.get("service", "unknown")
+        current = self.secrets.get(service)
+        if current is not None and current["block"] >= ref["block"]:
+            return
+        self.secrets[service] = {
+            "tx_hash": ref["tx_hash"],
+            "block": ref["block"],
+            "amount_code": ref["amount_code"],
+            "data": secret_data,
+            "service": service,
+        }
+        self._memos[service] = ref
@@ -0,0 +1,75 @@
+"""
+Бенчмарк: последовательная и конвейерная запись секретов.
+
+Последовательная запись повторяет write_secret_to_blockchain: запрос
+аккаунта, отправка и ожидание блока для каждого секрета. Конвейерная -
+BatchSecretWriter.write_many для всей пачки.
+
+Запуск (из папки sec):
+    python bench_batch_write.py --secrets 50 --block-time 1.0
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from cosmpy.aerial.wallet import LocalWallet
+from cryptography.fernet import Fernet
+
+from fake_chain import FakeSigningLedger
+from uadia_batch_writer import BatchSecretWriter
+from uadia_memo import encode_memo
+from uadia_tx_log import read_transaction_log
+
+
+def run(writer: BatchSecretWriter, payloads, batched: bool):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if batched:
+            hashes = writer.write_many(payloads)
+        else:
+            hashes = [writer.write_many([payload])[0] for payload in payloads]
+    return hashes, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--secrets", type=int, default=50, help="число секретов")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка RPC, сек")
+    parser.add_argument("--block-time", type=float, default=1.0, help="время блока, сек")
+    args = parser.parse_args()
+
+    key = Fernet.generate_key()
+    payloads = [
+        (encode_memo({"service": f"agent_{i}", "token": os.urandom(16).hex()}, key), 1000 + i)
+        for i in range(args.secrets)
+    ]
+    wallet = LocalWallet.generate()
+
+    # Лог транзакций пишется в текущую папку - уходим во временную
+    os.chdir(tempfile.mkdtemp(prefix="uaia_bench_"))
+    results = {}
+    for name, batched in (("последовательно", False), ("конвейер", True)):
+        ledger = FakeSigningLedger(latency=args.latency, block_time=args.block_time)
+        writer = BatchSecretWriter(ledger, wallet)
+        hashes, elapsed = run(writer, payloads, batched)
+        assert all(hashes), "не все секреты записаны"
+        assert ledger.rejected == 0, "sequence mismatch"
+        results[name] = (hashes, elapsed, ledger.calls)
+
+    log = read_transaction_log(str(wallet.address()))
+    expected = [(h, amount) for name in results for h, (_, amount) in zip(results[name][0], payloads)]
+    assert log == expected, "лог транзакций не совпадает с порядком записи"
+
+    print(f"секретов: {args.secrets}, задержка RPC: {args.latency} с, блок: {args.block_time} с")
+    for name, (_, elapsed, calls) in results.items():
+        print(f"  {name:>16}: {elapsed:7.2f} с, RPC-запросов: {calls}, "
+              f"{args.secrets / elapsed:6.1f} секретов/с")
+    serial, batched = results["последовательно"][1], results["конвейер"][1]
+    print(f"  ускорение: x{serial / batched:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Бенчмарк: восстановление флота агентов по одному и одним проходом.
+
+По одному - отдельный UadiaBlockchainSecretManager на каждого агента,
+агенты восстанавливаются друг за другом. Флот - FleetRestorer с общим
+менеджером, одной сеткой окон и общим пулом потоков.
+
+Запуск (из папки sec):
+    python bench_fleet.py --txs 300 --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from cryptography.fernet import Fernet
+
+from fake_chain import FakeLedgerClient, make_history
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_fleet import FleetRestorer
+from uadia_memo import encode_memo
+
+AGENTS = ["architect", "infra", "security", "deploy", "monitor"]
+START_HEIGHT = 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--txs", type=int, default=300, help="транзакций на кошелек")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка RPC, сек")
+    parser.add_argument("--window", type=int, default=2_000, help="размер окна, блоков")
+    args = parser.parse_args()
+
+    wallets = [(f"akash1{agent}", Fernet.generate_key()) for agent in AGENTS]
+    history = []
+    for offset, (address, key) in enumerate(wallets):
+        # Транзакции агентов чередуются по высоте, как в реальной сети
+        for tx in make_history(
+            address, args.txs, START_HEIGHT,
+            memo_factory=lambda i, key=key: encode_memo({"service": f"svc_{i % 7}", "v": i}, key)
+        ):
+            tx.height = START_HEIGHT + (tx.height - START_HEIGHT) * len(wallets) + offset
+            history.append(tx)
+
+    def new_manager(client):
+        return UadiaBlockchainSecretManager(
+            client=client, cache_path=None, max_workers=16, window_size=args.window
+        )
+
+    client = FakeLedgerClient(history, latency=args.latency)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        single = {
+            address: new_manager(client).extract_and_decrypt_secrets(
+                address, key, start_height=START_HEIGHT, latest_only=True
+            )
+            for address, key in wallets
+        }
+    single_time, single_calls = time.perf_counter() - started, client.calls
+
+    client = FakeLedgerClient(history, latency=args.latency)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fleet = FleetRestorer(new_manager(client)).restore(wallets, start_height=START_HEIGHT)
+    fleet_time, fleet_calls = time.perf_counter() - started, client.calls
+
+    assert single == fleet, "флот расходится с восстановлением по одному"
+
+    print(f"агентов: {len(wallets)}, транзакций на кошелек: {args.txs}, задержка RPC: {args.latency} с")
+    print(f"  по одному: {single_time:6.2f} с, RPC-запросов: {single_calls}")
+    print(f"  флот:      {fleet_time:6.2f} с, RPC-запросов: {fleet_calls}")
+    print(f"  ускорение: x{single_time / fleet_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Бенчмарк: повторное получение ключа через derive_key_from_seed.
+
+Запуск (из папки sec):
+    python bench_kdf.py --calls 10
+"""
+import argparse
+import time
+
+from uadia_kdf import clear_kdf_cache, derive_key_from_seed, kdf_cache_info
+
+SEED = "word " * 23 + "word"
+SALT = b"uaia_salt_"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10, help="число вызовов")
+    args = parser.parse_args()
+
+    clear_kdf_cache()
+    started = time.perf_counter()
+    keys = {derive_key_from_seed(SEED, SALT) for _ in range(args.calls)}
+    elapsed = time.perf_counter() - started
+    info = kdf_cache_info()
+
+    assert len(keys) == 1, "кэш вернул разные ключи"
+    assert info["misses"] == 1, f"PBKDF2 запускался {info['misses']} раз"
+
+    print(f"Вызовов: {args.calls}, запусков PBKDF2: {info['misses']}, попаданий: {info['hits']}")
+    print(f"  общее время: {elapsed * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
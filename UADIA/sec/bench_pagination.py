@@ -0,0 +1,48 @@
+"""
+Бенчмарк: последовательная и параллельная пагинация find_self_transfers.
+
+Запуск (из папки sec):
+    python bench_pagination.py --txs 500 --latency 0.2
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from fake_chain import FakeLedgerClient, make_history
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+
+WALLET = "akash1benchwallet000000000000000000000000000"
+
+
+def run(manager: UadiaBlockchainSecretManager, concurrent: bool, max_pages: int):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        txs = manager.find_self_transfers(WALLET, max_pages=max_pages, concurrent=concurrent)
+    return txs, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--txs", type=int, default=500, help="размер истории")
+    parser.add_argument("--latency", type=float, default=0.2, help="задержка RPC, сек")
+    parser.add_argument("--workers", type=int, default=8, help="размер пула")
+    args = parser.parse_args()
+
+    max_pages = args.txs // 50 + 1
+    client = FakeLedgerClient(make_history(WALLET, args.txs), latency=args.latency)
+    manager = UadiaBlockchainSecretManager(client=client, max_workers=args.workers)
+
+    serial, serial_time = run(manager, concurrent=False, max_pages=max_pages)
+    parallel, parallel_time = run(manager, concurrent=True, max_pages=max_pages)
+
+    assert serial == parallel, "параллельный обход расходится с последовательным"
+
+    print(f"Транзакций: {len(serial)}, задержка RPC: {args.latency * 1000:.0f} мс")
+    print(f"  последовательно: {serial_time:.3f} с")
+    print(f"  параллельно ({args.workers} потоков): {parallel_time:.3f} с")
+    print(f"  ускорение: x{serial_time / parallel_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Бенчмарк: память и время разбора истории self-транзакций.
+
+Сравнивает прежний разбор (словарь на транзакцию) с SelfTransfer
+(__slots__) на синтетической истории. Память измеряется tracemalloc:
+сколько байт удерживает список разобранных записей и пик во время разбора.
+
+Запуск (из папки sec):
+    python bench_parse_memory.py --txs 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from cryptography.fernet import Fernet
+
+from fake_chain import make_noisy_history
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_metrics import set_quiet
+
+WALLET = "akash1benchwallet"
+
+
+def parse_as_dict(tx_response, wallet_address: str):
+    """Прежний _parse_transaction: новый словарь на каждую транзакцию."""
+    msg = tx_response.tx.body.messages[0]
+    if msg.type_url != "/cosmos.bank.v1beta1.MsgSend":
+        return None
+    if msg.from_address != wallet_address or msg.to_address != wallet_address:
+        return None
+    return {
+        "hash": tx_response.hash,
+        "height": tx_response.height,
+        "amount": msg.amount[0].amount if msg.amount else "0",
+        "memo": tx_response.tx.body.memo or "",
+        "from": msg.from_address,
+        "to": msg.to_address,
+        "timestamp": getattr(tx_response, "timestamp", None)
+    }
+
+
+def measure(parse, history):
+    """Возвращает (записи, удерживаемые байты, пиковые байты, секунды)."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = [record for record in (parse(tx, WALLET) for tx in history) if record]
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, retained, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--txs", type=int, default=100_000, help="размер истории")
+    parser.add_argument("--noise", type=float, default=0.9, help="доля шумовых транзакций")
+    args = parser.parse_args()
+
+    set_quiet(True)
+    key = Fernet.generate_key()
+    print(f"Генерируем историю из {args.txs} транзакций...")
+    history = make_noisy_history(WALLET, args.txs, key, args.noise)
+    manager = UadiaBlockchainSecretManager(client=object(), cache_path=None)
+
+    print(f"{'разбор':>12} {'записей':>9} {'удержано, МБ':>13} {'пик, МБ':>9} {'разбор, с':>10} {'расшифровка, с':>15}")
+    for name, parse in (("dict", parse_as_dict), ("SelfTransfer", manager._parse_transaction)):
+        records, retained, peak, elapsed = measure(parse, history)
+        started = time.perf_counter()
+        secrets = manager.decrypt_transactions(records, key)
+        decrypt_time = time.perf_counter() - started
+        print(
+            f"{name:>12} {len(records):>9} {retained / 2**20:>13.2f} {peak / 2**20:>9.2f} "
+            f"{elapsed:>10.3f} {decrypt_time:>15.3f}   ({len(secrets)} секретов)"
+        )
+        del records, secrets
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Бенчмарк: загрузка секретов кошелька с длинной историей ротаций.
+
+Сравнивает полную расшифровку истории, latest_only (старые версии с
+тегом сервиса пропускаются без расшифровки) и services (обход страниц
+от новых к старым с остановкой, когда найдены все сервисы).
+
+Запуск (из папки sec):
+    python bench_rotation.py --services 5 --rotations 200 --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from cryptography.fernet import Fernet
+
+from fake_chain import FakeLedgerClient, make_history
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_memo import encode_memo
+
+WALLET = "akash1benchwallet000000000000000000000000000"
+
+
+def run(manager, key, **kwargs):
+    manager.client.calls = 0
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        secrets = manager.extract_and_decrypt_secrets(WALLET, key, max_pages=10_000, **kwargs)
+    return secrets, time.perf_counter() - started, manager.client.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=5, help="число сервисов")
+    parser.add_argument("--rotations", type=int, default=200, help="ротаций на сервис")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка RPC, сек")
+    args = parser.parse_args()
+
+    key = Fernet.generate_key()
+    names = [f"svc_{i}" for i in range(args.services)]
+    history = make_history(
+        WALLET,
+        args.services * args.rotations,
+        memo_factory=lambda i: encode_memo(
+            {"service": names[i % args.services], "token": f"v{i // args.services}"}, key
+        )
+    )
+    client = FakeLedgerClient(history, latency=args.latency)
+    manager = UadiaBlockchainSecretManager(client=client, cache_path=None)
+
+    full, full_time, full_calls = run(manager, key)
+    latest, latest_time, latest_calls = run(manager, key, latest_only=True)
+    wanted, wanted_time, wanted_calls = run(manager, key, services=names)
+
+    expected = {s["service"]: s["data"] for s in full if s["block"] >= history[-args.services].height}
+    assert {s["service"]: s["data"] for s in latest} == expected
+    assert {s["service"]: s["data"] for s in wanted} == expected
+
+    print(f"сервисов: {args.services}, ротаций: {args.rotations}, задержка RPC: {args.latency} с")
+    print(f"{'режим':>12} {'секретов':>9} {'RPC':>5} {'время, с':>9}")
+    for name, secrets, elapsed, calls in (
+        ("вся история", full, full_time, full_calls),
+        ("latest_only", latest, latest_time, latest_calls),
+        ("services", wanted, wanted_time, wanted_calls),
+    ):
+        print(f"{name:>12} {len(secrets):>9} {calls:>5} {elapsed:>9.2f}")
+    print(f"  ускорение services: x{full_time / wanted_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Бенчмарк: пропускная способность split/recover схемы Шамира над GF(256).
+
+Запуск (из папки sec):
+    python bench_shamir.py --k 3 --n 5
+"""
+import argparse
+import os
+import time
+
+from uadia_gf256 import combine_bytes, split_bytes
+
+SIZES = [32, 1024, 32 * 1024, 256 * 1024, 1024 * 1024]
+
+
+def measure(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=3, help="порог")
+    parser.add_argument("--n", type=int, default=5, help="число долей")
+    args = parser.parse_args()
+
+    print(f"Схема {args.k} из {args.n}")
+    print(f"{'размер':>10} {'split, мс':>12} {'МБ/с':>8} {'recover, мс':>12} {'МБ/с':>8}")
+    for size in SIZES:
+        secret = os.urandom(size)
+        repeat = max(1, 2_000_000 // (size * args.n))
+
+        shares = split_bytes(secret, args.k, args.n)
+        assert combine_bytes(shares[:args.k]) == secret
+
+        split_time = measure(lambda: split_bytes(secret, args.k, args.n), repeat)
+        recover_time = measure(lambda: combine_bytes(shares[:args.k]), repeat)
+        mb = size / (1024 * 1024)
+        print(
+            f"{size:>10} {split_time * 1000:>12.3f} {mb / split_time:>8.1f} "
+            f"{recover_time * 1000:>12.3f} {mb / recover_time:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Набор бенчмарков конвейера секретов УАДИА на локальной имитации сети.
+
+Без обращений к rpc.akashnet.net и Mintscan: история генерируется
+(fake_chain.make_noisy_history), RPC отвечает FakeLedgerClient, LCD и
+API эксплорера - локальный FakeLcdServer. Результаты пишутся в JSON,
+чтобы сравнивать их между изменениями.
+
+Запуск (из папки sec):
+    python bench_suite.py --txs 2000 --noise 0.9 --latency 0.02 --output bench.json
+    python bench_suite.py --only kdf_cold,memo_decrypt
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from API_Mintscan import SimpleUaiaSecretFinder
+from fake_chain import FakeLcdServer, FakeLedgerClient, make_noisy_history
+from sss import UaiaShamirSecretManager
+from uadia_async_manager import AsyncUadiaBlockchainSecretManager
+from uadia_blockchain_secret_manager import PAGE_LIMIT, UadiaBlockchainSecretManager
+from uadia_kdf import clear_kdf_cache, derive_key_from_seed
+from uadia_memo import decode_memo, encode_memo
+from uadia_metrics import METRICS, set_quiet
+
+WALLET = "akash1benchwallet"
+SEED = "abandon " * 23 + "art"
+SALT = b"uaia-bench-salt"
+AGENTS = ["architect", "infra", "security", "deploy", "monitor"]
+
+
+def measure(fn: Callable, repeat: int) -> List[float]:
+    """Время каждого из repeat вызовов; вывод функции подавляется."""
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+@contextlib.contextmanager
+def scratch_directory():
+    """Временная рабочая папка (split_master_seed пишет файл метаданных в cwd)."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+def build_cases(args, key: bytes, history, server: FakeLcdServer) -> Dict[str, tuple]:
+    """{имя: (функция, число повторов, счетчик RPC-вызовов или None)}."""
+    pages = args.txs // PAGE_LIMIT + 1
+    ledger = FakeLedgerClient(history, latency=args.latency)
+    manager = UadiaBlockchainSecretManager(client=ledger, cache_path=None)
+    secret = {"service": "telegram", "token": "123456:ABC" * 4}
+    memo = encode_memo(secret, key)
+
+    shamir = UaiaShamirSecretManager(k=3, n=5)
+    with scratch_directory(), contextlib.redirect_stdout(io.StringIO()):
+        shares = shamir.split_master_seed(SEED, AGENTS)
+    quorum = dict(list(shares.items())[:3])
+
+    def kdf_cold():
+        clear_kdf_cache()
+        derive_key_from_seed(SEED, SALT)
+
+    def shamir_split():
+        with scratch_directory():
+            shamir.split_master_seed(SEED, AGENTS)
+
+    def mintscan():
+        SimpleUaiaSecretFinder(api_base=server.url).find_self_transfers_simple(
+            WALLET, max_txs=args.txs
+        )
+
+    def lcd_extract():
+        async def run():
+            async with AsyncUadiaBlockchainSecretManager(lcd_url=server.url) as lcd:
+                await lcd.extract_and_decrypt_secrets(WALLET, key, max_pages=pages)
+        asyncio.run(run())
+
+    services = [f"service-{i}" for i in range(args.services)]
+    return {
+        "kdf_cold": (kdf_cold, 3, None),
+        "kdf_cached": (lambda: derive_key_from_seed(SEED, SALT), 1000, None),
+        "memo_encrypt": (lambda: encode_memo(secret, key), 1000, None),
+        "memo_decrypt": (lambda: decode_memo(memo, key), 1000, None),
+        "shamir_split": (shamir_split, 200, None),
+        "shamir_recover": (lambda: shamir.recover_master_seed(quorum), 200, None),
+        "find_self_transfers": (
+            lambda: manager.find_self_transfers(WALLET, max_pages=pages), args.repeat, ledger
+        ),
+        "extract_all": (
+            lambda: manager.extract_and_decrypt_secrets(WALLET, key, max_pages=pages),
+            args.repeat, ledger
+        ),
+        "extract_latest": (
+            lambda: manager.extract_and_decrypt_secrets(
+                WALLET, key, services=services, max_pages=pages
+            ),
+            args.repeat, ledger
+        ),
+        "mintscan_finder": (mintscan, args.repeat, server),
+        "lcd_extract": (lcd_extract, args.repeat, server),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--txs", type=int, default=2000, help="размер истории")
+    parser.add_argument("--noise", type=float, default=0.9, help="доля шумовых транзакций")
+    parser.add_argument("--services", type=int, default=5, help="число сервисов")
+    parser.add_argument("--latency", type=float, default=0.02, help="задержка RPC/LCD, сек")
+    parser.add_argument("--repeat", type=int, default=3, help="повторов сетевых замеров")
+    parser.add_argument("--only", default="", help="список замеров через запятую")
+    parser.add_argument("--output", default="", help="файл JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    set_quiet(True)
+    key = derive_key_from_seed(SEED, SALT)
+    history = make_noisy_history(WALLET, args.txs, key, args.noise, args.services)
+    only = {name for name in args.only.split(",") if name}
+
+    results = []
+    with FakeLcdServer(history, latency=args.latency) as server:
+        cases = build_cases(args, key, history, server)
+        unknown = only - set(cases)
+        if unknown:
+            parser.error(f"неизвестные замеры: {', '.join(sorted(unknown))}")
+
+        for name, (fn, repeat, rpc) in cases.items():
+            if only and name not in only:
+                continue
+            calls_before = rpc.calls if rpc is not None else 0
+            timings = measure(fn, repeat)
+            result = {
+                "name": name,
+                "repeat": repeat,
+                "mean_s": statistics.mean(timings),
+                "median_s": statistics.median(timings),
+                "min_s": min(timings),
+                "max_s": max(timings),
+            }
+            if rpc is not None:
+                result["rpc_calls"] = (rpc.calls - calls_before) / repeat
+            results.append(result)
+            print(
+                f"{name:>20}: {result['median_s'] * 1000:10.3f} мс (медиана из {repeat})",
+                file=sys.stderr
+            )
+
+    report = {
+        "params": {
+            "txs": args.txs,
+            "noise": args.noise,
+            "services": args.services,
+            "latency": args.latency,
+            "repeat": args.repeat,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+        "metrics": METRICS.snapshot(),
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"💾 Результаты сохранены в {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
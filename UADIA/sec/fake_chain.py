@@ -0,0 +1,469 @@
+"""
+Локальная имитация RPC-ноды Akash для бенчмарков УАДИА.
+
+FakeLedgerClient повторяет ту часть интерфейса LedgerClient, которой
+пользуется UadiaBlockchainSecretManager, и добавляет настраиваемую
+задержку на каждый запрос, чтобы моделировать публичные RPC-ноды.
+FakeSigningLedger имитирует отправку транзакций: проверку sequence
+в мемпуле и включение в блок с заданным временем блока. FakeLcdServer
+отдает ту же историю по HTTP (LCD REST и API эксплорера).
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from cosmpy.aerial.tx_helpers import SubmittedTx, TxResponse
+from cosmpy.protos.cosmos.bank.v1beta1.tx_pb2 import MsgSend
+from cosmpy.protos.cosmos.base.abci.v1beta1.abci_pb2 import TxResponse as TxResponseProto
+from cosmpy.protos.cosmos.base.v1beta1.coin_pb2 import Coin
+from cosmpy.protos.cosmos.tx.v1beta1.service_pb2 import GetTxResponse
+from cosmpy.protos.cosmos.tx.v1beta1.tx_pb2 import Tx, TxBody
+from cryptography.fernet import Fernet
+from google.protobuf.any_pb2 import Any
+
+from uadia_memo import encode_memo
+
+MSG_SEND = "/cosmos.bank.v1beta1.MsgSend"
+
+
+def make_tx(
+    height: int,
+    from_address: str,
+    to_address: str,
+    memo: str = "",
+    amount: str = "1000",
+    type_url: str = MSG_SEND
+) -> SimpleNamespace:
+    """Создает объект транзакции в форме ответа query_txs."""
+    tx_hash = hashlib.sha256(
+        f"{height}:{from_address}:{to_address}:{memo}".encode()
+    ).hexdigest().upper()
+    msg = SimpleNamespace(
+        type_url=type_url,
+        from_address=from_address,
+        to_address=to_address,
+        amount=[SimpleNamespace(amount=amount, denom="uakt")]
+    )
+    body = SimpleNamespace(messages=[msg], memo=memo)
+    return SimpleNamespace(
+        tx=SimpleNamespace(body=body),
+        hash=tx_hash,
+        height=height,
+        timestamp=None
+    )
+
+
+def make_history(
+    wallet_address: str,
+    size: int,
+    start_height: int = 1_000_000,
+    memo_factory: Optional[Callable[[int], str]] = None
+) -> List[SimpleNamespace]:
+    """
+    Генерирует историю self-транзакций кошелька (по одной на блок).
+
+    Args:
+        wallet_address: Адрес кошелька
+        size: Количество транзакций
+        start_height: Высота первой транзакции
+        memo_factory: Функция i -> memo (по умолчанию пустое memo)
+    """
+    history = []
+    for i in range(size):
+        memo = memo_factory(i) if memo_factory else f"memo-{i}"
+        history.append(make_tx(start_height + i, wallet_address, wallet_address, memo))
+    return history
+
+
+def _get_tx_response(tx: SimpleNamespace) -> GetTxResponse:
+    """Транзакция make_tx в форме ответа GetTx: сообщения упакованы в Any."""
+    msg = tx.tx.body.messages[0]
+    send = MsgSend(
+        from_address=msg.from_address,
+        to_address=msg.to_address,
+        amount=[Coin(denom=coin.denom, amount=coin.amount) for coin in msg.amount]
+    )
+    return GetTxResponse(
+        tx=Tx(body=TxBody(
+            messages=[Any(type_url=msg.type_url, value=send.SerializeToString())],
+            memo=tx.tx.body.memo
+        )),
+        tx_response=TxResponseProto(
+            txhash=tx.hash,
+            height=tx.height,
+            timestamp=tx.timestamp or ""
+        )
+    )
+
+
+class FakeTxService:
+    """Сервис транзакций FakeLedgerClient (LedgerClient.txs)."""
+
+    def __init__(self, ledger: "FakeLedgerClient"):
+        self.ledger = ledger
+
+    def GetTx(self, request) -> GetTxResponse:
+        self.ledger._tick()
+        if request.hash in self.ledger.fail_hashes:
+            raise ConnectionError(f"injected failure for tx {request.hash}")
+        try:
+            tx = self.ledger.find_tx(request.hash)
+        except KeyError:
+            # Так отвечает REST-клиент cosmpy на неизвестный хэш
+            raise RuntimeError(f"tx {request.hash} not found")
+        return _get_tx_response(tx)
+
+
+class FakeLedgerClient:
+    """
+    In-process заменитель LedgerClient с настраиваемой задержкой.
+
+    Ответы по хэшу повторяют контракт cosmpy: query_tx отдает TxResponse
+    без тела транзакции, полная транзакция - через txs.GetTx.
+
+    Args:
+        history: Список транзакций (в любом порядке)
+        latency: Задержка каждого RPC-запроса в секундах
+        fail_pages: Номера страниц, которые один раз отвечают ошибкой
+        fail_hashes: Хэши, на которые GetTx всегда отвечает ошибкой сети
+    """
+
+    _HEIGHT_GE = re.compile(r"tx\.height\s*>=\s*(\d+)")
+    _HEIGHT_LT = re.compile(r"tx\.height\s*<\s*(\d+)")
+    _SENDER = re.compile(r"message\.sender='([^']+)'")
+
+    def __init__(
+        self,
+        history: List[SimpleNamespace],
+        latency: float = 0.0,
+        fail_pages: Optional[List[int]] = None,
+        fail_hashes: Optional[List[str]] = None
+    ):
+        self.history = sorted(history, key=lambda tx: tx.height)
+        self._by_hash = {tx.hash: tx for tx in self.history}
+        self.txs = FakeTxService(self)
+        self.latency = latency
+        self._fail_pages = set(fail_pages or [])
+        self.fail_hashes = set(fail_hashes or [])
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _tick(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _select(self, query: str) -> List[SimpleNamespace]:
+        sender = self._SENDER.search(query)
+        low = self._HEIGHT_GE.search(query)
+        high = self._HEIGHT_LT.search(query)
+        selected = []
+        for tx in self.history:
+            if low and tx.height < int(low.group(1)):
+                continue
+            if high and tx.height >= int(high.group(1)):
+                continue
+            if sender and tx.tx.body.messages[0].from_address != sender.group(1):
+                continue
+            selected.append(tx)
+        return selected
+
+    def query_txs(self, query: str, page: int = 1, limit: int = 50, order_by: str = "desc"):
+        self._tick()
+        with self._lock:
+            if page in self._fail_pages:
+                self._fail_pages.discard(page)
+                raise ConnectionError(f"injected failure on page {page}")
+
+        selected = self._select(query)
+        if order_by == "desc":
+            selected.reverse()
+        start = (page - 1) * limit
+        return SimpleNamespace(
+            txs=selected[start:start + limit],
+            total_count=len(selected)
+        )
+
+    def find_tx(self, tx_hash: str) -> SimpleNamespace:
+        """Транзакция истории по хэшу (без задержки); KeyError, если ее нет."""
+        return self._by_hash[tx_hash]
+
+    def query_tx(self, tx_hash: str) -> TxResponse:
+        self._tick()
+        tx = self.find_tx(tx_hash)
+        return TxResponse(
+            hash=tx.hash,
+            height=tx.height,
+            code=0,
+            gas_wanted=0,
+            gas_used=0,
+            raw_log="",
+            logs=[],
+            events={},
+            timestamp=tx.timestamp
+        )
+
+    def query_height(self) -> int:
+        self._tick()
+        return self.history[-1].height if self.history else 0
+
+
+class FakeSigningLedger:
+    """
+    In-process заменитель LedgerClient для записи транзакций.
+
+    broadcast_tx, как CheckTx ноды, принимает транзакцию только со
+    следующим по мемпулу sequence; query_account отдает sequence по
+    включенным в блок транзакциям. Транзакция включается в ближайший
+    блок после отправки.
+
+    Args:
+        latency: Задержка каждого RPC-запроса в секундах
+        block_time: Время блока в секундах
+    """
+
+    def __init__(self, latency: float = 0.0, block_time: float = 1.0):
+        self.latency = latency
+        self.block_time = block_time
+        self.network_config = SimpleNamespace(chain_id="akashnet-2")
+        self.included = {}
+        self.rejected = 0
+        self.calls = 0
+        self._next_sequence = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _tick(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _next_block(self) -> float:
+        elapsed = time.monotonic() - self._started
+        return self._started + (int(elapsed / self.block_time) + 1) * self.block_time
+
+    def query_account(self, address):
+        self._tick()
+        now = time.monotonic()
+        with self._lock:
+            committed = sum(1 for at in self.included.values() if at <= now)
+        return SimpleNamespace(address=address, number=7, sequence=committed)
+
+    def estimate_fee_from_gas(self, gas_limit: int) -> str:
+        return f"{-(-gas_limit * 25 // 1000)}uakt"
+
+    def broadcast_tx(self, tx) -> SubmittedTx:
+        self._tick()
+        sequence = tx.tx.auth_info.signer_infos[0].sequence
+        with self._lock:
+            if sequence != self._next_sequence:
+                self.rejected += 1
+                raise RuntimeError(
+                    f"account sequence mismatch, expected {self._next_sequence}, got {sequence}"
+                )
+            self._next_sequence += 1
+            tx_hash = hashlib.sha256(tx.tx.SerializeToString()).hexdigest().upper()
+            self.included[tx_hash] = self._next_block()
+        return SubmittedTx(self, tx_hash)
+
+    def wait_for_query_tx(self, tx_hash: str, timeout=None, poll_period=None):
+        included_at = self.included[tx_hash]
+        delay = included_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._tick()
+        return SimpleNamespace(hash=tx_hash, ensure_successful=lambda: None)
+
+
+def make_noisy_history(
+    wallet_address: str,
+    size: int,
+    key: bytes,
+    noise_ratio: float = 0.9,
+    services: int = 5,
+    start_height: int = 1_000_000,
+    seed: int = 0
+) -> List[SimpleNamespace]:
+    """
+    История кошелька, где только часть self-транзакций несет наши секреты.
+
+    Шум - перевод с чужого адреса, memo, зашифрованное чужим ключом, или
+    обычный текст; так сканер проходит все ветки отбраковки.
+
+    Args:
+        wallet_address: Адрес кошелька
+        size: Количество транзакций
+        key: Ключ Fernet, которым шифруются настоящие секреты
+        noise_ratio: Доля шумовых транзакций (0..1)
+        services: Число сервисов, между которыми ротируются секреты
+        start_height: Высота первой транзакции
+        seed: Зерно генератора (история воспроизводима)
+    """
+    rng = random.Random(seed)
+    foreign_key = Fernet.generate_key()
+    history = []
+    for i in range(size):
+        height = start_height + i
+        if rng.random() >= noise_ratio:
+            secret = {"service": f"service-{i % services}", "token": f"token-{i}"}
+            history.append(make_tx(height, wallet_address, wallet_address, encode_memo(secret, key)))
+            continue
+        kind = rng.randrange(3)
+        if kind == 0:
+            history.append(make_tx(height, "akash1stranger", wallet_address, f"payment-{i}"))
+        elif kind == 1:
+            memo = encode_memo({"service": "foreign", "token": str(i)}, foreign_key)
+            history.append(make_tx(height, wallet_address, wallet_address, memo))
+        else:
+            history.append(make_tx(height, wallet_address, wallet_address, f"note-{i}"))
+    return history
+
+
+def _lcd_tx(tx: SimpleNamespace) -> dict:
+    """Транзакция make_tx в JSON-форме tx_response LCD."""
+    msg = tx.tx.body.messages[0]
+    return {
+        "txhash": tx.hash,
+        "height": str(tx.height),
+        "timestamp": tx.timestamp,
+        "tx": {"body": {
+            "memo": tx.tx.body.memo,
+            "messages": [{
+                "@type": msg.type_url,
+                "from_address": msg.from_address,
+                "to_address": msg.to_address,
+                "amount": [{"denom": coin.denom, "amount": coin.amount} for coin in msg.amount],
+            }],
+        }},
+    }
+
+
+def _explorer_tx(tx: SimpleNamespace) -> dict:
+    """Транзакция make_tx в плоской форме API эксплорера (Mintscan)."""
+    msg = tx.tx.body.messages[0]
+    return {
+        "tx_hash": tx.hash,
+        "height": tx.height,
+        "type": "cosmos-sdk/MsgSend" if msg.type_url == MSG_SEND else msg.type_url,
+        "from_address": msg.from_address,
+        "to_address": msg.to_address,
+        "amount": {"denom": msg.amount[0].denom, "amount": msg.amount[0].amount},
+        "memo": tx.tx.body.memo,
+        "timestamp": tx.timestamp,
+    }
+
+
+class FakeLcdServer:
+    """
+    Локальный HTTP-сервер с LCD REST API Cosmos и API эксплорера.
+
+    Отдает ту же историю, что FakeLedgerClient, по HTTP - для
+    AsyncUadiaBlockchainSecretManager (lcd_url=server.url) и
+    SimpleUaiaSecretFinder (api_base=server.url):
+        GET /cosmos/tx/v1beta1/txs              (events или query, page, limit)
+        GET /cosmos/tx/v1beta1/txs/{hash}
+        GET /cosmos/base/tendermint/v1beta1/blocks/latest
+        GET /account/{address}/txs               (limit, offset, to_height)
+
+    Args:
+        history: Список транзакций make_tx
+        latency: Задержка каждого ответа в секундах
+    """
+
+    def __init__(self, history: List[SimpleNamespace], latency: float = 0.0):
+        self.ledger = FakeLedgerClient(history)
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _route(self, path: str, query: dict):
+        if path == "/cosmos/tx/v1beta1/txs":
+            conditions = query.get("events") or query.get("query", [""])[0].split(" AND ")
+            page = int(query.get("page", ["1"])[0])
+            limit = int(query.get("limit", ["100"])[0])
+            order = "asc" if query.get("order_by", [""])[0] == "ORDER_BY_ASC" else "desc"
+            response = self.ledger.query_txs(" AND ".join(conditions), page, limit, order)
+            return 200, {
+                "tx_responses": [_lcd_tx(tx) for tx in response.txs],
+                "total": str(response.total_count),
+            }
+
+        if path.startswith("/cosmos/tx/v1beta1/txs/"):
+            try:
+                self.ledger._tick()
+                tx = self.ledger.find_tx(path.rsplit("/", 1)[1])
+            except KeyError:
+                return 404, {"code": 5, "message": "tx not found"}
+            return 200, {"tx_response": _lcd_tx(tx)}
+
+        if path == "/cosmos/base/tendermint/v1beta1/blocks/latest":
+            return 200, {"block": {"header": {"height": str(self.ledger.query_height())}}}
+
+        if path.startswith("/account/") and path.endswith("/txs"):
+            address = path[len("/account/"):-len("/txs")]
+            limit = int(query.get("limit", ["50"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            to_height = int(query.get("to_height", ["0"])[0])
+            involved = [
+                tx for tx in reversed(self.ledger.history)
+                if address in (tx.tx.body.messages[0].from_address, tx.tx.body.messages[0].to_address)
+                and (not to_height or tx.height <= to_height)
+            ]
+            return 200, [_explorer_tx(tx) for tx in involved[offset:offset + limit]]
+
+        return 404, {"message": f"unsupported path {path}"}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                with server._lock:
+                    server.calls += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, payload = server._route(parsed.path, parse_qs(parsed.query))
+                encoded = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
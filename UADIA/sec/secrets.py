@@ -1,47 +1,34 @@
-import base64
-import json
-from typing import Dict, Optional, Tuple
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
+from typing import Dict, List, Optional
+from uadia_kdf import derive_key_from_seed
+from uadia_batch_writer import BatchSecretWriter
+from uadia_memo import MAX_MEMO_LENGTH, decode_memo, encode_memo
 
 # === 1. ФУНКЦИИ ШИФРОВАНИЯ (Остаются прежними) ===
-def derive_key_from_seed(seed_phrase: str, salt: bytes) -> bytes:
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-    )
-    key_material = seed_phrase.encode()
-    key = base64.urlsafe_b64encode(kdf.derive(key_material))
-    return key
 
 def encrypt_secret(secret_data: dict, key: bytes) -> str:
-    f = Fernet(key)
-    secret_json = json.dumps(secret_data).encode()
-    encrypted_data = f.encrypt(secret_json)
-    return base64.urlsafe_b64encode(encrypted_data).decode()
+    # Компактный memo v2: "u2:<fingerprint>:<base64url(header | nonce | ct)>"
+    return encode_memo(secret_data, key)
 
 def decrypt_secret(encrypted_payload: str, key: bytes) -> Dict:
-    f = Fernet(key)
-    encrypted_bytes = base64.urlsafe_b64decode(encrypted_payload.encode())
-    decrypted_bytes = f.decrypt(encrypted_bytes)
-    return json.loads(decrypted_bytes.decode())
+    # Понимает и memo с префиксом версии, и старые memo без него
+    return decode_memo(encrypted_payload, key)
 
 # === 2. ЗАПИСЬ В БЛОКЧЕЙН (с использованием суммы) ===
 from akash.client import AkashClient
 from akash.wallet import AkashWallet
+from uadia_tx_log import log_transaction
 
 def write_secret_to_blockchain(
     wallet: AkashWallet,
     client: AkashClient,
     encrypted_payload: str,
-    amount_code: int = 1000  # Сумма как часть "кода"
+    amount_code: int = 1000,  # Сумма как часть "кода"
+    service: Optional[str] = None
 ) -> Optional[str]:
     """
     Отправляет транзакцию самому себе с секретом в memo.
     Возвращает хэш транзакции (tx_hash) для записи в лог агента.
+    service (имя сервиса секрета) попадает в журнал для поиска последней версии.
     """
     try:
         result = client.bank.send(
@@ -55,7 +42,10 @@ def write_secret_to_blockchain(
             print(f"✅ Секрет записан в tx: {result.tx_hash}")
             # КРИТИЧЕСКИ ВАЖНО: Агент должен сохранить этот tx_hash!
             # Например, в локальный файл, базу данных или другой блокчейн.
-            log_transaction(wallet.address, result.tx_hash, amount_code)
+            log_transaction(
+                wallet.address, result.tx_hash, amount_code,
+                height=getattr(result, "height", None), secret=service
+            )
             return result.tx_hash
         else:
             print(f"❌ Ошибка: {result.raw_log}")
@@ -64,10 +54,30 @@ def write_secret_to_blockchain(
         print(f"❌ Ошибка отправки: {e}")
         return None
 
-def log_transaction(address: str, tx_hash: str, amount: int):
-    """Простая логика записи хэша в файл. В реальности это может быть база данных."""
-    with open(f"uaia_transactions_{address[-8:]}.log", "a") as f:
-        f.write(f"{tx_hash},{amount}\n")
+def write_large_secret_to_blockchain(
+    wallet,
+    client,
+    secret_data: dict,
+    key: bytes,
+    amount_code: int = 1000,
+    max_memo_length: int = MAX_MEMO_LENGTH
+) -> Optional[List[str]]:
+    """
+    Записывает секрет, который не помещается в одно memo (сертификаты,
+    бандлы конфигурации). Зашифрованный секрет делится на чанки с
+    (secret_id, индекс, количество, digest), каждый чанк - отдельная
+    self-транзакция. Memo относится ко всей транзакции, поэтому одна
+    multi-message транзакция не может нести несколько чанков.
+    
+    Чанки отправляет BatchSecretWriter: sequence ведется локально, все
+    транзакции уходят подряд и подтверждаются вместе. wallet и client -
+    cosmpy Wallet и LedgerClient агента.
+    
+    Returns:
+        Хэши транзакций всех чанков или None, если какой-то чанк не записан
+    """
+    writer = BatchSecretWriter(client, wallet)
+    return writer.write_chunked(secret_data, key, amount_code, max_memo_length)
 
 # === 3. ЧТЕНИЕ И РАСШИФРОВКА (Поиск по своим транзакциям) ===
 def find_and_decrypt_secrets(
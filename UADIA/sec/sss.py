@@ -1,10 +1,52 @@
-from secretsharing import SecretSharer
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO, List, Dict, Optional
 import json
 import base64
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
+from uadia_gf256 import (
+    DEFAULT_CHUNK_SIZE,
+    combine_bytes,
+    combine_stream,
+    format_share,
+    is_gf256_share,
+    parse_share,
+    split_bytes,
+    split_stream,
+)
+from uadia_kdf import derive_key_from_seed
+
+# Простые модули secretsharing 0.2.6: числа Мерсенна и три "круглых" простых,
+# по возрастанию. Сама библиотека на Python 3 не импортируется (long)
+_LEGACY_PRIMES = sorted(
+    [2 ** e - 1 for e in (2, 3, 5, 7, 13, 17, 19, 31, 61, 89, 107, 127, 521, 607, 1279)]
+    + [2 ** 256 + 297, 2 ** 320 + 27, 2 ** 384 + 231]
+)
+
+
+def _combine_legacy_shares(shares: List[str]) -> bytes:
+    """
+    Восстанавливает секрет из долей secretsharing ("x-y", оба числа в hex):
+    интерполяция Лагранжа в нуле над полем по наименьшему простому,
+    которое больше всех y, - так модуль выбирала сама библиотека.
+    """
+    points = [tuple(int(part, 16) for part in share.split("-", 1)) for share in shares]
+    largest = max(y for _, y in points)
+    prime = next((p for p in _LEGACY_PRIMES if p >= largest), None)
+    if prime is None:
+        raise ValueError("Доля secretsharing слишком длинная")
+
+    secret = 0
+    for i, (x_i, y_i) in enumerate(points):
+        numerator, denominator = 1, 1
+        for j, (x_j, _) in enumerate(points):
+            if i != j:
+                numerator = numerator * -x_j % prime
+                denominator = denominator * (x_i - x_j) % prime
+        secret = (secret + y_i * numerator * pow(denominator, -1, prime)) % prime
+
+    seed_hex = format(secret, "x")
+    return bytes.fromhex(seed_hex.zfill(len(seed_hex) + len(seed_hex) % 2))
+
 
 class UaiaShamirSecretManager:
     """
@@ -42,16 +84,16 @@ class UaiaShamirSecretManager:
             ...     "word1 word2 ... word24",
             ...     ["architect", "infra", "security"]
             ... )
-            >>> print(shares["architect"])  # "1-ab23cd45..."
+            >>> print(shares["architect"])  # "gf-1-ab23cd45..."
         """
         if len(agent_names) < self.n:
             raise ValueError(f"Нужно минимум {self.n} агента, передано {len(agent_names)}")
         
-        # SSS работает с hex, преобразуем сид-фразу
-        seed_hex = seed_phrase.encode().hex()
-        
-        # Делим секрет
-        shares = SecretSharer.split_secret(seed_hex, self.k, self.n)
+        # Делим байты сид-фразы по схеме Шамира над GF(256)
+        shares = [
+            format_share(x, y)
+            for x, y in split_bytes(seed_phrase.encode(), self.k, self.n)
+        ]
         
         # Распределяем доли по агентам
         agent_shares = {}
@@ -91,9 +133,11 @@ class UaiaShamirSecretManager:
         Example:
             >>> manager = UaiaShamirSecretManager(k=2, n=3)
             >>> seed = manager.recover_master_seed({
-            ...     "architect": "1-ab23cd45...",
-            ...     "infra": "2-cd67ef89..."
+            ...     "architect": "gf-1-ab23cd45...",
+            ...     "infra": "gf-2-cd67ef89..."
             ... })
+        
+        Старые доли secretsharing ("1-ab23cd45...") тоже принимаются.
         """
         try:
             # Проверяем, что достаточно долей
@@ -104,11 +148,7 @@ class UaiaShamirSecretManager:
             # Извлекаем доли в правильном формате
             shares_list = list(agent_shares.values())
             
-            # Восстанавливаем hex-строку
-            seed_hex = SecretSharer.recover_secret(shares_list[:self.k])
-            
-            # Преобразуем hex обратно в сид-фразу
-            seed_phrase = bytes.fromhex(seed_hex).decode()
+            seed_phrase = self._combine_shares(shares_list[:self.k]).decode()
             
             # Проверяем целостность
             if self._validate_seed(seed_phrase):
@@ -122,6 +162,58 @@ class UaiaShamirSecretManager:
             print(f"❌ Ошибка восстановления: {e}")
             return None
     
+    def split_blob(
+        self,
+        source,
+        agent_outputs: Dict[str, BinaryIO],
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """
+        Делит произвольный артефакт (TLS-ключ, unseal-бандл Vault, креды
+        модели) на доли агентов, не загружая его в память целиком.
+        
+        Args:
+            source: Бинарный файл или bytes-подобный буфер
+            agent_outputs: Словарь {agent_name: поток для доли агента},
+                ровно n агентов
+            chunk_size: Размер куска при потоковой обработке
+            
+        Returns:
+            Количество обработанных байт
+            
+        Example:
+            >>> with open("tls.key", "rb") as src:
+            ...     outs = {a: open(f"{a}.share", "wb") for a in agents}
+            ...     manager.split_blob(src, outs)
+        """
+        if len(agent_outputs) != self.n:
+            raise ValueError(f"Нужно ровно {self.n} потоков долей, передано {len(agent_outputs)}")
+        
+        total = split_stream(source, list(agent_outputs.values()), self.k, chunk_size)
+        print(f"✅ Артефакт ({total} байт) разделен на {self.n} доли, порог: {self.k}")
+        return total
+    
+    def combine_blob(
+        self,
+        agent_inputs: Dict[str, BinaryIO],
+        output: BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """
+        Восстанавливает артефакт из потоков долей агентов и пишет его в output.
+        
+        Args:
+            agent_inputs: Словарь {agent_name: поток с долей агента}
+            output: Поток для восстановленного артефакта
+            chunk_size: Размер куска при потоковой обработке
+            
+        Returns:
+            Количество восстановленных байт
+        """
+        total = combine_stream(list(agent_inputs.values()), output, chunk_size)
+        print(f"✅ Артефакт ({total} байт) восстановлен из {len(agent_inputs)} долей")
+        return total
+    
     def create_agent_key_package(
         self,
         agent_name: str,
@@ -134,24 +226,63 @@ class UaiaShamirSecretManager:
         
         Args:
             agent_name: Имя агента (architect, infra, etc.)
-            agent_share: Доля Shamir (например, "1-ab23cd45...")
+            agent_share: Доля Shamir (например, "gf-1-ab23cd45...")
             personal_password: Персональный пароль агента
             
         Returns:
             Зашифрованный пакет данных для агента
         """
         # Создаем ключ из пароля агента
-        salt = f"uaia_agent_{agent_name}".encode()
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        agent_key = base64.urlsafe_b64encode(
-            kdf.derive(personal_password.encode())
+        salt = self._agent_salt(agent_name)
+        agent_key = derive_key_from_seed(personal_password, salt)
+        
+        return self._build_agent_package(agent_name, agent_share, agent_key, salt)
+    
+    def create_agent_key_packages(
+        self,
+        agent_shares: Dict[str, str],
+        passwords: Dict[str, str],
+        max_workers: Optional[int] = None,
+        use_processes: bool = False
+    ) -> Dict[str, Dict]:
+        """
+        Создает пакеты сразу для нескольких агентов.
+        PBKDF2 для всех агентов выполняется параллельно, пакеты имеют тот же
+        формат, что и у create_agent_key_package.
+        
+        Args:
+            agent_shares: Словарь {agent_name: shamir_share}
+            passwords: Словарь {agent_name: personal_password}
+            max_workers: Размер пула (None = по числу агентов)
+            use_processes: Использовать пул процессов вместо потоков
+            
+        Returns:
+            Словарь {agent_name: package}; агенты без пароля пропускаются
+        """
+        agents = []
+        for agent in agent_shares:
+            if agent in passwords:
+                agents.append(agent)
+            else:
+                print(f"⚠️ Нет пароля агента '{agent}', пакет не создан")
+        salts = [self._agent_salt(agent) for agent in agents]
+        keys = self._derive_keys_parallel(
+            [passwords[agent] for agent in agents], salts, max_workers, use_processes
         )
         
+        return {
+            agent: self._build_agent_package(agent, agent_shares[agent], key, salt)
+            for agent, key, salt in zip(agents, keys, salts)
+        }
+    
+    def _build_agent_package(
+        self,
+        agent_name: str,
+        agent_share: str,
+        agent_key: bytes,
+        salt: bytes
+    ) -> Dict:
+        """Шифрует долю агента готовым ключом и собирает пакет."""
         # Подготавливаем данные для агента
         agent_data = {
             "agent": agent_name,
@@ -189,16 +320,59 @@ class UaiaShamirSecretManager:
         try:
             # Восстанавливаем ключ из пароля
             salt = base64.urlsafe_b64decode(package["salt"])
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-            )
-            agent_key = base64.urlsafe_b64encode(
-                kdf.derive(personal_password.encode())
-            )
+            agent_key = derive_key_from_seed(personal_password, salt)
+        except Exception as e:
+            print(f"❌ Ошибка расшифровки пакета: {e}")
+            return None
+        
+        return self._open_agent_package(package, agent_key)
+    
+    def decrypt_agent_packages(
+        self,
+        packages: Dict[str, Dict],
+        passwords: Dict[str, str],
+        max_workers: Optional[int] = None,
+        use_processes: bool = False
+    ) -> Dict[str, Dict]:
+        """
+        Расшифровывает пакеты нескольких агентов, выполняя PBKDF2 параллельно.
+        
+        Args:
+            packages: Словарь {agent_name: package}
+            passwords: Словарь {agent_name: personal_password}
+            max_workers: Размер пула (None = по числу агентов)
+            use_processes: Использовать пул процессов вместо потоков
             
+        Returns:
+            Словарь {agent_name: agent_data} только для успешно расшифрованных;
+            пакет без пароля или с испорченной солью не мешает остальным
+        """
+        agents = []
+        salts = []
+        for agent, package in packages.items():
+            if agent not in passwords:
+                print(f"⚠️ Нет пароля агента '{agent}', пакет пропущен")
+                continue
+            try:
+                salts.append(base64.urlsafe_b64decode(package["salt"]))
+            except Exception as e:
+                print(f"❌ Ошибка расшифровки пакета '{agent}': {e}")
+                continue
+            agents.append(agent)
+        keys = self._derive_keys_parallel(
+            [passwords[agent] for agent in agents], salts, max_workers, use_processes
+        )
+        
+        results = {}
+        for agent, key in zip(agents, keys):
+            agent_data = self._open_agent_package(packages[agent], key)
+            if agent_data:
+                results[agent] = agent_data
+        return results
+    
+    def _open_agent_package(self, package: Dict, agent_key: bytes) -> Optional[Dict]:
+        """Расшифровывает пакет агента готовым ключом."""
+        try:
             # Расшифровываем данные
             fernet = Fernet(agent_key)
             encrypted_bytes = base64.urlsafe_b64decode(package["data"])
@@ -212,6 +386,41 @@ class UaiaShamirSecretManager:
             print(f"❌ Ошибка расшифровки пакета: {e}")
             return None
     
+    @staticmethod
+    def _combine_shares(shares: List[str]) -> bytes:
+        """Восстанавливает байты секрета из долей GF(256) или старого формата."""
+        native = [is_gf256_share(share) for share in shares]
+        if all(native):
+            return combine_bytes([parse_share(share) for share in shares])
+        if any(native):
+            raise ValueError("Нельзя смешивать доли GF(256) и secretsharing")
+        
+        # Совместимость с долями "1-abcd...", созданными через secretsharing
+        return _combine_legacy_shares(shares)
+    
+    @staticmethod
+    def _agent_salt(agent_name: str) -> bytes:
+        return f"uaia_agent_{agent_name}".encode()
+    
+    @staticmethod
+    def _derive_keys_parallel(
+        passwords: List[str],
+        salts: List[bytes],
+        max_workers: Optional[int],
+        use_processes: bool
+    ) -> List[bytes]:
+        """
+        Выполняет PBKDF2 для нескольких паролей одновременно.
+        OpenSSL отпускает GIL во время PBKDF2, поэтому обычно хватает потоков;
+        пул процессов обходит GIL гарантированно.
+        """
+        if not passwords:
+            return []
+        workers = max_workers or len(passwords)
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_cls(max_workers=workers) as pool:
+            return list(pool.map(derive_key_from_seed, passwords, salts))
+    
     def _create_checksum(self, seed_phrase: str) -> str:
         """Создает контрольную сумму для проверки целостности."""
         import hashlib
@@ -0,0 +1,377 @@
+"""
+Асинхронный менеджер секретов УАДИА.
+
+Сетевые запросы идут через aiohttp к REST (LCD) API ноды Akash
+(/cosmos/tx/v1beta1/txs) без блокировки event loop; страницы и GetTx
+выполняются конкурентно под общим семафором. PBKDF2 и расшифровка memo
+уходят в executor, поэтому один процесс агента восстанавливает секреты
+многих кошельков одновременно, без потока на кошелек.
+"""
+import asyncio
+import functools
+import math
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from uadia_blockchain_secret_manager import PAGE_LIMIT, UadiaBlockchainSecretManager
+from uadia_kdf import derive_key_from_seed
+from uadia_metrics import METRICS
+from uadia_transfer import SelfTransfer
+
+MSG_SEND = "/cosmos.bank.v1beta1.MsgSend"
+
+
+class AsyncUadiaBlockchainSecretManager:
+    """
+    Асинхронный аналог UadiaBlockchainSecretManager поверх LCD API.
+
+    Args:
+        lcd_url: REST API ноды Akash
+        max_concurrency: Сколько HTTP-запросов выполняется одновременно
+        page_retries: Повторы запроса при ошибке
+        retry_backoff: Базовая пауза между повторами (сек), растет экспоненциально
+        timeout: Таймаут одного запроса (сек)
+        executor: Executor для KDF и расшифровки (None - executor цикла по умолчанию)
+        query_param: "events" (Cosmos SDK до 0.50) или "query" (SDK 0.50+)
+
+    Example:
+        >>> async with AsyncUadiaBlockchainSecretManager() as manager:
+        ...     secrets = await manager.extract_and_decrypt_secrets("akash1...", key)
+    """
+
+    def __init__(
+        self,
+        lcd_url: str = "https://api.akashnet.net:443",
+        max_concurrency: int = 16,
+        page_retries: int = 2,
+        retry_backoff: float = 0.5,
+        timeout: float = 30.0,
+        executor: Optional[Executor] = None,
+        query_param: str = "events"
+    ):
+        if query_param not in ("events", "query"):
+            raise ValueError(f"Неизвестный параметр запроса: {query_param}")
+        self.lcd_url = lcd_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.page_retries = page_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.executor = executor
+        self.query_param = query_param
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_concurrency, keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _get_json(self, path: str, params=None) -> Dict:
+        """GET к LCD с повторами и экспоненциальной паузой."""
+        session = self._get_session()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    # Время считается после семафора - без ожидания очереди
+                    with METRICS.timer("rpc_page", method="lcd"):
+                        async with session.get(self.lcd_url + path, params=params) as response:
+                            response.raise_for_status()
+                            return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                METRICS.inc("rpc_errors", method="lcd")
+                # 4xx (кроме 429) не исправится повтором - например, 404 на GetTx
+                permanent = (
+                    isinstance(e, aiohttp.ClientResponseError)
+                    and e.status < 500 and e.status != 429
+                )
+                if permanent or attempt >= self.page_retries:
+                    raise
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+                attempt += 1
+
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """Выполняет CPU-задачу (KDF, расшифровка) в executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    # === Поиск транзакций ===
+
+    def _search_params(
+        self,
+        wallet_address: str,
+        page: int,
+        start_height: Optional[int] = None
+    ) -> List[Tuple[str, str]]:
+        conditions = [
+            f"message.sender='{wallet_address}'",
+            f"transfer.recipient='{wallet_address}'",
+        ]
+        if start_height is not None:
+            conditions.append(f"tx.height>={start_height}")
+
+        if self.query_param == "query":
+            params = [("query", " AND ".join(conditions))]
+        else:
+            params = [("events", condition) for condition in conditions]
+        return params + [
+            ("page", str(page)),
+            ("limit", str(PAGE_LIMIT)),
+            ("order_by", "ORDER_BY_DESC"),
+        ]
+
+    async def _query_page(self, wallet_address: str, page: int, start_height: Optional[int]):
+        return await self._get_json(
+            "/cosmos/tx/v1beta1/txs", self._search_params(wallet_address, page, start_height)
+        )
+
+    @staticmethod
+    def _response_total(data: Dict) -> Optional[int]:
+        total = data.get("total") or (data.get("pagination") or {}).get("total")
+        try:
+            return int(total) if total is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    async def find_self_transfers(
+        self,
+        wallet_address: str,
+        start_height: Optional[int] = None,
+        max_pages: int = 10
+    ) -> List[Dict]:
+        """
+        Ищет self-транзакции кошелька (по убыванию высоты).
+
+        Первая страница сообщает общее число транзакций, остальные
+        запрашиваются конкурентно. Как и в синхронном менеджере, пустая,
+        неполная или ошибочная страница обрывает результат.
+
+        Args:
+            wallet_address: Адрес кошелька УАДИА (akash1...)
+            start_height: Блок, с которого начинать поиск (None = с генезиса)
+            max_pages: Максимальное количество страниц
+        """
+        print(f"🔍 Начинаем поиск self-транзакций для {wallet_address}")
+        try:
+            first = await self._query_page(wallet_address, 1, start_height)
+        except Exception as e:
+            print(f"⚠️ Ошибка при запросе страницы 1: {e}")
+            return []
+
+        pages = [first.get("tx_responses") or []]
+        total = self._response_total(first)
+        if len(pages[0]) == PAGE_LIMIT and max_pages > 1:
+            if total is None:
+                # Нода не сообщила общее число - идем по одной странице
+                for page in range(2, max_pages + 1):
+                    response = await self._safe_page(wallet_address, page, start_height)
+                    if not self._append_page(pages, page, response):
+                        break
+            else:
+                page_count = min(max_pages, math.ceil(total / PAGE_LIMIT))
+                page_numbers = range(2, page_count + 1)
+                responses = await asyncio.gather(*(
+                    self._safe_page(wallet_address, page, start_height)
+                    for page in page_numbers
+                ))
+                for page, response in zip(page_numbers, responses):
+                    if not self._append_page(pages, page, response):
+                        break
+
+        all_self_txs = []
+        for page_txs in pages:
+            for tx in page_txs:
+                tx_data = self._parse_tx_response(tx, wallet_address)
+                if tx_data:
+                    all_self_txs.append(tx_data)
+        METRICS.inc("txs_scanned", sum(len(page_txs) for page_txs in pages))
+        METRICS.inc("self_transfers", len(all_self_txs))
+        print(f"✅ Всего найдено self-транзакций: {len(all_self_txs)}")
+        return all_self_txs
+
+    async def _safe_page(self, wallet_address: str, page: int, start_height: Optional[int]):
+        try:
+            return await self._query_page(wallet_address, page, start_height)
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _append_page(pages: List[list], page: int, response) -> bool:
+        """Добавляет страницу; False - обход нужно прекратить."""
+        if isinstance(response, Exception):
+            print(f"⚠️ Ошибка при запросе страницы {page}: {response}")
+            return False
+        txs = response.get("tx_responses") or []
+        if not txs:
+            return False
+        pages.append(txs)
+        return len(txs) == PAGE_LIMIT
+
+    async def fetch_transactions_by_hash(
+        self,
+        wallet_address: str,
+        tx_hashes: List[str]
+    ) -> List[Dict]:
+        """
+        Получает транзакции по хэшам конкурентно (GetTx).
+
+        Returns:
+            Self-транзакции по убыванию высоты; ненайденные хэши пропускаются
+        """
+        async def fetch(tx_hash: str):
+            try:
+                data = await self._get_json(f"/cosmos/tx/v1beta1/txs/{tx_hash}")
+            except Exception as e:
+                print(f"⚠️ Не удалось получить транзакцию {tx_hash[:16]}...: {e}")
+                return None
+            return self._parse_tx_response(data.get("tx_response") or {}, wallet_address)
+
+        found = [tx for tx in await asyncio.gather(*map(fetch, tx_hashes)) if tx]
+        found.sort(key=lambda tx: tx["height"], reverse=True)
+        return found
+
+    async def latest_height(self) -> int:
+        data = await self._get_json("/cosmos/base/tendermint/v1beta1/blocks/latest")
+        return int(data["block"]["header"]["height"])
+
+    @staticmethod
+    def _parse_tx_response(tx_response: Dict, wallet_address: str) -> Optional[SelfTransfer]:
+        """Разбирает tx_response LCD; None, если это не self-transfer."""
+        try:
+            body = tx_response["tx"]["body"]
+            messages = body.get("messages") or []
+            if not messages:
+                return None
+            msg = messages[0]
+            if msg.get("@type") != MSG_SEND:
+                return None
+            if msg.get("from_address") != wallet_address or msg.get("to_address") != wallet_address:
+                return None
+
+            amount = msg.get("amount") or []
+            return SelfTransfer(
+                tx_response["txhash"],
+                int(tx_response["height"]),
+                amount[0]["amount"] if amount else "0",
+                body.get("memo") or "",
+                wallet_address,
+                tx_response.get("timestamp")
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️ Ошибка парсинга транзакции: {e}")
+            return None
+
+    # === Ключи и расшифровка (в executor) ===
+
+    async def derive_key(self, seed_phrase: str, salt: bytes, iterations: int = 100000) -> bytes:
+        """derive_key_from_seed без блокировки event loop."""
+        return await self._run_blocking(derive_key_from_seed, seed_phrase, salt, iterations)
+
+    async def decrypt_transactions(
+        self,
+        transactions: List[Dict],
+        encryption_key: bytes,
+        latest_only: bool = False,
+        services: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        """UadiaBlockchainSecretManager.decrypt_transactions в executor."""
+        return await self._run_blocking(
+            UadiaBlockchainSecretManager.decrypt_transactions,
+            transactions, encryption_key, latest_only=latest_only,
+            services=None if services is None else list(services)
+        )
+
+    async def extract_and_decrypt_secrets(
+        self,
+        wallet_address: str,
+        encryption_key: bytes,
+        start_height: Optional[int] = None,
+        latest_only: bool = False,
+        services: Optional[Iterable[str]] = None,
+        max_pages: int = 10
+    ) -> List[Dict]:
+        """
+        Находит self-транзакции и расшифровывает их memo.
+
+        Args:
+            wallet_address: Адрес кошелька УАДИА
+            encryption_key: Ключ для расшифровки (полученный из сид-фразы)
+            start_height: Блок, с которого начинать поиск
+            latest_only: Вернуть только последнюю версию каждого сервиса
+            services: Вернуть только эти сервисы (включает latest_only)
+            max_pages: Максимальное количество страниц
+        """
+        transactions = await self.find_self_transfers(wallet_address, start_height, max_pages)
+        secrets = await self.decrypt_transactions(
+            transactions, encryption_key, latest_only, services
+        )
+        print(f"🎯 {wallet_address}: расшифровано {len(secrets)} секретов")
+        return secrets
+
+    async def restore_wallets(
+        self,
+        wallets: Dict[str, bytes],
+        **kwargs
+    ) -> Dict[str, List[Dict]]:
+        """
+        Восстанавливает секреты нескольких кошельков одновременно.
+
+        Args:
+            wallets: {адрес: ключ расшифровки}
+            **kwargs: Параметры extract_and_decrypt_secrets
+
+        Returns:
+            {адрес: секреты}; при ошибке у кошелька - пустой список
+        """
+        async def restore(address: str, key: bytes) -> List[Dict]:
+            try:
+                return await self.extract_and_decrypt_secrets(address, key, **kwargs)
+            except Exception as e:
+                print(f"❌ {address}: ошибка восстановления: {e}")
+                return []
+
+        results = await asyncio.gather(*(restore(a, k) for a, k in wallets.items()))
+        return dict(zip(wallets, results))
+
+
+async def main():
+    """Пример использования асинхронного менеджера секретов."""
+    print("🚀 Инициализация асинхронного менеджера секретов УАДИА...")
+    async with AsyncUadiaBlockchainSecretManager("https://api.akashnet.net:443") as manager:
+        # Ключи нескольких агентов выводятся параллельно в executor
+        agents = {
+            "akash1адрес_агента_1": ("сид фраза агента 1", b'uaia_salt_'),
+            "akash1адрес_агента_2": ("сид фраза агента 2", b'uaia_salt_'),
+        }
+        keys = await asyncio.gather(*(
+            manager.derive_key(seed, salt) for seed, salt in agents.values()
+        ))
+
+        results = await manager.restore_wallets(dict(zip(agents, keys)), latest_only=True)
+        for address, secrets in results.items():
+            print(f"\n👛 {address}")
+            for secret in secrets:
+                print(f"   {secret['service']}: блок {secret['block']}, код {secret['amount_code']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,203 @@
+"""
+Пакетная запись секретов УАДИА с конвейером по sequence аккаунта.
+
+write_secret_to_blockchain отправляет одну транзакцию и ждет ее включения
+в блок, поэтому N секретов - это N последовательных циклов
+broadcast/подтверждение, и каждый следующий рискует получить
+"account sequence mismatch". Здесь аккаунт запрашивается один раз,
+sequence ведется локально, транзакции подписываются и отправляются
+подряд без ожидания блока, а подтверждаются все вместе.
+
+Memo относится ко всей транзакции, поэтому несколько секретов нельзя
+упаковать в одну multi-message транзакцию - каждый секрет остается
+отдельной self-транзакцией.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from cosmpy.aerial.client.bank import create_bank_send_msg
+from cosmpy.aerial.tx import SigningCfg, Transaction, TxFee
+
+from uadia_memo import MAX_MEMO_LENGTH, encode_memo_chunks
+from uadia_tx_log import log_transaction
+
+# Газ self-перевода с memo до 256 символов; явный лимит избавляет от
+# симуляции, которая при конвейере видит устаревший sequence
+DEFAULT_GAS_LIMIT = 120_000
+
+# Текст ошибки Cosmos SDK: "account sequence mismatch, expected 12, got 11"
+_SEQUENCE_MISMATCH = re.compile(r"account sequence mismatch, expected (\d+)")
+
+
+class BatchSecretWriter:
+    """
+    Отправляет self-транзакции с секретами конвейером.
+
+    Args:
+        client: cosmpy LedgerClient (или совместимый)
+        wallet: cosmpy Wallet агента
+        denom: Деноминация суммы
+        gas_limit: Лимит газа каждой транзакции
+        confirm_timeout: Ожидание включения в блок, сек
+        max_workers: Сколько транзакций подтверждается одновременно
+    """
+
+    def __init__(
+        self,
+        client,
+        wallet,
+        denom: str = "uakt",
+        gas_limit: int = DEFAULT_GAS_LIMIT,
+        confirm_timeout: float = 60.0,
+        max_workers: int = 16
+    ):
+        self.client = client
+        self.wallet = wallet
+        self.denom = denom
+        self.gas_limit = gas_limit
+        self.confirm_timeout = confirm_timeout
+        self.max_workers = max_workers
+        self._account = None
+        self._sequence: Optional[int] = None
+
+    def _refresh_account(self):
+        self._account = self.client.query_account(self.wallet.address())
+        self._sequence = self._account.sequence
+
+    def _build_tx(self, memo: str, amount_code: int) -> Transaction:
+        address = self.wallet.address()
+        tx = Transaction()
+        tx.add_message(create_bank_send_msg(address, address, amount_code, self.denom))
+        fee = TxFee(
+            amount=self.client.estimate_fee_from_gas(self.gas_limit),
+            gas_limit=self.gas_limit
+        )
+        tx.seal(SigningCfg.direct(self.wallet.public_key(), self._sequence), fee=fee, memo=memo)
+        tx.sign(self.wallet.signer(), self.client.network_config.chain_id, self._account.number)
+        tx.complete()
+        return tx
+
+    def _broadcast(self, memo: str, amount_code: int):
+        """
+        Подписывает транзакцию следующим sequence и отправляет ее.
+        При рассинхронизации sequence (например, параллельная запись с
+        того же кошелька) берется sequence, который ожидает нода, и
+        отправка повторяется один раз.
+        """
+        for attempt in range(2):
+            try:
+                submitted = self.client.broadcast_tx(self._build_tx(memo, amount_code))
+            except Exception as e:
+                mismatch = _SEQUENCE_MISMATCH.search(str(e))
+                if attempt == 0 and mismatch:
+                    self._sequence = int(mismatch.group(1))
+                    continue
+                raise
+            # Транзакция принята в мемпул - следующий секрет идет со следующим sequence
+            self._sequence += 1
+            return submitted
+
+    def _confirm(self, submitted) -> Optional[int]:
+        """Ждет включения в блок; возвращает высоту (0, если неизвестна) или None."""
+        try:
+            submitted.wait_to_complete(timeout=self.confirm_timeout)
+        except Exception as e:
+            print(f"❌ tx {submitted.tx_hash} не подтверждена: {e}")
+            return None
+        return getattr(submitted.response, "height", 0) or 0
+
+    def _submit(self, payloads: Sequence[Tuple]) -> List[Tuple[object, Optional[int]]]:
+        """
+        Отправляет memo конвейером и ждет подтверждения всех транзакций.
+
+        Returns:
+            (SubmittedTx, высота) для каждого memo в исходном порядке;
+            высота None - транзакция не отправлена или не подтверждена
+        """
+        self._refresh_account()
+
+        submitted = []
+        for memo, amount_code, *_ in payloads:
+            try:
+                submitted.append(self._broadcast(memo, amount_code))
+            except Exception as e:
+                print(f"❌ Ошибка отправки: {e}")
+                submitted.append(None)
+
+        sent = [tx for tx in submitted if tx is not None]
+        print(f"📤 Отправлено {len(sent)}/{len(payloads)} транзакций, ждем подтверждения")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            confirmed = dict(zip(map(id, sent), executor.map(self._confirm, sent)))
+        return [(tx, None if tx is None else confirmed[id(tx)]) for tx in submitted]
+
+    def write_many(self, payloads: Sequence[Tuple]) -> List[Optional[str]]:
+        """
+        Записывает пачку секретов.
+
+        Args:
+            payloads: Список (memo, amount_code) или (memo, amount_code, service),
+                memo - уже зашифрованный секрет; service попадает в журнал
+                транзакций для быстрого поиска последней версии
+
+        Returns:
+            tx_hash для каждого memo в исходном порядке; None - не записано.
+            В лог транзакций попадают только подтвержденные транзакции.
+        """
+        results = self._submit(payloads)
+
+        tx_hashes = []
+        for (_, amount_code, *service), (tx, height) in zip(payloads, results):
+            if height is None:
+                tx_hashes.append(None)
+                continue
+            # Лог пишется в порядке sequence, как при последовательной записи
+            log_transaction(
+                str(self.wallet.address()), tx.tx_hash, amount_code,
+                height=height or None, secret=service[0] if service else None
+            )
+            tx_hashes.append(tx.tx_hash)
+
+        print(f"✅ Записано секретов: {sum(1 for h in tx_hashes if h)}/{len(payloads)}")
+        return tx_hashes
+
+    def write_chunked(
+        self,
+        secret_data: dict,
+        key: bytes,
+        amount_code: int = 1000,
+        max_memo_length: int = MAX_MEMO_LENGTH
+    ) -> Optional[List[str]]:
+        """
+        Записывает секрет, который не помещается в одно memo (сертификаты,
+        бандлы конфигурации). Чанки уходят конвейером со следующими sequence
+        и подтверждаются вместе, а не по одному блоку на чанк.
+
+        В журнал попадает одна запись на весь секрет: имя сервиса и хэши
+        всех чанков, по которым секрет собирается без сканирования истории.
+
+        Returns:
+            Хэши транзакций всех чанков или None, если какой-то чанк не записан
+        """
+        chunks = encode_memo_chunks(secret_data, key, max_memo_length)
+        service = secret_data.get("service")
+        if len(chunks) == 1:
+            tx_hash = self.write_many([(chunks[0], amount_code, service)])[0]
+            return None if tx_hash is None else [tx_hash]
+
+        print(f"🧩 Секрет разбит на {len(chunks)} чанк(ов)")
+        results = self._submit([(chunk, amount_code) for chunk in chunks])
+        written = sum(1 for _, height in results if height is not None)
+        if written < len(chunks):
+            print(f"❌ Записано чанков: {written}/{len(chunks)}, секрет не сохранен")
+            return None
+
+        tx_hashes = [tx.tx_hash for tx, _ in results]
+        log_transaction(
+            str(self.wallet.address()), tx_hashes[-1], amount_code,
+            height=max(height for _, height in results) or None,
+            secret=service, chunks=tx_hashes
+        )
+        print(f"✅ Секрет записан в {len(tx_hashes)} транзакций")
+        return tx_hashes
@@ -1,11 +1,39 @@
-import asyncio
-from typing import List, Dict, Optional, Tuple
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, List, Dict, Optional, Tuple
 from cosmpy.aerial.client import LedgerClient, NetworkConfig
-from cosmpy.aerial.tx import Transaction
-from cosmpy.crypto.address import Address
+from cosmpy.protos.cosmos.bank.v1beta1.tx_pb2 import MsgSend
+from cosmpy.protos.cosmos.tx.v1beta1.service_pb2 import GetTxRequest
+from google.protobuf.message import DecodeError
 import base64
 import json
-from cryptography.fernet import Fernet
+from uadia_memo import ChunkAssembler, MemoDecoder
+from uadia_metrics import METRICS, verbose
+from uadia_rpc_pool import PooledLedgerClient, RpcEndpointPool
+from uadia_secret_index import SecretIndex
+from uadia_transfer import SelfTransfer
+from uadia_tx_cache import UadiaTxCache
+
+# Размер страницы для query_txs
+PAGE_LIMIT = 50
+
+def _is_not_found(error: Exception) -> bool:
+    """
+    GetTx ответил, что транзакции нет: gRPC NOT_FOUND или 404/"not found"
+    в ошибке REST-клиента cosmpy.
+    """
+    code = getattr(error, "code", None)
+    if callable(code):
+        try:
+            code = code()
+        except Exception:
+            code = None
+    if getattr(code, "name", None) == "NOT_FOUND":
+        return True
+    text = str(error).lower()
+    return "not found" in text or "response: 404" in text
+
 
 class UadiaBlockchainSecretManager:
     """
@@ -17,149 +45,757 @@ class UadiaBlockchainSecretManager:
         self,
         rpc_url: str = "https://rpc.akashnet.net:443",
         chain_id: str = "akashnet-2",
-        wallet_prefix: str = "akash"
+        wallet_prefix: str = "akash",
+        client: Optional[LedgerClient] = None,
+        max_workers: int = 8,
+        page_retries: int = 2,
+        retry_backoff: float = 0.5,
+        window_size: int = 50_000,
+        max_window_results: int = 4 * PAGE_LIMIT,
+        cache_path: Optional[str] = None,
+        rpc_urls: Optional[List[str]] = None
     ):
         # Настройка сети Akash
-        self.network_config = NetworkConfig(
+        self.network_config = self._network_config(rpc_url, chain_id)
+        # Инициализация клиента (можно передать готовый, например для тестовой сети)
+        if client is not None:
+            self.client = client
+        elif rpc_urls:
+            # Несколько нод: запросы идут на самую здоровую, медленные хеджируются
+            self.rpc_pool = RpcEndpointPool.from_urls(
+                rpc_urls,
+                lambda url: LedgerClient(self._network_config(url, chain_id))
+            )
+            self.client = PooledLedgerClient(self.rpc_pool)
+        else:
+            self.client = LedgerClient(self.network_config)
+        self.wallet_prefix = wallet_prefix
+        
+        # Параметры параллельной пагинации
+        self.max_workers = max_workers
+        self.page_retries = page_retries
+        self.retry_backoff = retry_backoff
+        
+        # Параметры шардированного сканирования по высоте
+        self.window_size = window_size
+        self.max_window_results = max_window_results
+        
+        # Персистентный кэш self-транзакций (включается явно, например
+        # cache_path="uaia_tx_cache.sqlite"); записи разделены по chain_id
+        self._tx_cache = UadiaTxCache(cache_path, chain_id) if cache_path else None
+    
+    @staticmethod
+    def _network_config(rpc_url: str, chain_id: str) -> NetworkConfig:
+        return NetworkConfig(
             chain_id=chain_id,
             url=rpc_url,
             fee_minimum_gas_price=0.025,
             fee_denomination="uakt",
             staking_denomination="uakt",
         )
-        # Инициализация клиента
-        self.client = LedgerClient(self.network_config)
-        self.wallet_prefix = wallet_prefix
-        
-        # Локальный кэш для ускорения последующих запросов
-        self._tx_cache = {}
     
     def find_self_transfers(
         self,
         wallet_address: str,
         start_height: Optional[int] = None,
-        max_pages: int = 10
+        max_pages: int = 10,
+        concurrent: bool = True
     ) -> List[Dict]:
         """
         Ищет все транзакции, где отправитель И получатель == wallet_address.
         Возвращает список транзакций с их memo.
         
+        Первая страница запрашивается отдельно, чтобы узнать общее число
+        транзакций; остальные страницы загружаются параллельно через пул
+        потоков. Результат совпадает с последовательным обходом.
+        
+        Если задан start_height, вместо пагинации от новых транзакций
+        используется сканирование диапазона [start_height, tip] по окнам
+        высот (см. scan_height_range), и max_pages не применяется.
+        
+        При включенном кэше уже просканированные блоки берутся с диска,
+        а из сети догружаются только блоки выше закэшированного диапазона.
+        
         Args:
             wallet_address: Адрес кошелька УАДИА (akash1...)
             start_height: Блок, с которого начинать поиск (None = с генезиса)
             max_pages: Максимальное количество страниц для пагинации
+            concurrent: Загружать страницы параллельно (False = по одной)
         """
-        all_self_txs = []
-        page = 1
-        total_found = 0
+        if self._tx_cache is not None:
+            # Без start_height, как и при пагинации, - не больше max_pages страниц
+            limit = max_pages * PAGE_LIMIT if start_height is None else None
+            cached = self._find_cached(wallet_address, start_height, limit)
+            if cached is not None:
+                return cached
+        
+        if start_height is not None:
+            all_self_txs, complete, end_height = self._scan_range(
+                wallet_address, start_height
+            )
+            if complete:
+                self._store_in_cache(wallet_address, all_self_txs, start_height, end_height)
+            return all_self_txs
         
         print(f"🔍 Начинаем поиск self-транзакций для {wallet_address}")
         
+        query = self._self_transfer_query(wallet_address)
+        
+        if concurrent and self.max_workers > 1:
+            pages, complete = self._fetch_pages_concurrent(query, max_pages)
+        else:
+            pages, complete = self._fetch_pages_serial(query, max_pages)
+        
+        return self._collect_self_transfers(wallet_address, pages, complete)
+    
+    def find_self_transfers_many(
+        self,
+        wallet_addresses: List[str],
+        start_height: Optional[int] = None,
+        max_pages: int = 10
+    ) -> Dict[str, List[Dict]]:
+        """
+        Ищет self-транзакции нескольких кошельков через один пул потоков.
+        
+        Запрос событий не умеет объединять адреса через OR, поэтому каждому
+        кошельку по-прежнему нужен свой запрос; общими остаются пул потоков
+        и, при start_height, одна текущая высота и одна сетка окон
+        (см. _scan_range_many).
+        
+        Без start_height каждый кошелек проходит тот же путь, что и
+        find_self_transfers: страницы от самых новых транзакций, не больше
+        max_pages (см. _fetch_pages_many). Сканировать окнами всю историю от
+        генезиса ради нескольких последних страниц было бы на порядки дороже.
+        
+        Кошельки, которые кэш покрывает с start_height, догружаются из
+        кэша; полностью просканированные диапазоны сохраняются в кэш.
+        
+        Args:
+            wallet_addresses: Адреса кошельков
+            start_height: Блок, с которого начинать поиск (None = последние
+                max_pages страниц каждого кошелька)
+            max_pages: Максимальное количество страниц на кошелек без start_height
+            
+        Returns:
+            {адрес: self-транзакции по убыванию высоты}
+        """
+        limit = max_pages * PAGE_LIMIT if start_height is None else None
+        
+        found = {}
+        if self._tx_cache is not None:
+            for wallet_address in wallet_addresses:
+                cached = self._find_cached(wallet_address, start_height, limit)
+                if cached is not None:
+                    found[wallet_address] = cached
+        
+        rest = [address for address in wallet_addresses if address not in found]
+        if rest and start_height is None:
+            queries = {address: self._self_transfer_query(address) for address in rest}
+            fetched = self._fetch_pages_many(list(queries.values()), max_pages)
+            for wallet_address in rest:
+                pages, complete = fetched[queries[wallet_address]]
+                found[wallet_address] = self._collect_self_transfers(
+                    wallet_address, pages, complete
+                )
+        elif rest:
+            scanned, complete, end_height = self._scan_range_many(rest, start_height)
+            for wallet_address in rest:
+                txs = scanned[wallet_address]
+                if complete[wallet_address]:
+                    self._store_in_cache(wallet_address, txs, start_height, end_height)
+                found[wallet_address] = txs
+        return {address: found[address] for address in wallet_addresses}
+    
+    def _collect_self_transfers(
+        self,
+        wallet_address: str,
+        pages: List[list],
+        complete: bool
+    ) -> List[Dict]:
+        """
+        Разбирает страницы пагинации в self-транзакции и кэширует историю,
+        если она пройдена до самого начала.
+        """
+        all_self_txs = []
+        for page, txs in enumerate(pages, 1):
+            page_txs = []
+            for tx in txs:
+                tx_data = self._parse_transaction(tx, wallet_address)
+                if tx_data:
+                    page_txs.append(tx_data)
+            
+            all_self_txs.extend(page_txs)
+            if verbose():
+                print(f"📄 Страница {page}: найдено {len(page_txs)} self-транзакций")
+        
+        METRICS.inc("self_transfers", len(all_self_txs))
+        print(f"✅ Всего найдено self-транзакций: {len(all_self_txs)}")
+        
+        # Кэшируем только историю, пройденную до самого начала
+        if complete and all_self_txs:
+            end_height = all_self_txs[0]["height"] + 1
+            self._store_in_cache(wallet_address, all_self_txs, 0, end_height)
+        return all_self_txs
+    
+    def scan_new_blocks(
+        self,
+        wallet_address: str,
+        from_height: int
+    ) -> Tuple[List[Dict], int]:
+        """
+        Сканирует блоки от from_height до текущей высоты (без кэша).
+        
+        Returns:
+            (self-транзакции, высота для следующего запуска). Если часть окон
+            просканировать не удалось, высота остается равной from_height.
+        """
+        txs, complete, end_height = self._scan_range(wallet_address, from_height)
+        return txs, (end_height if complete else from_height)
+    
+    def fetch_transactions_by_hash(
+        self,
+        wallet_address: str,
+        tx_hashes: List[str]
+    ) -> List[Dict]:
+        """
+        Получает транзакции напрямую по хэшам (GetTx) через пул потоков.
+        Поиск по хэшу намного дешевле event-запроса query_txs на публичных нодах.
+        
+        Args:
+            wallet_address: Адрес кошелька УАДИА
+            tx_hashes: Хэши транзакций (например, из локального лога агента)
+            
+        Returns:
+            Self-транзакции по убыванию высоты; ненайденные хэши пропускаются
+        """
+        return self.lookup_transactions_by_hash(wallet_address, tx_hashes)[0]
+    
+    def lookup_transactions_by_hash(
+        self,
+        wallet_address: str,
+        tx_hashes: List[str]
+    ) -> Tuple[List[Dict], List[str]]:
+        """
+        То же, что fetch_transactions_by_hash, но сообщает, какие хэши
+        остались неразрешенными из-за ошибок RPC. Хэши, которых нет в сети
+        (GetTx ответил "not found"), и транзакции, не являющиеся
+        self-transfer кошелька, разрешены окончательно - повтор их не найдет.
+        
+        Returns:
+            (self-транзакции по убыванию высоты, хэши с ошибкой RPC)
+        """
+        if not tx_hashes:
+            return [], []
+        
+        print(f"⚡ Загружаем {len(tx_hashes)} транзакций по хэшам")
+        
+        workers = min(self.max_workers, len(tx_hashes))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            responses = list(pool.map(self._query_tx_safe, tx_hashes))
+        
+        found = []
+        failed = []
+        for tx_hash, (response, error) in zip(tx_hashes, responses):
+            if error:
+                failed.append(tx_hash)
+                continue
+            if response is None:
+                continue
+            tx_data = self._parse_get_tx(response, wallet_address)
+            if tx_data:
+                found.append(tx_data)
+        
+        found.sort(key=lambda tx: tx["height"], reverse=True)
+        return found, failed
+    
+    def _query_tx_safe(self, tx_hash: str) -> Tuple[Optional[object], bool]:
+        """
+        GetTx с повторами.
+        
+        LedgerClient.query_tx отдает только TxResponse (хэш, высота, логи)
+        без тела транзакции, поэтому запрос идет напрямую в сервис txs:
+        GetTxResponse содержит и tx (сообщения, memo), и tx_response.
+        
+        Returns:
+            (GetTxResponse или None, была ли ошибка RPC). Ответ "not found"
+            не повторяется и ошибкой RPC не считается.
+        """
+        attempt = 0
+        while True:
+            try:
+                with METRICS.timer("rpc_page", method="get_tx"):
+                    return self.client.txs.GetTx(GetTxRequest(hash=tx_hash)), False
+            except Exception as e:
+                if _is_not_found(e):
+                    print(f"📭 Транзакция {tx_hash[:16]}... не найдена")
+                    return None, False
+                METRICS.inc("rpc_errors", method="get_tx")
+                if attempt >= self.page_retries:
+                    print(f"⚠️ Не удалось получить транзакцию {tx_hash[:16]}...: {e}")
+                    return None, True
+                time.sleep(self.retry_backoff * (2 ** attempt))
+                attempt += 1
+    
+    def _find_cached(
+        self,
+        wallet_address: str,
+        start_height: Optional[int],
+        limit: Optional[int] = None
+    ) -> Optional[List[Dict]]:
+        """
+        Отдает транзакции из кэша (не больше limit самых новых), догрузив
+        блоки выше просканированного диапазона. Возвращает None, если кэш
+        не покрывает start_height.
+        """
+        state = self._tx_cache.sync_state(wallet_address)
+        if state is None or state[0] > (start_height or 0):
+            METRICS.inc("cache", cache="tx", result="miss")
+            return None
+        METRICS.inc("cache", cache="tx", result="hit")
+        
+        from_height, to_height = state
+        print(f"💾 Кэш покрывает блоки [{from_height}, {to_height}), догружаем новые")
+        
+        new_txs, complete, end_height = self._scan_range(wallet_address, to_height)
+        if new_txs:
+            self._tx_cache.put_many(wallet_address, new_txs)
+        if complete:
+            self._tx_cache.set_sync_state(wallet_address, from_height, end_height)
+        
+        return self._tx_cache.load(wallet_address, min_height=start_height, limit=limit)
+    
+    def _store_in_cache(
+        self,
+        wallet_address: str,
+        txs: List[Dict],
+        from_height: int,
+        to_height: int
+    ):
+        """Сохраняет полностью просканированный диапазон в кэш."""
+        if self._tx_cache is None:
+            return
+        self._tx_cache.put_many(wallet_address, txs)
+        self._tx_cache.set_sync_state(wallet_address, from_height, to_height)
+    
+    def scan_height_range(
+        self,
+        wallet_address: str,
+        start_height: int,
+        end_height: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Сканирует self-транзакции в диапазоне высот [start_height, end_height).
+        
+        Диапазон делится на окна по window_size блоков, окна сканируются
+        параллельно запросами с условием tx.height>=X AND tx.height<Y.
+        Окно, в котором найдено больше max_window_results транзакций,
+        делится пополам, так что стоимость одного запроса ограничена.
+        
+        Args:
+            wallet_address: Адрес кошелька УАДИА
+            start_height: Первый блок диапазона (включительно)
+            end_height: Конец диапазона (не включительно, None = текущая высота + 1)
+            
+        Returns:
+            Self-транзакции, отсортированные по убыванию высоты
+        """
+        all_self_txs, _, _ = self._scan_range(wallet_address, start_height, end_height)
+        return all_self_txs
+    
+    def _scan_range(
+        self,
+        wallet_address: str,
+        start_height: int,
+        end_height: Optional[int] = None
+    ) -> Tuple[List[Dict], bool, int]:
+        """
+        Реализация scan_height_range.
+        Возвращает (транзакции, просканированы ли все окна, end_height).
+        """
+        txs, complete, end_height = self._scan_range_many(
+            [wallet_address], start_height, end_height
+        )
+        return txs[wallet_address], complete[wallet_address], end_height
+    
+    def _scan_range_many(
+        self,
+        wallet_addresses: List[str],
+        start_height: int,
+        end_height: Optional[int] = None
+    ) -> Tuple[Dict[str, List[Dict]], Dict[str, bool], int]:
+        """
+        Сканирует диапазон высот для нескольких кошельков за один проход:
+        одна текущая высота, одна сетка окон и один пул потоков на всех.
+        Адреса в запросе событий не объединяются, поэтому запрос все равно
+        уходит на каждую пару (кошелек, окно).
+        Транзакция, пришедшая в ответах нескольких запросов, разбирается
+        один раз и отдается кошельку-отправителю.
+        
+        Returns:
+            ({адрес: транзакции по убыванию высоты}, {адрес: все ли окна
+            просканированы}, end_height)
+        """
+        if end_height is None:
+            end_height = self.client.query_height() + 1
+        
+        for wallet_address in wallet_addresses:
+            print(
+                f"🔍 Сканируем self-транзакции {wallet_address} "
+                f"в блоках [{start_height}, {end_height})"
+            )
+        complete = {wallet_address: True for wallet_address in wallet_addresses}
+        if start_height >= end_height:
+            return {wallet_address: [] for wallet_address in wallet_addresses}, complete, end_height
+        
+        windows = [
+            (low, min(low + self.window_size, end_height))
+            for low in range(start_height, end_height, self.window_size)
+        ]
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {}
+            for wallet_address in wallet_addresses:
+                base_query = self._self_transfer_query(wallet_address)
+                for low, high in windows:
+                    future = pool.submit(self._scan_window, base_query, low, high)
+                    pending[future] = (wallet_address, base_query, low, high)
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    wallet_address, base_query, low, high = pending.pop(future)
+                    try:
+                        txs = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Ошибка при сканировании блоков [{low}, {high}): {e}")
+                        complete[wallet_address] = False
+                        continue
+                    if txs is None:
+                        # Окно переполнено - делим пополам
+                        mid = (low + high) // 2
+                        for part in ((low, mid), (mid, high)):
+                            future = pool.submit(self._scan_window, base_query, *part)
+                            pending[future] = (wallet_address, base_query) + part
+                    else:
+                        results[(wallet_address, low)] = txs
+        
+        all_self_txs = {wallet_address: [] for wallet_address in wallet_addresses}
+        seen = set()
+        for key in sorted(results, key=lambda key: key[1], reverse=True):
+            for tx in results[key]:
+                if tx.hash in seen:
+                    continue
+                seen.add(tx.hash)
+                # Маршрутизация по отправителю: self-transfer принадлежит ему
+                messages = tx.tx.body.messages
+                sender = getattr(messages[0], "from_address", None) if messages else None
+                if sender not in all_self_txs:
+                    continue
+                tx_data = self._parse_transaction(tx, sender)
+                if tx_data:
+                    all_self_txs[sender].append(tx_data)
+        
+        for wallet_address, txs in all_self_txs.items():
+            # Окна одной высоты у разных кошельков идут вперемешку
+            txs.sort(key=lambda tx: tx["height"], reverse=True)
+            METRICS.inc("self_transfers", len(txs))
+            print(f"✅ {wallet_address}: найдено self-транзакций: {len(txs)}")
+        return all_self_txs, complete, end_height
+    
+    def _scan_window(self, base_query: str, low: int, high: int) -> Optional[list]:
+        """
+        Загружает все транзакции окна [low, high) по убыванию высоты.
+        Возвращает None, если окно нужно разделить.
+        """
+        query = f"{base_query} AND tx.height>={low} AND tx.height<{high}"
+        first = self._query_page(query, 1)
+        if not first.txs:
+            return []
+        
+        total = self._response_total(first)
+        if total is not None and total > self.max_window_results and high - low > 1:
+            return None
+        
+        txs = list(first.txs)
+        if len(first.txs) < PAGE_LIMIT:
+            return txs
+        
+        page = 2
+        while True:
+            response = self._query_page(query, page)
+            if not response.txs:
+                break
+            txs.extend(response.txs)
+            if len(response.txs) < PAGE_LIMIT:
+                break
+            page += 1
+        return txs
+    
+    @staticmethod
+    def _self_transfer_query(wallet_address: str) -> str:
+        """Запрос событий банковского перевода с участием нашего адреса."""
+        # Альтернативный, более специфичный запрос:
+        # query = "message.action='/cosmos.bank.v1beta1.MsgSend'"
+        return (
+            f"message.sender='{wallet_address}' AND "
+            f"transfer.recipient='{wallet_address}'"
+        )
+    
+    def _query_page(self, query: str, page: int):
+        """
+        Запрашивает одну страницу query_txs с повторами при ошибке.
+        Между попытками выдерживается экспоненциальная пауза.
+        """
+        attempt = 0
+        while True:
+            try:
+                with METRICS.timer("rpc_page", method="query_txs"):
+                    response = self.client.query_txs(
+                        query=query,
+                        page=page,
+                        limit=PAGE_LIMIT,
+                        order_by="desc"
+                    )
+                METRICS.inc("txs_scanned", len(response.txs))
+                return response
+            except Exception:
+                METRICS.inc("rpc_errors", method="query_txs")
+                if attempt >= self.page_retries:
+                    raise
+                time.sleep(self.retry_backoff * (2 ** attempt))
+                attempt += 1
+    
+    def _fetch_pages_serial(
+        self,
+        query: str,
+        max_pages: int,
+        first_page: int = 1
+    ) -> Tuple[List[list], bool]:
+        """
+        Последовательно загружает страницы, пока они не закончатся.
+        Возвращает (страницы, дошли ли до конца истории).
+        """
+        pages = []
+        page = first_page
+        
         while page <= max_pages:
             try:
-                # Используем низкоуровневый запрос к RPC
-                # Ищем события банковского перевода с участием нашего адреса
-                query = (
-                    f"message.sender='{wallet_address}' AND "
-                    f"transfer.recipient='{wallet_address}'"
-                )
-                
-                # Альтернативный, более специфичный запрос:
-                # query = "message.action='/cosmos.bank.v1beta1.MsgSend'"
-                
-                txs_response = self.client.query_txs(
-                    query=query,
-                    page=page,
-                    limit=50,
-                    order_by="desc"
-                )
-                
-                if not txs_response.txs:
-                    print(f"📭 Страница {page}: транзакций не найдено")
-                    break
-                
-                page_txs = []
-                for tx in txs_response.txs:
-                    tx_data = self._parse_transaction(tx, wallet_address)
-                    if tx_data:
-                        page_txs.append(tx_data)
-                        total_found += 1
+                txs_response = self._query_page(query, page)
+            except Exception as e:
+                print(f"⚠️ Ошибка при запросе страницы {page}: {e}")
+                return pages, False
+            
+            if not txs_response.txs:
+                print(f"📭 Страница {page}: транзакций не найдено")
+                return pages, True
+            
+            pages.append(list(txs_response.txs))
+            
+            # Если на странице меньше лимита, значит это последняя страница
+            if len(txs_response.txs) < PAGE_LIMIT:
+                return pages, True
+            
+            page += 1
+        
+        return pages, False
+    
+    def _fetch_pages_concurrent(
+        self,
+        query: str,
+        max_pages: int
+    ) -> Tuple[List[list], bool]:
+        """
+        Загружает первую страницу, по общему числу транзакций определяет
+        количество страниц и догружает остальные через ограниченный пул.
+        
+        Страницы склеиваются в порядке номеров (по убыванию высоты), с теми же
+        правилами остановки, что и у последовательного обхода: пустая,
+        неполная или ошибочная страница обрывает результат.
+        Возвращает (страницы, дошли ли до конца истории).
+        """
+        return self._fetch_pages_many([query], max_pages)[query]
+    
+    def _fetch_pages_many(
+        self,
+        queries: List[str],
+        max_pages: int
+    ) -> Dict[str, Tuple[List[list], bool]]:
+        """
+        Параллельная пагинация нескольких запросов через один пул: сначала
+        первые страницы всех запросов, затем по их общему числу транзакций
+        - остальные страницы всех запросов сразу.
+        
+        Returns:
+            {запрос: (страницы, дошли ли до конца истории)}
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            firsts = {query: pool.submit(self._query_page, query, 1) for query in queries}
+            
+            pending = {}
+            for query, future in firsts.items():
+                try:
+                    first = future.result()
+                except Exception as e:
+                    print(f"⚠️ Ошибка при запросе страницы 1: {e}")
+                    results[query] = ([], False)
+                    continue
                 
-                all_self_txs.extend(page_txs)
-                print(f"📄 Страница {page}: найдено {len(page_txs)} self-транзакций")
+                if not first.txs:
+                    print("📭 Страница 1: транзакций не найдено")
+                    results[query] = ([], True)
+                    continue
+                if len(first.txs) < PAGE_LIMIT:
+                    results[query] = ([list(first.txs)], True)
+                    continue
+                if max_pages <= 1:
+                    results[query] = ([list(first.txs)], False)
+                    continue
                 
-                # Если на странице меньше лимита, значит это последняя страница
-                if len(txs_response.txs) < 50:
-                    break
-                    
-                page += 1
+                total = self._response_total(first)
+                if total is None:
+                    # Нода не сообщила общее число - продолжаем по одной странице
+                    pending[query] = (first, None, pool.submit(
+                        self._fetch_pages_serial, query, max_pages, 2
+                    ))
+                    continue
                 
+                total_pages = math.ceil(total / PAGE_LIMIT)
+                page_count = min(max_pages, total_pages)
+                pending[query] = (first, page_count == total_pages, {
+                    page: pool.submit(self._query_page, query, page)
+                    for page in range(2, page_count + 1)
+                })
+            
+            for query, (first, reached_end, rest) in pending.items():
+                if reached_end is None:
+                    rest_pages, complete = rest.result()
+                    results[query] = ([list(first.txs)] + rest_pages, complete)
+                else:
+                    results[query] = self._join_pages(first, rest, reached_end)
+        return results
+    
+    @staticmethod
+    def _join_pages(first, futures: Dict, reached_end: bool) -> Tuple[List[list], bool]:
+        """
+        Склеивает страницы в порядке номеров (по убыванию высоты), с теми же
+        правилами остановки, что и у последовательного обхода.
+        """
+        pages = [list(first.txs)]
+        for page, future in futures.items():
+            try:
+                response = future.result()
             except Exception as e:
                 print(f"⚠️ Ошибка при запросе страницы {page}: {e}")
-                break
-        
-        print(f"✅ Всего найдено self-транзакций: {total_found}")
-        return all_self_txs
+                return pages, False
+            if not response.txs:
+                print(f"📭 Страница {page}: транзакций не найдено")
+                return pages, True
+            pages.append(list(response.txs))
+            if len(response.txs) < PAGE_LIMIT:
+                return pages, True
+        return pages, reached_end
+    
+    @staticmethod
+    def _response_total(txs_response) -> Optional[int]:
+        """Достает общее число найденных транзакций из ответа ноды."""
+        total = getattr(txs_response, "total_count", None)
+        if total is None:
+            pagination = getattr(txs_response, "pagination", None)
+            total = getattr(pagination, "total", None)
+        try:
+            return int(total) if total is not None else None
+        except (TypeError, ValueError):
+            return None
     
     def _parse_transaction(
         self,
         tx_response,
         wallet_address: str
-    ) -> Optional[Dict]:
+    ) -> Optional[SelfTransfer]:
         """
         Парсит транзакцию и извлекает нужные данные.
         Возвращает None, если это не self-transfer.
+        
+        Запись - SelfTransfer со __slots__ вместо словаря на каждую
+        транзакцию; memo и хэш - ссылки на строки из ответа ноды.
+        Чужие транзакции отсекаются сравнениями, без исключений.
         """
         try:
-            # Получаем Tx объект
-            tx = tx_response.tx
-            tx_hash = tx_response.hash
+            body = tx_response.tx.body
+            messages = body.messages
             
-            # Проверяем, что это банковский перевод
-            if len(tx.body.messages) == 0:
+            # Проверяем, что это банковский перевод самому себе
+            if not messages:
                 return None
-            
-            msg = tx.body.messages[0]
-            
-            # Для Akash тип сообщения о переводе
+            msg = messages[0]
             if msg.type_url != "/cosmos.bank.v1beta1.MsgSend":
                 return None
-            
-            # Декодируем данные сообщения
-            from_address = msg.from_address
-            to_address = msg.to_address
-            
-            # Проверяем, что это перевод самому себе
-            if from_address != wallet_address or to_address != wallet_address:
+            if msg.from_address != wallet_address or msg.to_address != wallet_address:
                 return None
             
             # Извлекаем сумму (первая монета в списке)
-            amount = "0"
-            if msg.amount and len(msg.amount) > 0:
-                amount = msg.amount[0].amount
-            
-            # Извлекаем memo
-            memo = tx.body.memo if tx.body.memo else ""
-            
-            return {
-                "hash": tx_hash,
-                "height": tx_response.height,
-                "amount": amount,
-                "memo": memo,
-                "from": from_address,
-                "to": to_address,
-                "timestamp": getattr(tx_response, 'timestamp', None)
-            }
+            amount = msg.amount[0].amount if msg.amount else "0"
             
-        except Exception as e:
-            print(f"⚠️ Ошибка парсинга транзакции: {e}")
+            return SelfTransfer(
+                tx_response.hash,
+                tx_response.height,
+                amount,
+                body.memo or "",
+                wallet_address,
+                getattr(tx_response, "timestamp", None)
+            )
+        except AttributeError as e:
+            # Ответ ноды без ожидаемых полей
+            if verbose():
+                print(f"⚠️ Ошибка парсинга транзакции: {e}")
             return None
     
+    def _parse_get_tx(
+        self,
+        response,
+        wallet_address: str
+    ) -> Optional[SelfTransfer]:
+        """
+        Парсит ответ GetTx. Возвращает None, если это не self-transfer.
+        
+        Сообщения в response.tx упакованы в Any и распаковываются в MsgSend;
+        хэш, высота и время блока берутся из response.tx_response.
+        """
+        body = response.tx.body
+        if not body.messages:
+            return None
+        packed = body.messages[0]
+        if packed.type_url != "/cosmos.bank.v1beta1.MsgSend":
+            return None
+        try:
+            msg = MsgSend.FromString(packed.value)
+        except DecodeError as e:
+            if verbose():
+                print(f"⚠️ Ошибка парсинга транзакции: {e}")
+            return None
+        if msg.from_address != wallet_address or msg.to_address != wallet_address:
+            return None
+        
+        meta = response.tx_response
+        return SelfTransfer(
+            meta.txhash,
+            int(meta.height),
+            msg.amount[0].amount if msg.amount else "0",
+            body.memo or "",
+            wallet_address,
+            meta.timestamp or None
+        )
+    
     def extract_and_decrypt_secrets(
         self,
         wallet_address: str,
         encryption_key: bytes,
-        start_height: Optional[int] = None
+        start_height: Optional[int] = None,
+        latest_only: bool = False,
+        services: Optional[Iterable[str]] = None,
+        max_pages: int = 10
     ) -> List[Dict]:
         """
         Основной метод: находит self-транзакции и расшифровывает их memo.
@@ -168,85 +804,279 @@ class UadiaBlockchainSecretManager:
             wallet_address: Адрес кошелька УАДИА
             encryption_key: Ключ для расшифровки (полученный из сид-фразы)
             start_height: Блок, с которого начинать поиск
+            latest_only: Вернуть только последнюю версию каждого сервиса
+            services: Нужные сервисы (включает latest_only). Страницы
+                загружаются от новых к старым, и обход останавливается,
+                как только найдены все сервисы
+            max_pages: Максимальное количество страниц для пагинации
         """
         print("=" * 60)
         print("🔐 НАЧИНАЕМ ПРОЦЕСС ИЗВЛЕЧЕНИЯ СЕКРЕТОВ УАДИА")
         print("=" * 60)
         
-        # 1. Ищем self-транзакции
-        transactions = self.find_self_transfers(
-            wallet_address=wallet_address,
-            start_height=start_height
-        )
-        
-        # 2. Расшифровываем memo
-        secrets = []
-        fernet = Fernet(encryption_key)
+        index = SecretIndex(services) if latest_only or services is not None else None
         
-        for i, tx in enumerate(transactions, 1):
-            memo = tx.get("memo", "")
-            if not memo:
-                continue
-            
-            print(f"\n[{i}] Анализ транзакции: {tx['hash'][:16]}...")
-            print(f"   Блок: {tx['height']}, Сумма: {tx['amount']} uakt")
-            
-            try:
-                # Пытаемся расшифровать
-                # Предполагаем, что memo уже в base64 (как мы сохраняли)
-                encrypted_bytes = base64.urlsafe_b64decode(memo.encode())
-                decrypted_bytes = fernet.decrypt(encrypted_bytes)
-                secret_data = json.loads(decrypted_bytes.decode())
-                
-                # Проверяем структуру данных
-                if isinstance(secret_data, dict):
-                    secrets.append({
-                        "tx_hash": tx["hash"],
-                        "block": tx["height"],
-                        "amount_code": int(tx["amount"]),
-                        "data": secret_data,
-                        "service": secret_data.get("service", "unknown"),
-                        "timestamp": tx.get("timestamp")
-                    })
-                    print(f"   ✅ УСПЕХ: {secret_data.get('service', 'секрет')}")
-                else:
-                    print(f"   ⚠️ Данные не в ожидаемом формате")
-                    
-            except (base64.binascii.Error, json.JSONDecodeError):
-                print(f"   ⚠️ Неверный формат memo")
-            except Exception as e:
-                # Любая другая ошибка (включая неверный ключ)
-                print(f"   ❌ Ошибка расшифровки: {str(e)[:50]}...")
+        if services is not None and start_height is None:
+            # Для ранней остановки страницы идут от новых к старым
+            secrets = list(self.find_latest_secrets(
+                wallet_address, encryption_key, index.requested, max_pages
+            ).values())
+            secrets.sort(key=lambda secret: secret["block"], reverse=True)
+        else:
+            # 1. Ищем self-транзакции
+            transactions = self.find_self_transfers(
+                wallet_address=wallet_address,
+                start_height=start_height,
+                max_pages=max_pages
+            )
+            # 2. Расшифровываем memo
+            secrets = self._decrypt_batches([transactions], encryption_key, index)
         
         print(f"\n{'='*60}")
         print(f"🎯 РЕЗУЛЬТАТ: Найдено и расшифровано {len(secrets)} секретов")
+        missing = index.requested - {secret["service"] for secret in secrets} if services is not None else set()
+        if missing:
+            print(f"⚠️ Не найдены сервисы: {', '.join(sorted(missing))}")
         
         # Группируем по типу сервиса
         if secrets:
-            services = {}
+            by_service = {}
             for secret in secrets:
                 svc = secret["service"]
-                services[svc] = services.get(svc, 0) + 1
+                by_service[svc] = by_service.get(svc, 0) + 1
             
             print("📊 Статистика по сервисам:")
-            for svc, count in services.items():
+            for svc, count in by_service.items():
                 print(f"   • {svc}: {count}")
         
         return secrets
-
-# Вспомогательные функции из предыдущих шагов
-def derive_key_from_seed(seed_phrase: str, salt: bytes) -> bytes:
-    """Преобразует сид-фразу в ключ шифрования (как в предыдущем коде)."""
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-    from cryptography.hazmat.primitives import hashes
-    import base64
-    
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-    )
-    key_material = seed_phrase.encode()
-    key = base64.urlsafe_b64encode(kdf.derive(key_material))
-    return key
+    
+    def find_latest_secrets(
+        self,
+        wallet_address: str,
+        encryption_key: bytes,
+        services: Iterable[str],
+        max_pages: int = 10
+    ) -> Dict[str, Dict]:
+        """
+        Ищет последние версии указанных сервисов и останавливается, как
+        только найдены все (без общей статистики extract_and_decrypt_secrets).
+        
+        Returns:
+            {service: запись секрета}; ненайденных сервисов в словаре нет
+        """
+        index = SecretIndex(services)
+        if self._tx_cache is not None and self._tx_cache.sync_state(wallet_address):
+            batches = [self.find_self_transfers(wallet_address, max_pages=max_pages)]
+        else:
+            batches = self._iter_self_transfer_pages(wallet_address, max_pages)
+        return {secret["service"]: secret for secret in self._decrypt_batches(batches, encryption_key, index)}
+    
+    def _iter_self_transfer_pages(self, wallet_address: str, max_pages: int):
+        """Отдает self-транзакции по страницам, от новых к старым."""
+        query = self._self_transfer_query(wallet_address)
+        for page in range(1, max_pages + 1):
+            try:
+                txs_response = self._query_page(query, page)
+            except Exception as e:
+                print(f"⚠️ Ошибка при запросе страницы {page}: {e}")
+                return
+            
+            page_txs = []
+            for tx in txs_response.txs:
+                tx_data = self._parse_transaction(tx, wallet_address)
+                if tx_data:
+                    page_txs.append(tx_data)
+            METRICS.inc("self_transfers", len(page_txs))
+            if verbose():
+                print(f"📄 Страница {page}: найдено {len(page_txs)} self-транзакций")
+            yield page_txs
+            
+            if len(txs_response.txs) < PAGE_LIMIT:
+                return
+    
+    @staticmethod
+    def decrypt_transactions(
+        transactions: List[Dict],
+        encryption_key: bytes,
+        latest_only: bool = False,
+        services: Optional[Iterable[str]] = None
+    ) -> List[Dict]:
+        """
+        Расшифровывает memo переданных self-транзакций.
+        Транзакции, которые не удалось расшифровать, пропускаются.
+        Чанкованные секреты собираются из своих транзакций; высота
+        такого секрета - высота последнего чанка.
+        
+        Args:
+            transactions: Транзакции из find_self_transfers / scan_height_range
+            encryption_key: Ключ для расшифровки (полученный из сид-фразы)
+            latest_only: Вернуть только последнюю версию каждого сервиса
+            services: Вернуть только эти сервисы (включает latest_only)
+        """
+        index = SecretIndex(services) if latest_only or services is not None else None
+        return UadiaBlockchainSecretManager._decrypt_batches([transactions], encryption_key, index)
+    
+    @staticmethod
+    def _decrypt_batches(
+        batches: Iterable[List[Dict]],
+        encryption_key: bytes,
+        index: Optional[SecretIndex] = None
+    ) -> List[Dict]:
+        """
+        Расшифровывает пачки транзакций (например, страницы).
+        
+        С индексом транзакции идут от новых к старым: memo v2 с тегом уже
+        найденного или ненужного сервиса пропускаются без расшифровки, а
+        когда найдены все запрошенные сервисы, обход пачек прекращается.
+        """
+        secrets = []
+        decoder = MemoDecoder(encryption_key)
+        assembler = ChunkAssembler()
+        skipped = 0
+        stale = 0
+        decrypted = 0
+        rejected = 0
+        decrypt_seconds = 0.0
+        
+        # Теги сервисов: нужные (если список задан) и уже найденные
+        wanted_tags = None
+        if index is not None and index.requested is not None:
+            wanted_tags = {decoder.tag_for(service) for service in index.requested}
+        resolved_tags = set()
+        
+        for batch in batches:
+            if index is not None:
+                batch = sorted(batch, key=lambda tx: tx["height"], reverse=True)
+            
+            for tx in batch:
+                memo = tx.get("memo", "")
+                if not memo:
+                    continue
+                
+                # Чужие memo отбрасываются по префиксу, без base64/HMAC/AES
+                if not decoder.is_candidate(memo):
+                    skipped += 1
+                    continue
+                
+                if decoder.is_chunk(memo):
+                    assembler.add(tx)
+                    continue
+                
+                if index is not None:
+                    tag = decoder.service_tag(memo)
+                    if tag is not None and (
+                        tag in resolved_tags or (wanted_tags is not None and tag not in wanted_tags)
+                    ):
+                        stale += 1
+                        continue
+                
+                started = time.perf_counter()
+                secret = UadiaBlockchainSecretManager._decrypt_memo(decoder, memo, tx)
+                decrypt_seconds += time.perf_counter() - started
+                if not secret:
+                    rejected += 1
+                    continue
+                decrypted += 1
+                if index is None:
+                    secrets.append(secret)
+                elif index.offer(secret):
+                    resolved_tags.add(decoder.tag_for(secret["service"]))
+                
+                # Незавершенный чанкованный секрет может оказаться новее
+                if index is not None and index.complete() and not assembler.missing():
+                    break
+            
+            if index is not None and index.complete() and not assembler.missing():
+                print("   ⏹️ Все запрошенные сервисы найдены, сканирование остановлено")
+                break
+        
+        chunked = 0
+        for memo, chunk_txs in assembler.completed():
+            last = max(chunk_txs, key=lambda tx: tx["height"])
+            secret = UadiaBlockchainSecretManager._decrypt_memo(decoder, memo, last)
+            if not secret:
+                rejected += 1
+                continue
+            decrypted += 1
+            # Собранное memo нужно сохранить, его нет ни в одной транзакции
+            secret["memo"] = memo
+            secret["chunk_hashes"] = [tx["hash"] for tx in chunk_txs]
+            if index is None:
+                secrets.append(secret)
+            else:
+                index.offer(secret)
+            chunked += 1
+        
+        if index is not None:
+            secrets = index.secrets()
+        elif chunked:
+            secrets.sort(key=lambda secret: secret["block"], reverse=True)
+        
+        METRICS.inc("memos", decrypted, result="decrypted")
+        METRICS.inc("memos", rejected, result="rejected")
+        METRICS.inc("memos", skipped, result="foreign")
+        METRICS.inc("memos", stale, result="stale")
+        METRICS.observe("decrypt", decrypt_seconds)
+        
+        if chunked:
+            print(f"   🧩 Собрано чанкованных секретов: {chunked}")
+        if assembler.missing():
+            print(f"   ⚠️ Неполных чанкованных секретов: {assembler.missing()}")
+        if skipped:
+            print(f"   ⏭️ Пропущено чужих memo: {skipped}")
+        if stale:
+            print(f"   ⏭️ Пропущено старых версий без расшифровки: {stale}")
+        return secrets
+    
+    @staticmethod
+    def _decrypt_memo(
+        decoder: MemoDecoder,
+        memo: str,
+        tx: Dict
+    ) -> Optional[Dict]:
+        """Расшифровывает одно memo; None, если это не наш секрет."""
+        try:
+            secret_data = decoder.decode(memo)
+            
+            # Проверяем структуру данных
+            if isinstance(secret_data, dict):
+                if verbose():
+                    print(f"   ✅ [{tx['height']}] {secret_data.get('service', 'секрет')}")
+                return {
+                    "tx_hash": tx["hash"],
+                    "block": tx["height"],
+                    "amount_code": int(tx["amount"]),
+                    "data": secret_data,
+                    "service": secret_data.get("service", "unknown"),
+                    "timestamp": tx.get("timestamp")
+                }
+            if verbose():
+                print(f"   ⚠️ [{tx['height']}] Данные не в ожидаемом формате")
+                
+        except (base64.binascii.Error, json.JSONDecodeError):
+            if verbose():
+                print(f"   ⚠️ [{tx['height']}] Неверный формат memo")
+        except Exception as e:
+            # Любая другая ошибка (включая неверный ключ)
+            if verbose():
+                print(f"   ❌ [{tx['height']}] Ошибка расшифровки: {str(e)[:50]}...")
+        return None
+    
+    def fetch_chunked_secret(
+        self,
+        wallet_address: str,
+        chunk_hashes: List[str],
+        encryption_key: bytes
+    ) -> Optional[Dict]:
+        """
+        Загружает чанки секрета параллельно по хэшам и собирает секрет.
+        
+        Args:
+            wallet_address: Адрес кошелька УАДИА
+            chunk_hashes: Хэши транзакций всех чанков (из лога агента)
+            encryption_key: Ключ для расшифровки
+        """
+        transactions = self.fetch_transactions_by_hash(wallet_address, chunk_hashes)
+        secrets = self.decrypt_transactions(transactions, encryption_key)
+        return secrets[0] if secrets else None
@@ -0,0 +1,91 @@
+"""
+Восстановление секретов всего флота агентов УАДИА за один проход.
+
+У каждого агента (architect, infra, security, deploy, monitor) свой
+кошелек. Вместо отдельного UadiaBlockchainSecretManager и клиента на
+каждого агента флот использует один менеджер: общий клиент (или пул
+RPC-нод), одну текущую высоту и одну сетку окон, общий пул потоков и кэш.
+Транзакции разбираются один раз и маршрутизируются по адресу
+отправителя, после чего каждый кошелек расшифровывается своим ключом.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+
+
+class FleetRestorer:
+    """
+    Восстанавливает секреты нескольких кошельков через один менеджер.
+
+    Args:
+        manager: Общий UadiaBlockchainSecretManager (по умолчанию создается по rpc_url)
+        rpc_url: RPC-нода Akash
+        max_workers: Сколько кошельков обрабатывается одновременно
+    """
+
+    def __init__(
+        self,
+        manager: Optional[UadiaBlockchainSecretManager] = None,
+        rpc_url: str = "https://rpc.akashnet.net:443",
+        max_workers: int = 8
+    ):
+        self.manager = manager or UadiaBlockchainSecretManager(rpc_url=rpc_url)
+        self.max_workers = max_workers
+
+    def find_fleet_transfers(
+        self,
+        addresses: List[str],
+        start_height: Optional[int] = None,
+        max_pages: int = 10
+    ) -> Dict[str, List[Dict]]:
+        """
+        Ищет self-транзакции всех кошельков через общий пул потоков
+        (см. UadiaBlockchainSecretManager.find_self_transfers_many).
+        С start_height диапазон сканируется по окнам высот, без него каждый
+        кошелек получает до max_pages страниц самых новых self-транзакций.
+
+        Returns:
+            {адрес: self-транзакции по убыванию высоты}
+        """
+        if not addresses:
+            return {}
+        return self.manager.find_self_transfers_many(addresses, start_height, max_pages)
+
+    def restore(
+        self,
+        wallets: Sequence[Tuple[str, bytes]],
+        start_height: Optional[int] = None,
+        latest_only: bool = True,
+        max_pages: int = 10
+    ) -> Dict[str, List[Dict]]:
+        """
+        Восстанавливает секреты флота.
+
+        Args:
+            wallets: Пары (адрес, ключ расшифровки)
+            start_height: Блок, с которого начинать поиск (None = вся история)
+            latest_only: Только последняя версия каждого сервиса
+            max_pages: Максимум страниц на кошелек без start_height
+
+        Returns:
+            {адрес: секреты кошелька}
+        """
+        keys = dict(wallets)
+        if not keys:
+            return {}
+        print(f"🚀 Восстановление флота: {len(keys)} кошельков")
+        transfers = self.find_fleet_transfers(list(keys), start_height, max_pages)
+
+        # Расшифровка (AES/HMAC в OpenSSL) отпускает GIL - кошельки параллельно
+        def decrypt(address: str) -> List[Dict]:
+            return self.manager.decrypt_transactions(
+                transfers.get(address, []), keys[address], latest_only=latest_only
+            )
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as pool:
+            secrets = dict(zip(keys, pool.map(decrypt, keys)))
+
+        for address, found in secrets.items():
+            print(f"   👛 {address}: {len(found)} секретов")
+        return secrets
@@ -0,0 +1,255 @@
+"""
+Схема Шамира над полем GF(2^8), побайтно и векторизованно через NumPy.
+
+Каждый байт секрета делится независимо: для байта строится случайный
+многочлен степени k-1, доля агента x - значения многочленов в точке x.
+Умножение в поле выполняется по таблицам логарифмов/антилогарифмов
+(многочлен AES 0x11b, порождающий элемент 3), поэтому стоимость линейна
+по длине секрета и не зависит от больших целых чисел.
+"""
+import os
+from typing import BinaryIO, Iterator, List, Tuple
+
+import numpy as np
+
+# Формат доли: "gf-<x>-<hex>"; старые доли secretsharing выглядят как "<x>-<hex>"
+SHARE_PREFIX = "gf-"
+
+# Заголовок потоковой доли: магия + номер доли x + порог k
+STREAM_MAGIC = b"UGF1"
+STREAM_HEADER_SIZE = len(STREAM_MAGIC) + 2
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _build_tables() -> Tuple[np.ndarray, np.ndarray]:
+    exp = np.zeros(510, dtype=np.uint8)
+    log = np.zeros(256, dtype=np.int32)
+    value = 1
+    for power in range(255):
+        exp[power] = value
+        log[value] = power
+        # Умножение на 3 = value * 2 XOR value, с редукцией по 0x11b
+        doubled = value << 1
+        if doubled & 0x100:
+            doubled ^= 0x11B
+        value = doubled ^ value
+    exp[255:] = exp[:255]
+    return exp, log
+
+
+_EXP, _LOG = _build_tables()
+
+# Полная таблица умножения 256x256: _MUL[a][b] = a * b в GF(2^8)
+_MUL = _EXP[_LOG[:, None] + _LOG[None, :]]
+_MUL[0, :] = 0
+_MUL[:, 0] = 0
+
+
+def gf_mul(a: int, b: int) -> int:
+    return int(_MUL[a, b])
+
+
+def gf_inv(a: int) -> int:
+    if a == 0:
+        raise ZeroDivisionError("0 не имеет обратного в GF(2^8)")
+    return int(_EXP[255 - _LOG[a]])
+
+
+def split_bytes(secret, k: int, n: int) -> List[Tuple[int, np.ndarray]]:
+    """
+    Делит байты секрета на n долей с порогом k.
+
+    Args:
+        secret: bytes-подобный объект (bytes, bytearray, memoryview)
+        k: Порог восстановления
+        n: Количество долей (не больше 255)
+
+    Returns:
+        Список (x, y), где y - массив uint8 той же длины, что и секрет
+    """
+    if not 1 <= k <= n <= 255:
+        raise ValueError(f"Недопустимые параметры схемы: k={k}, n={n}")
+
+    data = np.frombuffer(secret, dtype=np.uint8)
+    length = data.shape[0]
+    coeffs = np.frombuffer(os.urandom((k - 1) * length), dtype=np.uint8)
+    coeffs = coeffs.reshape(k - 1, length)
+
+    shares = []
+    for x in range(1, n + 1):
+        row = _MUL[x]
+        # Схема Горнера: f(x) = data + c1*x + ... + c_{k-1}*x^(k-1)
+        y = data.copy() if k == 1 else coeffs[k - 2].copy()
+        for i in range(k - 3, -1, -1):
+            y = row[y] ^ coeffs[i]
+        if k > 1:
+            y = row[y] ^ data
+        shares.append((x, y))
+    return shares
+
+
+def combine_bytes(shares: List[Tuple[int, object]]) -> bytes:
+    """
+    Восстанавливает секрет интерполяцией Лагранжа в точке 0.
+
+    Args:
+        shares: Список (x, y), y - bytes-подобный объект или массив uint8;
+            количество долей должно быть не меньше порога
+    """
+    if not shares:
+        raise ValueError("Нет долей для восстановления")
+
+    xs = [x for x, _ in shares]
+    if len(set(xs)) != len(xs) or 0 in xs:
+        raise ValueError("Номера долей должны быть уникальными и ненулевыми")
+
+    ys = [np.frombuffer(y, dtype=np.uint8) for _, y in shares]
+    length = ys[0].shape[0]
+    if any(y.shape[0] != length for y in ys):
+        raise ValueError("Доли имеют разную длину")
+
+    result = np.zeros(length, dtype=np.uint8)
+    for i, xi in enumerate(xs):
+        # Базисный коэффициент l_i(0) = prod x_j / (x_j - x_i); вычитание = XOR
+        basis = 1
+        for j, xj in enumerate(xs):
+            if i != j:
+                basis = gf_mul(basis, gf_mul(xj, gf_inv(xj ^ xi)))
+        result ^= _MUL[basis][ys[i]]
+    return result.tobytes()
+
+
+def format_share(x: int, y) -> str:
+    return f"{SHARE_PREFIX}{x}-{bytes(y).hex()}"
+
+
+def parse_share(share: str) -> Tuple[int, bytes]:
+    if not is_gf256_share(share):
+        raise ValueError("Доля не в формате GF(256)")
+    x, hex_data = share[len(SHARE_PREFIX):].split("-", 1)
+    return int(x), bytes.fromhex(hex_data)
+
+
+def is_gf256_share(share: str) -> bool:
+    return share.startswith(SHARE_PREFIX)
+
+
+def split_stream(
+    source,
+    outputs: List[BinaryIO],
+    k: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Делит поток или буфер на len(outputs) долей, по одной в каждый поток.
+
+    Данные читаются кусками по chunk_size байт в один переиспользуемый
+    буфер, поэтому память не зависит от размера входа.
+
+    Args:
+        source: Бинарный файл (readinto/read) или bytes-подобный буфер
+        outputs: Потоки для записи долей (доля x = i + 1 пишется в outputs[i])
+        k: Порог восстановления
+        chunk_size: Размер куска в байтах
+
+    Returns:
+        Количество обработанных байт секрета
+    """
+    n = len(outputs)
+    if not 1 <= k <= n <= 255:
+        raise ValueError(f"Недопустимые параметры схемы: k={k}, n={n}")
+
+    for x, out in enumerate(outputs, 1):
+        out.write(STREAM_MAGIC + bytes([x, k]))
+
+    total = 0
+    for chunk in _iter_chunks(source, chunk_size):
+        for (_, y), out in zip(split_bytes(chunk, k, n), outputs):
+            out.write(y)
+        total += len(chunk)
+    return total
+
+
+def combine_stream(
+    inputs: List[BinaryIO],
+    output: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Восстанавливает секрет из потоковых долей и пишет его в output.
+
+    Args:
+        inputs: Потоки долей (не меньше порога k, записанного в заголовке)
+        output: Поток для восстановленного секрета
+        chunk_size: Размер куска в байтах
+
+    Returns:
+        Количество восстановленных байт
+    """
+    xs = []
+    thresholds = set()
+    for stream in inputs:
+        header = stream.read(STREAM_HEADER_SIZE)
+        if len(header) != STREAM_HEADER_SIZE or not header.startswith(STREAM_MAGIC):
+            raise ValueError("Поток не является долей GF(256)")
+        xs.append(header[-2])
+        thresholds.add(header[-1])
+
+    if len(thresholds) != 1:
+        raise ValueError("Доли относятся к разным схемам")
+    k = thresholds.pop()
+    if len(inputs) < k:
+        raise ValueError(f"Недостаточно долей: нужно {k}, получено {len(inputs)}")
+
+    streams = inputs[:k]
+    xs = xs[:k]
+    buffers = [bytearray(chunk_size) for _ in streams]
+    views = [memoryview(buffer) for buffer in buffers]
+
+    total = 0
+    while True:
+        sizes = [_read_exact(stream, view) for stream, view in zip(streams, views)]
+        if len(set(sizes)) != 1:
+            raise ValueError("Доли имеют разную длину")
+        size = sizes[0]
+        if size == 0:
+            break
+        output.write(combine_bytes([(x, view[:size]) for x, view in zip(xs, views)]))
+        total += size
+        if size < chunk_size:
+            break
+    return total
+
+
+def _iter_chunks(source, chunk_size: int) -> Iterator[memoryview]:
+    """Отдает куски источника как memoryview без копирования."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+        return
+
+    view = memoryview(bytearray(chunk_size))
+    while True:
+        size = _read_exact(source, view)
+        if size == 0:
+            return
+        yield view[:size]
+        if size < chunk_size:
+            return
+
+
+def _read_exact(stream: BinaryIO, view: memoryview) -> int:
+    """Заполняет view из потока целиком; меньше байт - только в конце потока."""
+    filled = 0
+    while filled < len(view):
+        if hasattr(stream, "readinto"):
+            size = stream.readinto(view[filled:])
+        else:
+            data = stream.read(len(view) - filled)
+            size = len(data)
+            view[filled:filled + size] = data
+        if not size:
+            break
+        filled += size
+    return filled
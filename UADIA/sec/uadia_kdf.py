@@ -0,0 +1,159 @@
+"""
+Общая функция получения ключа из сид-фразы для всех модулей УАДИА.
+
+PBKDF2 со 100 000 итераций стоит десятки миллисекунд, поэтому производные
+ключи запоминаются в процессе (LRU ограниченного размера). Одновременные
+промахи по одному ключу ждут единственный запуск PBKDF2.
+
+Кэш хранит ключи в bytearray и затирает их нулями при вытеснении и при
+завершении процесса. Это защищает только копию в кэше: вызывающий код
+получает неизменяемые bytes (их требует Fernet), и эти копии, как и
+промежуточный результат PBKDF2, затереть нельзя - они живут, пока на них
+есть ссылки.
+"""
+import atexit
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from uadia_metrics import METRICS
+
+DEFAULT_ITERATIONS = 100000
+DEFAULT_CACHE_SIZE = 32
+
+# Случайный ключ процесса: ключ кэша не позволяет проверить сид-фразу офлайн
+_PROCESS_SECRET = os.urandom(32)
+
+
+class _DerivedKeyCache:
+    """
+    LRU-кэш производных ключей с затиранием при вытеснении.
+    Отдает копии bytes; затирается только bytearray внутри кэша.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._keys: "OrderedDict[bytes, bytearray]" = OrderedDict()
+        self._pending: Dict[bytes, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: bytes, derive: Callable[[], bytes]) -> bytes:
+        """
+        Ключ из кэша или результат derive(). Потоки, промахнувшиеся по
+        одному digest, ждут друг друга на замке этого digest, так что
+        derive() выполняется один раз.
+        """
+        key = self._lookup(digest)
+        if key is not None:
+            return key
+
+        with self._lock:
+            pending = self._pending.setdefault(digest, threading.Lock())
+        try:
+            with pending:
+                key = self._lookup(digest)
+                if key is not None:
+                    return key
+                with self._lock:
+                    self.misses += 1
+                METRICS.inc("cache", cache="kdf", result="miss")
+                key = derive()
+                self._put(digest, key)
+                return key
+        finally:
+            with self._lock:
+                if self._pending.get(digest) is pending:
+                    del self._pending[digest]
+
+    def _lookup(self, digest: bytes) -> Optional[bytes]:
+        with self._lock:
+            key = self._keys.get(digest)
+            if key is None:
+                return None
+            self._keys.move_to_end(digest)
+            self.hits += 1
+        METRICS.inc("cache", cache="kdf", result="hit")
+        return bytes(key)
+
+    def _put(self, digest: bytes, key: bytes):
+        with self._lock:
+            if digest in self._keys:
+                self._keys.move_to_end(digest)
+                return
+            self._keys[digest] = bytearray(key)
+            while len(self._keys) > self.maxsize:
+                _, evicted = self._keys.popitem(last=False)
+                _wipe(evicted)
+
+    def clear(self):
+        with self._lock:
+            for key in self._keys.values():
+                _wipe(key)
+            self._keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _wipe(buffer: bytearray):
+    for i in range(len(buffer)):
+        buffer[i] = 0
+
+
+_cache = _DerivedKeyCache(DEFAULT_CACHE_SIZE)
+atexit.register(_cache.clear)
+
+
+def _cache_digest(seed_phrase: str, salt: bytes, iterations: int) -> bytes:
+    mac = hmac.new(_PROCESS_SECRET, digestmod=hashlib.sha256)
+    for part in (seed_phrase.encode(), salt, str(iterations).encode()):
+        mac.update(len(part).to_bytes(4, "big"))
+        mac.update(part)
+    return mac.digest()
+
+
+def derive_key_from_seed(
+    seed_phrase: str,
+    salt: bytes,
+    iterations: int = DEFAULT_ITERATIONS
+) -> bytes:
+    """
+    Преобразует сид-фразу (или пароль агента) в ключ Fernet.
+    Повторный вызов с теми же аргументами берет ключ из кэша процесса.
+    Возвращает копию ключа: затереть ее после использования нельзя.
+    """
+    def derive() -> bytes:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=iterations,
+        )
+        key_material = seed_phrase.encode()
+        with METRICS.timer("kdf"):
+            return base64.urlsafe_b64encode(kdf.derive(key_material))
+
+    return _cache.get(_cache_digest(seed_phrase, salt, iterations), derive)
+
+
+def kdf_cache_info() -> Dict[str, int]:
+    """Статистика кэша: попадания, промахи (= запуски PBKDF2) и размер."""
+    return {
+        "hits": _cache.hits,
+        "misses": _cache.misses,
+        "size": len(_cache._keys),
+        "maxsize": _cache.maxsize,
+    }
+
+
+def clear_kdf_cache():
+    """Затирает и удаляет все запомненные ключи, обнуляет статистику."""
+    _cache.clear()
@@ -0,0 +1,203 @@
+"""
+Ленивое получение секретов УАДИА по запросу.
+
+Вместо расшифровки всей истории при старте агент вызывает get(service)
+в момент первого использования секрета:
+1. значение из памяти, если TTL не истек;
+2. последняя транзакция сервиса из журнала транзакций (индекс, GetTx по хэшу);
+3. ограниченное сканирование от новых страниц к старым до первой версии сервиса.
+Расшифровывается только memo найденной версии. Стоимость старта - создание
+объекта, без сетевых запросов.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_tx_log import open_transaction_log, transaction_log_path
+
+SOURCE_MEMORY = "memory"
+SOURCE_LOG = "log"
+SOURCE_SCAN = "scan"
+
+# Маркер "сервис не найден" в кэше (отличается от отсутствия записи)
+_NOT_FOUND = object()
+
+
+class LazySecretStore:
+    """
+    Кэш секретов с загрузкой по требованию.
+
+    Args:
+        wallet_address: Адрес кошелька УАДИА
+        encryption_key: Ключ расшифровки (из derive_key_from_seed)
+        chain_manager: Готовый UadiaBlockchainSecretManager (по умолчанию создается по rpc_url)
+        rpc_url: RPC-нода Akash
+        ttl: Сколько секунд найденный секрет отдается из памяти
+        negative_ttl: Сколько секунд помнить, что сервис не найден
+        scan_pages: Сколько страниц истории просматривать, если в логе нет записи
+        log_path: Журнал транзакций (по умолчанию журнал агента)
+        clock: Источник времени (time.monotonic)
+    """
+
+    def __init__(
+        self,
+        wallet_address: str,
+        encryption_key: bytes,
+        chain_manager: Optional[UadiaBlockchainSecretManager] = None,
+        rpc_url: str = "https://rpc.akashnet.net:443",
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        scan_pages: int = 5,
+        log_path: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.address = wallet_address
+        self.key = encryption_key
+        self.rpc_url = rpc_url
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.scan_pages = scan_pages
+        self.log_path = log_path or transaction_log_path(wallet_address)
+        self.clock = clock
+        self._chain_manager = chain_manager
+
+        # {service: (запись секрета или _NOT_FOUND, момент истечения)}
+        self._entries: Dict[str, tuple] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        # Задержка первого обращения к каждому сервису и источник значения
+        self.first_use_latency: Dict[str, float] = {}
+        self.first_use_source: Dict[str, str] = {}
+        self.counters = {
+            "hits": 0, "misses": 0, "log": 0, "scan": 0, "not_found": 0, "errors": 0
+        }
+
+    @property
+    def chain_manager(self) -> UadiaBlockchainSecretManager:
+        # Клиент сети создается при первом промахе, а не при старте агента
+        if self._chain_manager is None:
+            self._chain_manager = UadiaBlockchainSecretManager(rpc_url=self.rpc_url)
+        return self._chain_manager
+
+    def get(self, service: str) -> Optional[Dict]:
+        """
+        Возвращает данные секрета сервиса или None, если он не найден.
+        Параллельные запросы одного сервиса ждут одну загрузку.
+        """
+        started = time.perf_counter()
+        record = self._cached(service)
+        if record is not None:
+            self._count("hits")
+            self._note_first_use(service, started, SOURCE_MEMORY)
+            return None if record is _NOT_FOUND else record["data"]
+
+        with self._service_lock(service):
+            # Пока ждали блокировку, сервис мог загрузить другой поток
+            record = self._cached(service)
+            if record is None:
+                self._count("misses")
+                record, source = self._resolve(service)
+            else:
+                source = SOURCE_MEMORY
+                self._count("hits")
+
+        self._note_first_use(service, started, source)
+        return None if record is _NOT_FOUND else record["data"]
+
+    def get_record(self, service: str) -> Optional[Dict]:
+        """Как get, но возвращает запись целиком (tx_hash, block, amount_code, data)."""
+        if self.get(service) is None:
+            return None
+        record = self._cached(service)
+        return None if record in (None, _NOT_FOUND) else record
+
+    def invalidate(self, service: Optional[str] = None):
+        """Сбрасывает кэш сервиса (или весь кэш), следующий get перечитает сеть."""
+        with self._lock:
+            if service is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(service, None)
+
+    def stats(self) -> Dict:
+        """Счетчики кэша и задержки первого обращения (секунды)."""
+        with self._lock:
+            return {
+                **self.counters,
+                "cached": sum(1 for record, _ in self._entries.values() if record is not _NOT_FOUND),
+                "first_use_latency": dict(self.first_use_latency),
+                "first_use_source": dict(self.first_use_source),
+            }
+
+    def _resolve(self, service: str):
+        """Ищет последнюю версию сервиса: журнал, затем ограниченное сканирование."""
+        try:
+            record = self._from_log(service)
+            source = SOURCE_LOG
+            if record is None:
+                found = self.chain_manager.find_latest_secrets(
+                    self.address, self.key, [service], max_pages=self.scan_pages
+                )
+                record = found.get(service)
+                source = SOURCE_SCAN
+        except Exception as e:
+            # Ошибка сети не кэшируется - следующий get попробует снова
+            self._count("errors")
+            print(f"❌ Не удалось получить секрет '{service}': {e}")
+            return _NOT_FOUND, SOURCE_SCAN
+
+        if record is None:
+            self._count("not_found")
+            self._store(service, _NOT_FOUND, self.negative_ttl)
+            print(f"⚠️ Секрет '{service}' не найден")
+            return _NOT_FOUND, source
+
+        self._count(source)
+        self._store(service, record, self.ttl)
+        return record, source
+
+    def _from_log(self, service: str) -> Optional[Dict]:
+        if not os.path.exists(self.log_path):
+            return None
+        entry = open_transaction_log(self.address, self.log_path).latest(service)
+        if entry is None:
+            return None
+
+        manager = self.chain_manager
+        # У секрета из нескольких транзакций в записи лежат хэши всех чанков
+        hashes = entry.get("chunks") or [entry["tx"]]
+        transactions = manager.fetch_transactions_by_hash(self.address, hashes)
+        secrets = manager.decrypt_transactions(transactions, self.key, services=[service])
+        return secrets[0] if secrets else None
+
+    def _cached(self, service: str):
+        with self._lock:
+            entry = self._entries.get(service)
+            if entry is None:
+                return None
+            record, expires_at = entry
+            if self.clock() >= expires_at:
+                del self._entries[service]
+                return None
+            return record
+
+    def _store(self, service: str, record, ttl: float):
+        with self._lock:
+            self._entries[service] = (record, self.clock() + ttl)
+
+    def _service_lock(self, service: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(service, threading.Lock())
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _note_first_use(self, service: str, started: float, source: str):
+        with self._lock:
+            if service not in self.first_use_latency:
+                self.first_use_latency[service] = time.perf_counter() - started
+                self.first_use_source[service] = source
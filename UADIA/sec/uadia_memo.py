@@ -0,0 +1,319 @@
+"""
+Формат memo с секретами УАДИА.
+
+Версия 1: "u1:<fingerprint>:<payload>", где fingerprint - 8 hex-символов
+отпечатка ключа, payload - прежний base64(Fernet(json)). По префиксу
+сканер отбрасывает чужие memo одним сравнением строк, без base64, HMAC
+и AES. Старые memo без префикса по-прежнему читаются.
+
+Версия 2 (компактная): "u2:<fingerprint>:<base64url(header | nonce | ct)>".
+Вместо двойного base64 поверх Fernet - сырой AES-GCM с бинарным
+заголовком (версия, флаги) и одним слоем base64url без выравнивания;
+JSON при выгоде сжимается zlib. Заголовок и текстовый префикс входят в AAD.
+base85 был бы на 6% короче, но его декодер в stdlib написан на Python
+и медленнее самой расшифровки.
+
+Если в секрете есть поле "service", в заголовок v2 добавляется тег
+сервиса - 4 байта HMAC от имени сервиса на отдельном ключе. Тег читается
+без расшифровки, и сканер, идущий от новых транзакций к старым,
+пропускает старые версии уже найденного сервиса. Без ключа тег не
+раскрывает имя сервиса, но показывает, какие memo относятся к одному.
+
+Чанки: memo длиннее лимита сети делится на части
+"uc:<fingerprint>:<secret_id>:<index>:<count>:<digest>:<piece>",
+каждая часть уходит отдельной self-транзакцией. digest - первые 8
+hex-символов SHA-256 исходного memo, по нему проверяется сборка.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+MEMO_V1 = "u1"
+MEMO_V2 = "u2"
+MEMO_CHUNK = "uc"
+
+# Лимит memo в Cosmos SDK по умолчанию (параметр auth.max_memo_characters)
+MAX_MEMO_LENGTH = 256
+
+# Бинарный заголовок версии 2: байт версии + байт флагов
+_V2_VERSION = 2
+_FLAG_ZLIB = 0x01
+_FLAG_TAG = 0x02
+_NONCE_SIZE = 12
+_TAG_SIZE = 4
+
+# base64(base64(Fernet)): токен Fernet начинается с байта версии 0x80 и
+# старших нулевых байт времени, то есть с "gAAAAA" -> "Z0FBQUFB"
+LEGACY_PREFIX = "Z0FBQUFB"
+
+
+def key_fingerprint(key: bytes) -> str:
+    """Короткий отпечаток ключа для префикса memo (не раскрывает ключ)."""
+    return hashlib.sha256(b"uaia-memo-fp:" + key).hexdigest()[:8]
+
+
+def _memo_aead(key: bytes) -> AESGCM:
+    """Отдельный ключ AES-GCM для memo v2, выведенный из ключа Fernet."""
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"uaia-memo-v2",
+    )
+    return AESGCM(hkdf.derive(base64.urlsafe_b64decode(key)))
+
+
+def _tag_key(key: bytes) -> bytes:
+    """Ключ тегов сервисов, выведенный из ключа Fernet."""
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b"uaia-memo-tag",
+    )
+    return hkdf.derive(base64.urlsafe_b64decode(key))
+
+
+def _service_tag(tag_key: bytes, service: str) -> bytes:
+    return hmac.new(tag_key, service.encode(), hashlib.sha256).digest()[:_TAG_SIZE]
+
+
+def encode_memo(secret_data: dict, key: bytes, version: int = 2) -> str:
+    """
+    Шифрует словарь секрета и упаковывает его в memo.
+
+    Args:
+        secret_data: Данные секрета
+        key: Ключ Fernet (из derive_key_from_seed)
+        version: 2 - компактный формат, 1 - Fernet с префиксом
+    """
+    fingerprint = key_fingerprint(key)
+    plaintext = json.dumps(secret_data, separators=(",", ":")).encode()
+
+    if version == 1:
+        payload = base64.urlsafe_b64encode(Fernet(key).encrypt(plaintext)).decode()
+        return f"{MEMO_V1}:{fingerprint}:{payload}"
+
+    flags = 0
+    compressed = zlib.compress(plaintext, 9)
+    if len(compressed) < len(plaintext):
+        plaintext, flags = compressed, flags | _FLAG_ZLIB
+
+    tag = b""
+    service = secret_data.get("service")
+    if isinstance(service, str):
+        tag, flags = _service_tag(_tag_key(key), service), flags | _FLAG_TAG
+
+    prefix = f"{MEMO_V2}:{fingerprint}:"
+    header = bytes([_V2_VERSION, flags]) + tag
+    nonce = os.urandom(_NONCE_SIZE)
+    ciphertext = _memo_aead(key).encrypt(nonce, plaintext, prefix.encode() + header)
+    body = base64.urlsafe_b64encode(header + nonce + ciphertext).rstrip(b"=")
+    return prefix + body.decode()
+
+
+def encode_memo_chunks(
+    secret_data: dict,
+    key: bytes,
+    max_length: int = MAX_MEMO_LENGTH
+) -> List[str]:
+    """
+    Шифрует секрет и, если memo не помещается в лимит, делит его на чанки.
+
+    Returns:
+        Список memo для отдельных self-транзакций (один элемент, если
+        секрет помещается целиком)
+    """
+    memo = encode_memo(secret_data, key)
+    if len(memo) <= max_length:
+        return [memo]
+
+    fingerprint = key_fingerprint(key)
+    secret_id = os.urandom(4).hex()
+    digest = hashlib.sha256(memo.encode()).hexdigest()[:8]
+
+    # Длина заголовка зависит от числа чанков - подбираем с запасом по разрядам
+    count = 1
+    while True:
+        header_length = len(
+            f"{MEMO_CHUNK}:{fingerprint}:{secret_id}:{count - 1}:{count}:{digest}:"
+        )
+        piece_length = max_length - header_length
+        if piece_length <= 0:
+            raise ValueError(f"Лимит memo {max_length} слишком мал для чанков")
+        needed = -(-len(memo) // piece_length)
+        if needed <= count:
+            break
+        count = needed
+
+    pieces = [memo[i:i + piece_length] for i in range(0, len(memo), piece_length)]
+    return [
+        f"{MEMO_CHUNK}:{fingerprint}:{secret_id}:{index}:{len(pieces)}:{digest}:{piece}"
+        for index, piece in enumerate(pieces)
+    ]
+
+
+class ChunkAssembler:
+    """
+    Собирает чанкованные секреты из self-транзакций.
+    Транзакции можно добавлять в любом порядке.
+    """
+
+    def __init__(self):
+        self._groups: Dict[Tuple[str, str], Dict] = {}
+
+    def add(self, tx: Dict) -> bool:
+        """Добавляет транзакцию с чанком; False, если memo - не чанк."""
+        parts = tx.get("memo", "").split(":", 6)
+        if len(parts) != 7 or parts[0] != MEMO_CHUNK:
+            return False
+        _, _, secret_id, index, count, digest, piece = parts
+        try:
+            index, count = int(index), int(count)
+        except ValueError:
+            return False
+        if not 0 <= index < count:
+            return False
+
+        group = self._groups.setdefault(
+            (secret_id, digest), {"count": count, "pieces": {}, "txs": {}}
+        )
+        if group["count"] != count:
+            return False
+        group["pieces"][index] = piece
+        group["txs"][index] = tx
+        return True
+
+    def completed(self) -> List[Tuple[str, List[Dict]]]:
+        """
+        Возвращает собранные memo и транзакции их чанков (по порядку).
+        Группы с несовпавшим digest отбрасываются.
+        """
+        result = []
+        for (_, digest), group in self._groups.items():
+            if len(group["pieces"]) != group["count"]:
+                continue
+            memo = "".join(group["pieces"][i] for i in range(group["count"]))
+            if hashlib.sha256(memo.encode()).hexdigest()[:8] != digest:
+                continue
+            result.append((memo, [group["txs"][i] for i in range(group["count"])]))
+        return result
+
+    def missing(self) -> int:
+        """Сколько групп еще не собрано целиком."""
+        return sum(
+            1 for group in self._groups.values()
+            if len(group["pieces"]) != group["count"]
+        )
+
+
+def decode_memo(memo: str, key: bytes) -> Dict:
+    """Расшифровывает memo любой поддерживаемой версии."""
+    return MemoDecoder(key).decode(memo)
+
+
+class MemoDecoder:
+    """
+    Подготовленный декодер memo для одного ключа.
+    Отпечаток и объект Fernet создаются один раз на все сканирование.
+
+    Args:
+        key: Ключ Fernet
+        accept_legacy: Пробовать расшифровать memo без префикса версии
+    """
+
+    def __init__(self, key: bytes, accept_legacy: bool = True):
+        self.fingerprint = key_fingerprint(key)
+        self.prefix = f"{MEMO_V1}:{self.fingerprint}:"
+        self.prefix_v2 = f"{MEMO_V2}:{self.fingerprint}:"
+        self.prefix_chunk = f"{MEMO_CHUNK}:{self.fingerprint}:"
+        self._aad_prefix = self.prefix_v2.encode()
+        self.accept_legacy = accept_legacy
+        self._fernet = Fernet(key)
+        self._aead = _memo_aead(key)
+        self._tag_key = _tag_key(key)
+
+    def tag_for(self, service: str) -> bytes:
+        """Тег сервиса, который encode_memo пишет в заголовок v2."""
+        return _service_tag(self._tag_key, service)
+
+    def service_tag(self, memo: str) -> Optional[bytes]:
+        """
+        Тег сервиса из заголовка memo v2 без расшифровки (декодируются
+        только первые 8 символов base64). None - тега нет или memo не v2.
+        """
+        if not memo.startswith(self.prefix_v2):
+            return None
+        start = len(self.prefix_v2)
+        try:
+            head = base64.urlsafe_b64decode(memo[start:start + 8])
+        except ValueError:
+            return None
+        if len(head) < 2 + _TAG_SIZE or head[0] != _V2_VERSION or not head[1] & _FLAG_TAG:
+            return None
+        return head[2:2 + _TAG_SIZE]
+
+    def is_candidate(self, memo: str) -> bool:
+        """Может ли memo быть нашим секретом (без расшифровки)."""
+        if memo.startswith((self.prefix_v2, self.prefix, self.prefix_chunk)):
+            return True
+        return self.accept_legacy and memo.startswith(LEGACY_PREFIX)
+
+    def is_chunk(self, memo: str) -> bool:
+        """Является ли memo нашим чанком (собирается через ChunkAssembler)."""
+        return memo.startswith(self.prefix_chunk)
+
+    def decode(self, memo: str) -> Dict:
+        """
+        Расшифровывает memo.
+
+        Raises:
+            ValueError: memo зашифровано другим ключом или неизвестного формата
+            cryptography.fernet.InvalidToken: неверный ключ или поврежденные данные
+        """
+        if memo.startswith(self.prefix_v2):
+            return self._decode_v2(memo)
+        if memo.startswith(self.prefix_chunk):
+            raise ValueError("memo - часть чанкованного секрета, нужна сборка")
+        if memo.startswith(self.prefix):
+            payload = memo[len(self.prefix):]
+        elif memo.startswith((MEMO_V1 + ":", MEMO_V2 + ":", MEMO_CHUNK + ":")):
+            raise ValueError("memo зашифровано другим ключом")
+        else:
+            payload = memo
+
+        encrypted_bytes = base64.urlsafe_b64decode(payload.encode())
+        return json.loads(self._fernet.decrypt(encrypted_bytes).decode())
+
+    def _decode_v2(self, memo: str) -> Dict:
+        """
+        Raises:
+            ValueError: неверный base64 или заголовок
+            cryptography.exceptions.InvalidTag: неверный ключ или поврежденные данные
+        """
+        body = memo[len(self.prefix_v2):]
+        raw = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        if len(raw) < 2 or raw[0] != _V2_VERSION:
+            raise ValueError("Неверный заголовок memo v2")
+        header_size = 2 + (_TAG_SIZE if raw[1] & _FLAG_TAG else 0)
+        if len(raw) < header_size + _NONCE_SIZE:
+            raise ValueError("Неверный заголовок memo v2")
+
+        # Срезы memoryview не копируют шифртекст перед AES-GCM
+        view = memoryview(raw)
+        nonce = view[header_size:header_size + _NONCE_SIZE]
+        plaintext = self._aead.decrypt(
+            nonce, view[header_size + _NONCE_SIZE:], self._aad_prefix + view[:header_size]
+        )
+        if raw[1] & _FLAG_ZLIB:
+            plaintext = zlib.decompress(plaintext)
+        return json.loads(plaintext)
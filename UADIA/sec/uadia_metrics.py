@@ -0,0 +1,167 @@
+"""
+Метрики восстановления секретов УАДИА.
+
+Счетчики и таймеры процесса: задержка RPC по страницам, число
+просмотренных транзакций, расшифрованные и отброшенные memo, время KDF,
+попадания в кэши. Модули пишут в общий реестр METRICS, снимок
+отдается в формате Prometheus (text exposition) или JSON.
+
+Тихий режим (set_quiet(True) или UAIA_QUIET=1) убирает построчные print
+по транзакциям и страницам; итоги и предупреждения остаются.
+
+Example:
+    >>> from uadia_metrics import METRICS, set_quiet
+    >>> set_quiet(True)
+    >>> manager.extract_and_decrypt_secrets(address, key)
+    >>> print(METRICS.to_prometheus())
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+_quiet = os.environ.get("UAIA_QUIET", "") not in ("", "0")
+
+
+def set_quiet(quiet: bool = True):
+    """Включает или выключает тихий режим для всего процесса."""
+    global _quiet
+    _quiet = quiet
+
+
+def verbose() -> bool:
+    """Печатать ли построчный прогресс (проверяется до форматирования строки)."""
+    return not _quiet
+
+
+def _labels_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: Tuple) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in key) + "}"
+
+
+class Metrics:
+    """
+    Реестр счетчиков и таймеров.
+
+    Счетчик - монотонная сумма (inc). Таймер - число наблюдений, сумма
+    и максимум в секундах (observe / timer), в Prometheus это summary.
+    """
+
+    def __init__(self, prefix: str = "uaia"):
+        self.prefix = prefix
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._timers: Dict[str, Dict[Tuple, list]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, text: str):
+        """Задает описание метрики (строка # HELP в Prometheus)."""
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._timers.setdefault(name, {})
+            stats = series.get(key)
+            if stats is None:
+                series[key] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Замеряет блок with; время записывается и при исключении."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels_key(labels), 0)
+
+    def hit_rate(self, name: str, **labels) -> float:
+        """Доля попаданий счетчика name с result="hit" среди hit и miss."""
+        hits = self.counter(name, result="hit", **labels)
+        misses = self.counter(name, result="miss", **labels)
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def snapshot(self) -> Dict:
+        """Снимок всех метрик: {"counters": {...}, "timers": {...}}."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            timers = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": count,
+                        "sum": total,
+                        "max": peak,
+                        "avg": total / count,
+                    }
+                    for key, (count, total, peak) in series.items()
+                ]
+                for name, series in self._timers.items()
+            }
+        return {"counters": counters, "timers": timers}
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """Снимок в текстовом формате Prometheus."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                full = f"{self.prefix}_{name}_total"
+                if name in self._help:
+                    lines.append(f"# HELP {full} {self._help[name]}")
+                lines.append(f"# TYPE {full} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{full}{_format_labels(key)} {value:g}")
+            for name in sorted(self._timers):
+                full = f"{self.prefix}_{name}_seconds"
+                if name in self._help:
+                    lines.append(f"# HELP {full} {self._help[name]}")
+                lines.append(f"# TYPE {full} summary")
+                for key, (count, total, _) in sorted(self._timers[name].items()):
+                    labels = _format_labels(key)
+                    lines.append(f"{full}_count{labels} {count}")
+                    lines.append(f"{full}_sum{labels} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+METRICS.describe("rpc_page", "Задержка одного запроса страницы (query_txs, LCD, API эксплорера)")
+METRICS.describe("rpc_errors", "Неудачные попытки запроса страницы")
+METRICS.describe("txs_scanned", "Транзакции, полученные от ноды или API")
+METRICS.describe("self_transfers", "Найденные self-транзакции")
+METRICS.describe("memos", "Memo по результату: decrypted, rejected, foreign, stale")
+METRICS.describe("decrypt", "Время расшифровки пачки транзакций")
+METRICS.describe("kdf", "Время вывода ключа PBKDF2 (только промахи кэша)")
+METRICS.describe("cache", "Обращения к кэшам по результату hit/miss")
@@ -0,0 +1,260 @@
+"""
+Пул RPC-нод Akash с оценкой здоровья и хеджированием запросов.
+
+Для каждой ноды хранится скользящая задержка и доля ошибок; запрос идет
+на ноду с лучшей оценкой. Если она не ответила за перцентиль своей
+обычной задержки, тот же запрос дублируется на следующую ноду, и
+используется первый успешный ответ. Хеджируются только запросы на
+чтение из HEDGED_METHODS; запись (broadcast_tx и все прочие методы)
+уходит на одну ноду без дублей и повторов, иначе транзакция могла бы
+быть отправлена дважды.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+# Известные публичные RPC-ноды Akash (см. cli_akash.md)
+AKASH_RPC_NODES = [
+    "https://rpc.akashnet.net:443",
+    "https://akash-rpc.polkachu.com:443",
+    "https://rpc.akash.forbole.com:443",
+]
+
+# Методы клиента только на чтение - их безопасно дублировать на другие ноды
+HEDGED_METHODS = frozenset({
+    "query_txs",
+    "query_tx",
+    "query_height",
+    "query_account",
+    "query_bank_balance",
+    "query_bank_all_balances",
+    "txs.GetTx",
+    "txs.GetTxsEvent",
+})
+
+
+class EndpointStats:
+    """Скользящая статистика одной ноды."""
+
+    def __init__(self, url: str, window: int = 100, alpha: float = 0.2):
+        self.url = url
+        self.alpha = alpha
+        self.latencies = deque(maxlen=window)
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self.requests += 1
+            if ok:
+                self.latencies.append(latency)
+                if self.latency_ewma is None:
+                    self.latency_ewma = latency
+                else:
+                    self.latency_ewma += self.alpha * (latency - self.latency_ewma)
+            else:
+                self.errors += 1
+            self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def score(self, error_penalty: float) -> float:
+        """Меньше - лучше. Нода без статистики получает 0, чтобы ее опробовали."""
+        with self._lock:
+            if self.latency_ewma is None:
+                return 0.0 if self.errors == 0 else error_penalty
+            return self.latency_ewma * (1 + error_penalty * self.error_rate)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self.latencies) < 5:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "latency_ewma": self.latency_ewma,
+            "p95": self.percentile(0.95),
+        }
+
+
+class RpcEndpointPool:
+    """
+    Маршрутизирует вызовы к самой здоровой ноде и хеджирует медленные.
+
+    Args:
+        clients: Словарь {url: клиент} (LedgerClient или совместимый)
+        hedge_percentile: Перцентиль задержки, после которого шлется дубль
+        default_hedge_delay: Задержка хеджа, пока статистики мало (сек)
+        error_penalty: Во сколько раз доля ошибок ухудшает оценку
+        max_workers: Размер пула потоков для запросов
+    """
+
+    def __init__(
+        self,
+        clients: Dict[str, object],
+        hedge_percentile: float = 0.95,
+        default_hedge_delay: float = 1.0,
+        error_penalty: float = 10.0,
+        max_workers: int = 16
+    ):
+        if not clients:
+            raise ValueError("Пул RPC-нод пуст")
+        self.clients = dict(clients)
+        self.stats = {url: EndpointStats(url) for url in self.clients}
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.error_penalty = error_penalty
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    @classmethod
+    def from_urls(
+        cls,
+        urls: List[str],
+        client_factory: Callable[[str], object],
+        **kwargs
+    ) -> "RpcEndpointPool":
+        return cls({url: client_factory(url) for url in urls}, **kwargs)
+
+    def ranked(self) -> List[str]:
+        """Ноды от лучшей к худшей."""
+        return sorted(self.stats, key=lambda url: self.stats[url].score(self.error_penalty))
+
+    def best_endpoint(self) -> str:
+        return self.ranked()[0]
+
+    def _invoke(self, url: str, method: str, args, kwargs):
+        started = time.perf_counter()
+        try:
+            # Метод может быть вложенным: "txs.GetTx"
+            target = self.clients[url]
+            for name in method.split("."):
+                target = getattr(target, name)
+            result = target(*args, **kwargs)
+        except Exception:
+            self.stats[url].record(time.perf_counter() - started, ok=False)
+            raise
+        self.stats[url].record(time.perf_counter() - started, ok=True)
+        return result
+
+    def _hedge_delay(self, url: str) -> float:
+        delay = self.stats[url].percentile(self.hedge_percentile)
+        return self.default_hedge_delay if delay is None else delay
+
+    def call(self, method: str, *args, **kwargs):
+        """
+        Выполняет метод клиента на лучшей ноде с хеджированием.
+        Если ноды ответили ошибкой, пробует остальные по порядку оценки.
+        """
+        ranked = self.ranked()
+        primary = ranked[0]
+        futures = {self._executor.submit(self._invoke, primary, method, args, kwargs): primary}
+        backups = ranked[1:]
+
+        done, _ = wait(futures, timeout=self._hedge_delay(primary))
+        if not done and backups:
+            # Основная нода медлит - дублируем запрос на следующую
+            hedge = backups.pop(0)
+            futures[self._executor.submit(self._invoke, hedge, method, args, kwargs)] = hedge
+
+        last_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+            if not pending and backups:
+                # Все отправленные запросы упали - пробуем следующую ноду
+                url = backups.pop(0)
+                pending = {self._executor.submit(self._invoke, url, method, args, kwargs)}
+        raise last_error
+
+    def call_once(self, method: str, *args, **kwargs):
+        """
+        Выполняет метод один раз на лучшей ноде: без хеджа и без повтора
+        на других нодах (для записи, например broadcast_tx).
+        """
+        return self._invoke(self.best_endpoint(), method, args, kwargs)
+
+    def probe(self, method: str = "query_height", *args, **kwargs) -> Dict[str, bool]:
+        """
+        Вызывает метод на всех нодах одновременно, чтобы заполнить статистику
+        (например, health_check при старте). Возвращает {url: успех}.
+        """
+        futures = {
+            url: self._executor.submit(self._invoke, url, method, args, kwargs)
+            for url in self.clients
+        }
+        results = {}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result() is not False
+            except Exception:
+                results[url] = False
+        return results
+
+    def snapshot(self) -> List[Dict]:
+        """Статистика нод в порядке оценки."""
+        return [self.stats[url].as_dict() for url in self.ranked()]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class PooledLedgerClient:
+    """
+    Обертка с интерфейсом клиента: методы чтения из HEDGED_METHODS
+    (query_txs, query_tx, query_height, ...) выполняются через
+    RpcEndpointPool с хеджированием, остальные методы - один раз на
+    лучшей ноде. Прочие атрибуты (network_config) берутся у лучшей ноды.
+    """
+
+    def __init__(self, pool: RpcEndpointPool):
+        self.pool = pool
+
+    @property
+    def txs(self) -> "PooledService":
+        """Сервис транзакций (txs.GetTx), как у LedgerClient."""
+        return PooledService(self.pool, "txs")
+
+    def __getattr__(self, name: str):
+        return _pooled_attribute(self.pool, name)
+
+
+class PooledService:
+    """gRPC/REST-сервис клиента (например, txs), вызываемый через пул."""
+
+    def __init__(self, pool: RpcEndpointPool, name: str):
+        self.pool = pool
+        self.name = name
+
+    def __getattr__(self, method: str):
+        return _pooled_attribute(self.pool, f"{self.name}.{method}")
+
+
+def _pooled_attribute(pool: RpcEndpointPool, name: str):
+    if name in HEDGED_METHODS:
+        def pooled_call(*args, **kwargs):
+            return pool.call(name, *args, **kwargs)
+        return pooled_call
+
+    attribute = pool.clients[pool.best_endpoint()]
+    for part in name.split("."):
+        attribute = getattr(attribute, part)
+    if not callable(attribute):
+        return attribute
+
+    def single_call(*args, **kwargs):
+        return pool.call_once(name, *args, **kwargs)
+    return single_call
@@ -0,0 +1,65 @@
+"""
+Индекс последних версий секретов УАДИА по имени сервиса.
+
+Сервис, который ротировал токен много раз, оставляет в истории много
+self-транзакций; актуальна только самая высокая по блоку. Индекс хранит
+по одной записи на сервис и, если задан список нужных сервисов, сообщает,
+когда все они найдены - сканирование от новых транзакций к старым можно
+остановить.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class SecretIndex:
+    """
+    Последние версии секретов, ключ - поле "service".
+
+    Args:
+        services: Нужные сервисы (None - все сервисы, без ранней остановки)
+    """
+
+    def __init__(self, services: Optional[Iterable[str]] = None):
+        self.requested: Optional[Set[str]] = set(services) if services is not None else None
+        self._latest: Dict[str, Dict] = {}
+
+    def wants(self, service: str) -> bool:
+        """Нужен ли сервис и не найдена ли уже его версия."""
+        if self.requested is not None and service not in self.requested:
+            return False
+        return service not in self._latest
+
+    def offer(self, secret: Dict) -> bool:
+        """
+        Добавляет расшифрованный секрет (запись decrypt_transactions).
+        Returns:
+            True, если секрет стал последней версией своего сервиса
+        """
+        service = secret["service"]
+        if self.requested is not None and service not in self.requested:
+            return False
+        current = self._latest.get(service)
+        if current is not None and current["block"] >= secret["block"]:
+            return False
+        self._latest[service] = secret
+        return True
+
+    def complete(self) -> bool:
+        """Найдены ли все запрошенные сервисы (всегда False без списка)."""
+        return self.requested is not None and self.requested.issubset(self._latest)
+
+    def missing(self) -> Set[str]:
+        """Запрошенные сервисы, которые еще не найдены."""
+        return set() if self.requested is None else self.requested - set(self._latest)
+
+    def get(self, service: str) -> Optional[Dict]:
+        return self._latest.get(service)
+
+    def secrets(self) -> List[Dict]:
+        """Последние версии по убыванию высоты."""
+        return sorted(self._latest.values(), key=lambda secret: secret["block"], reverse=True)
+
+    def __contains__(self, service: str) -> bool:
+        return service in self._latest
+
+    def __len__(self) -> int:
+        return len(self._latest)
@@ -0,0 +1,319 @@
+"""
+Многоуровневое получение секретов УАДИА.
+
+Секреты агента лежат в нескольких источниках разной скорости: Vault KV
+(uadia_vault.py), memo транзакций в сети (UadiaBlockchainSecretManager),
+а ключ расшифровки выводится из сид-фразы, восстановленной по долям
+Шамира (sss.py). SecretResolver опрашивает уровни от быстрого к медленному:
+
+1. память процесса (доли миллисекунды);
+2. зашифрованный кэш на локальном диске (переживает перезапуск агента);
+3. Vault;
+4. сеть - журнал транзакций или сканирование истории (LazySecretStore).
+
+У каждого уровня свой TTL и свои счетчики попаданий, промахов, ошибок и
+задержки. Значение, найденное на медленном уровне, записывается во все
+более быстрые, поэтому со второго обращения секрет отдается из памяти.
+
+Example:
+    >>> key = derive_key_from_seed(recovered_seed, salt)   # seed из recover_master_seed
+    >>> resolver = SecretResolver([
+    ...     MemoryTier(ttl=60),
+    ...     EncryptedDiskTier("uaia_secret_cache", key, ttl=3600),
+    ...     VaultTier(UadiaVault(token="..."), "uaia/agents/architect/{service}"),
+    ...     ChainTier(LazySecretStore(wallet_address, key)),
+    ... ])
+    >>> resolver.get("telegram")
+"""
+import base64
+import copy
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from uadia_lazy_store import LazySecretStore
+
+try:
+    from hvac.exceptions import InvalidPath
+except ImportError:  # hvac нужен только уровню Vault
+    InvalidPath = KeyError
+
+_NONCE_SIZE = 12
+
+
+class MemoryTier:
+    """Словарь в памяти процесса. ttl - сколько секунд значение считается свежим."""
+
+    name = "memory"
+    writable = True
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, service: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(service)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[service]
+                return None
+            # Копия, как в UadiaVault.read: правка результата не меняет кэш
+            return copy.deepcopy(data)
+
+    def put(self, service: str, data: Dict):
+        with self._lock:
+            self._entries[service] = (copy.deepcopy(data), time.monotonic() + self.ttl)
+
+    def invalidate(self, service: Optional[str] = None):
+        with self._lock:
+            if service is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(service, None)
+
+
+class EncryptedDiskTier:
+    """
+    Кэш на локальном диске, зашифрованный AES-GCM.
+
+    Ключ кэша выводится HKDF из ключа расшифровки секретов, имя файла -
+    HMAC от имени сервиса, так что ни содержимое, ни список сервисов
+    без ключа не читаются. Имя сервиса входит в AAD: файл, подложенный
+    под другое имя, не расшифруется.
+
+    Args:
+        directory: Каталог кэша
+        key: Ключ расшифровки секретов (из derive_key_from_seed)
+        ttl: Сколько секунд (по часам системы) запись считается свежей
+    """
+
+    name = "disk"
+    writable = True
+
+    def __init__(self, directory: str, key: bytes, ttl: float = 3600.0):
+        self.directory = directory
+        self.ttl = ttl
+        raw_key = base64.urlsafe_b64decode(key)
+        self._aead = AESGCM(self._derive(raw_key, b"uaia-disk-cache"))
+        self._name_key = self._derive(raw_key, b"uaia-disk-cache-name")
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    @staticmethod
+    def _derive(raw_key: bytes, info: bytes) -> bytes:
+        return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info).derive(raw_key)
+
+    def _path(self, service: str) -> str:
+        name = hmac.new(self._name_key, service.encode(), hashlib.sha256).hexdigest()[:32]
+        return os.path.join(self.directory, name + ".bin")
+
+    def get(self, service: str) -> Optional[Dict]:
+        path = self._path(service)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            plain = self._aead.decrypt(blob[:_NONCE_SIZE], blob[_NONCE_SIZE:], service.encode())
+        except InvalidTag:
+            # Файл поврежден или записан другим ключом - считаем промахом
+            os.remove(path)
+            return None
+        entry = json.loads(plain)
+        if time.time() - entry["stored_at"] >= self.ttl:
+            return None
+        return entry["data"]
+
+    def put(self, service: str, data: Dict):
+        plain = json.dumps({"stored_at": time.time(), "data": data}).encode()
+        nonce = os.urandom(_NONCE_SIZE)
+        blob = nonce + self._aead.encrypt(nonce, plain, service.encode())
+        path = self._path(service)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, service: Optional[str] = None):
+        if service is not None:
+            try:
+                os.remove(self._path(service))
+            except FileNotFoundError:
+                pass
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin"):
+                os.remove(os.path.join(self.directory, name))
+
+
+class VaultTier:
+    """
+    Секреты в Vault KV v2 через UadiaVault.
+
+    Свой TTL уровня - cache_ttl переданного UadiaVault: в его пределах
+    Vault не опрашивается, после него сверяется только номер версии.
+
+    Args:
+        vault: UadiaVault (или объект с методами read/write)
+        path_template: Путь секрета, {service} заменяется именем сервиса
+        writable: Записывать ли в Vault значения, найденные в сети
+    """
+
+    name = "vault"
+
+    def __init__(self, vault, path_template: str = "uaia/agents/{service}", writable: bool = False):
+        self.vault = vault
+        self.path_template = path_template
+        self.writable = writable
+
+    @property
+    def ttl(self) -> float:
+        return self.vault.cache_ttl
+
+    def get(self, service: str) -> Optional[Dict]:
+        try:
+            return self.vault.read(self.path_template.format(service=service))
+        except InvalidPath:
+            return None
+
+    def put(self, service: str, data: Dict):
+        self.vault.write(self.path_template.format(service=service), data)
+
+    def invalidate(self, service: Optional[str] = None):
+        self.vault.invalidate(None if service is None else self.path_template.format(service=service))
+
+
+class ChainTier:
+    """
+    Секреты в memo транзакций: журнал транзакций, затем сканирование истории.
+
+    Свой TTL уровня - ttl переданного LazySecretStore. Уровень только
+    читает: запись в сеть - это транзакция (write_secret_to_blockchain).
+    """
+
+    name = "chain"
+    writable = False
+
+    def __init__(self, store: LazySecretStore):
+        self.store = store
+
+    @property
+    def ttl(self) -> float:
+        return self.store.ttl
+
+    def get(self, service: str) -> Optional[Dict]:
+        return self.store.get(service)
+
+    def invalidate(self, service: Optional[str] = None):
+        self.store.invalidate(service)
+
+
+class SecretResolver:
+    """
+    Опрашивает уровни по порядку и записывает найденное в более быстрые.
+
+    Args:
+        tiers: Уровни от быстрого к медленному
+    """
+
+    def __init__(self, tiers: Sequence):
+        self.tiers = list(tiers)
+        self.counters: Dict[str, Dict[str, float]] = {
+            tier.name: {"hits": 0, "misses": 0, "errors": 0, "seconds": 0.0}
+            for tier in self.tiers
+        }
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, service: str) -> Optional[Dict]:
+        """
+        Возвращает данные секрета сервиса или None, если его нет ни на одном уровне.
+        Параллельные промахи одного сервиса ждут одну загрузку.
+        """
+        # Быстрый путь без блокировки сервиса
+        data = self._probe(self.tiers[0], service)
+        if data is not None:
+            return data
+
+        with self._service_lock(service):
+            # Пока ждали блокировку, сервис мог загрузить другой поток
+            data = self.tiers[0].get(service)
+            if data is not None:
+                return data
+            for index, tier in enumerate(self.tiers[1:], start=1):
+                data = self._probe(tier, service)
+                if data is not None:
+                    self._write_back(self.tiers[:index], service, data)
+                    return data
+        return None
+
+    def put(self, service: str, data: Dict):
+        """Записывает новое значение во все уровни, которые принимают запись."""
+        self._write_back(self.tiers, service, data)
+
+    def invalidate(self, service: Optional[str] = None):
+        """Сбрасывает сервис (или все) на всех уровнях."""
+        for tier in self.tiers:
+            tier.invalidate(service)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Счетчики по уровням: попадания, промахи, ошибки и средняя задержка (мс)."""
+        with self._lock:
+            result = {}
+            for tier in self.tiers:
+                counters = self.counters[tier.name]
+                calls = counters["hits"] + counters["misses"] + counters["errors"]
+                result[tier.name] = {
+                    "ttl": tier.ttl,
+                    "hits": counters["hits"],
+                    "misses": counters["misses"],
+                    "errors": counters["errors"],
+                    "avg_ms": round(counters["seconds"] / calls * 1000, 3) if calls else 0.0,
+                }
+            return result
+
+    def _probe(self, tier, service: str) -> Optional[Dict]:
+        started = time.perf_counter()
+        outcome = "misses"
+        data = None
+        try:
+            data = tier.get(service)
+            if data is not None:
+                outcome = "hits"
+        except Exception as e:
+            # Недоступный уровень не мешает опросить следующие
+            outcome = "errors"
+            print(f"❌ Уровень '{tier.name}': не удалось получить '{service}': {e}")
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            counters = self.counters[tier.name]
+            counters[outcome] += 1
+            counters["seconds"] += elapsed
+        return data
+
+    def _write_back(self, tiers: List, service: str, data: Dict):
+        for tier in tiers:
+            if not tier.writable:
+                continue
+            try:
+                tier.put(service, data)
+            except Exception as e:
+                print(f"⚠️ Уровень '{tier.name}': не удалось сохранить '{service}': {e}")
+
+    def _service_lock(self, service: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(service, threading.Lock())
@@ -23,22 +23,17 @@ def uaia_distributed_key_management():
     
     # 4. Создание зашифрованных пакетов для каждого агента
     print("\n📦 СОЗДАНИЕ ПАКЕТОВ ДЛЯ АГЕНТОВ...")
-    agent_packages = {}
-    agent_passwords = {}  # В реальности пароли знают только агенты
+    # Каждый агент устанавливает свой пароль (в реальности пароли знают только агенты)
+    agent_passwords = {
+        agent: f"strong_password_for_{agent}_2024!" for agent in agent_shares
+    }
     
-    for agent, share in agent_shares.items():
-        # Каждый агент устанавливает свой пароль
-        agent_password = f"strong_password_for_{agent}_2024!"
-        agent_passwords[agent] = agent_password
-        
-        # Создаем зашифрованный пакет
-        package = shamir_manager.create_agent_key_package(
-            agent_name=agent,
-            agent_share=share,
-            personal_password=agent_password
-        )
-        agent_packages[agent] = package
-        
+    # Создаем зашифрованные пакеты сразу для всех агентов (PBKDF2 параллельно)
+    agent_packages = shamir_manager.create_agent_key_packages(
+        agent_shares, agent_passwords
+    )
+    
+    for agent, package in agent_packages.items():
         # Сохраняем пакет в безопасное место (например, в блокчейн)
         save_package_to_blockchain(agent, package)
     
@@ -49,14 +44,13 @@ def uaia_distributed_key_management():
     available_agents = ["architect", "infra", "security"]
     
     # Каждый агент расшифровывает свой пакет
-    recovered_shares = {}
-    for agent in available_agents:
-        package = agent_packages[agent]
-        password = agent_passwords[agent]
-        
-        agent_data = shamir_manager.decrypt_agent_package(package, password)
-        if agent_data:
-            recovered_shares[agent] = agent_data["share"]
+    recovered = shamir_manager.decrypt_agent_packages(
+        {agent: agent_packages[agent] for agent in available_agents},
+        {agent: agent_passwords[agent] for agent in available_agents}
+    )
+    recovered_shares = {
+        agent: agent_data["share"] for agent, agent_data in recovered.items()
+    }
     
     # 6. Восстановление мастер-ключа
     print("\n🎯 ВОССТАНОВЛЕНИЕ МАСТЕР-КЛЮЧА...")
@@ -0,0 +1,76 @@
+"""
+Компактная запись self-транзакции УАДИА.
+
+При сканировании истории на каждую транзакцию раньше создавался словарь
+из 7 ключей (~360 байт только на сам dict). SelfTransfer хранит те же
+поля в __slots__ (~80 байт), адрес один на оба поля from/to, а memo -
+ссылка на строку из ответа ноды, без копий. Доступ по ключам
+(tx["height"], tx.get("memo", "")) сохранен, поэтому запись можно
+передавать везде, где раньше ожидался словарь.
+"""
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+# Ключ словаря -> атрибут записи
+_ATTRIBUTES = {
+    "hash": "hash",
+    "height": "height",
+    "amount": "amount",
+    "memo": "memo",
+    "from": "address",
+    "to": "address",
+    "timestamp": "timestamp",
+}
+
+
+class SelfTransfer(Mapping):
+    """
+    Self-транзакция: перевод с адреса на тот же адрес.
+
+    Args:
+        tx_hash: Хэш транзакции
+        height: Высота блока
+        amount: Сумма первой монеты (строка, как в ответе ноды)
+        memo: Memo транзакции
+        address: Адрес кошелька (отправитель и получатель)
+        timestamp: Время блока, если нода его отдает
+    """
+
+    __slots__ = ("hash", "height", "amount", "memo", "address", "timestamp")
+
+    def __init__(
+        self,
+        tx_hash: str,
+        height: int,
+        amount: str,
+        memo: str,
+        address: str,
+        timestamp: Optional[str] = None
+    ):
+        self.hash = tx_hash
+        self.height = height
+        self.amount = amount
+        self.memo = memo
+        self.address = address
+        self.timestamp = timestamp
+
+    def __getitem__(self, key: str):
+        return getattr(self, _ATTRIBUTES[key])
+
+    def get(self, key: str, default=None):
+        # Без KeyError и try/except Mapping.get - вызывается на каждую транзакцию
+        attribute = _ATTRIBUTES.get(key)
+        return default if attribute is None else getattr(self, attribute)
+
+    def __iter__(self):
+        return iter(_ATTRIBUTES)
+
+    def __len__(self) -> int:
+        return len(_ATTRIBUTES)
+
+    def to_dict(self) -> Dict:
+        """Обычный словарь (например, для json.dumps)."""
+        return {key: self[key] for key in _ATTRIBUTES}
+
+    def __repr__(self) -> str:
+        return f"SelfTransfer(hash={self.hash!r}, height={self.height}, amount={self.amount!r})"
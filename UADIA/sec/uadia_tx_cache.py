@@ -0,0 +1,143 @@
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from uadia_transfer import SelfTransfer
+
+
+class UadiaTxCache:
+    """
+    Персистентный кэш self-транзакций УАДИА в SQLite.
+
+    Хранит распарсенные транзакции (SelfTransfer из _parse_transaction) по ключу
+    (сеть, адрес, tx_hash) с индексом по высоте, а также диапазон блоков,
+    который уже полностью просканирован. После перезапуска агенту достаточно
+    догрузить только блоки выше этого диапазона. Один файл может обслуживать
+    несколько сетей: данные testnet и mainnet не смешиваются.
+
+    Args:
+        path: Файл SQLite
+        chain_id: Сеть, к которой относятся записи этого экземпляра
+    """
+
+    def __init__(self, path: str, chain_id: str = "akashnet-2"):
+        self.path = path
+        self.chain_id = chain_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            # Кэш без chain_id (старый формат) не переносится - он пересоберется
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(self_transfers)")}
+            if columns and "chain_id" not in columns:
+                self._conn.execute("DROP TABLE self_transfers")
+                self._conn.execute("DROP TABLE IF EXISTS sync_state")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS self_transfers (
+                    chain_id  TEXT NOT NULL,
+                    address   TEXT NOT NULL,
+                    hash      TEXT NOT NULL,
+                    height    INTEGER NOT NULL,
+                    amount    TEXT NOT NULL,
+                    memo      TEXT NOT NULL,
+                    timestamp TEXT,
+                    PRIMARY KEY (chain_id, address, hash)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_self_transfers_height "
+                "ON self_transfers (chain_id, address, height)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    chain_id    TEXT NOT NULL,
+                    address     TEXT NOT NULL,
+                    from_height INTEGER NOT NULL,
+                    to_height   INTEGER NOT NULL,
+                    PRIMARY KEY (chain_id, address)
+                )
+                """
+            )
+
+    def put_many(self, address: str, txs: List[Dict]):
+        """Сохраняет транзакции; повторная запись того же хэша игнорируется."""
+        rows = [
+            (
+                self.chain_id,
+                address,
+                tx["hash"],
+                int(tx["height"]),
+                str(tx["amount"]),
+                tx.get("memo", ""),
+                None if tx.get("timestamp") is None else str(tx["timestamp"]),
+            )
+            for tx in txs
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO self_transfers "
+                "(chain_id, address, hash, height, amount, memo, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def load(
+        self,
+        address: str,
+        min_height: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[SelfTransfer]:
+        """
+        Возвращает транзакции адреса по убыванию высоты.
+
+        Args:
+            address: Адрес кошелька
+            min_height: Нижняя граница высоты (включительно)
+            limit: Максимум записей (самые новые), None - все
+        """
+        query = (
+            "SELECT hash, height, amount, memo, timestamp FROM self_transfers "
+            "WHERE chain_id = ? AND address = ? AND height >= ? "
+            "ORDER BY height DESC, rowid ASC LIMIT ?"
+        )
+        params = (self.chain_id, address, min_height or 0, -1 if limit is None else limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            SelfTransfer(tx_hash, height, amount, memo, address, timestamp)
+            for tx_hash, height, amount, memo, timestamp in rows
+        ]
+
+    def max_height(self, address: str) -> Optional[int]:
+        """Наибольшая высота среди закэшированных транзакций адреса."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(height) FROM self_transfers WHERE chain_id = ? AND address = ?",
+                (self.chain_id, address),
+            ).fetchone()
+        return row[0]
+
+    def sync_state(self, address: str) -> Optional[Tuple[int, int]]:
+        """Полностью просканированный диапазон блоков [from, to) или None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT from_height, to_height FROM sync_state "
+                "WHERE chain_id = ? AND address = ?",
+                (self.chain_id, address),
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def set_sync_state(self, address: str, from_height: int, to_height: int):
+        """Запоминает, что блоки [from_height, to_height) просканированы целиком."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (chain_id, address, from_height, to_height) "
+                "VALUES (?, ?, ?, ?)",
+                (self.chain_id, address, from_height, to_height),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,436 @@
+"""
+Журнал транзакций агента (write-ahead log).
+
+Каждая запись - строка JSON с tx_hash, суммой, высотой, идентификатором
+секрета (имя сервиса), хэшами чанков (для секретов из нескольких
+транзакций) и CRC32 самой записи. Записи от нескольких потоков
+объединяются в group commit: одна запись в файл и один fsync на пачку.
+Между процессами файл защищен flock, пачка пишется одним write в режиме
+O_APPEND, поэтому строки агентов не перемешиваются.
+
+Рядом с журналом лежит индекс "<путь>.idx": последняя запись по каждому
+секрету и смещение, до которого журнал проиндексирован. Поиск последней
+транзакции сервиса - обращение к словарю, хвост журнала после индекса
+дочитывается при открытии.
+
+Старый CSV-лог "uaia_transactions_<last8>.log" по-прежнему читается.
+"""
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+FSYNC_ALWAYS = "always"
+FSYNC_INTERVAL = "interval"
+FSYNC_NEVER = "never"
+
+
+def transaction_log_path(address: str) -> str:
+    """Путь к журналу транзакций агента (полный адрес - без коллизий суффиксов)."""
+    return f"uaia_transactions_{address}.wal"
+
+
+def legacy_transaction_log_path(address: str) -> str:
+    """Путь к старому CSV-логу, который писал log_transaction."""
+    return f"uaia_transactions_{address[-8:]}.log"
+
+
+def _encode_record(record: Dict) -> bytes:
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"))
+    crc = zlib.crc32(payload.encode()) & 0xFFFFFFFF
+    return f'{payload[:-1]},"crc":"{crc:08x}"}}\n'.encode()
+
+
+def _decode_line(line: str) -> Optional[Dict]:
+    """
+    Разбирает строку журнала: JSON-запись с CRC или строку старого CSV.
+    Возвращает None для битых строк.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+            crc = record.pop("crc")
+        except (ValueError, KeyError):
+            return None
+        payload = json.dumps(record, sort_keys=True, separators=(",", ":"))
+        if f"{zlib.crc32(payload.encode()) & 0xFFFFFFFF:08x}" != crc:
+            return None
+        return record
+
+    parts = line.split(",")
+    if len(parts) != 2 or not parts[0]:
+        return None
+    try:
+        return {"tx": parts[0], "amount": int(parts[1]), "height": None, "secret": None}
+    except ValueError:
+        return None
+
+
+class _Commit:
+    """Результат записи одной строки: ошибка пачки или None."""
+
+    __slots__ = ("error",)
+
+    def __init__(self):
+        self.error: Optional[BaseException] = None
+
+
+class TransactionLog:
+    """
+    Журнал транзакций одного кошелька с group commit и индексом.
+
+    Args:
+        address: Адрес кошелька
+        path: Путь к журналу (по умолчанию transaction_log_path(address))
+        fsync: "always" - fsync каждой пачки до возврата из append,
+            "interval" - не чаще fsync_interval, "never" - на усмотрение ОС
+        fsync_interval: Интервал fsync для режима "interval", сек
+        commit_delay: Сколько лидер пачки ждет попутные записи, сек
+        index_every: Через сколько записей сохранять индекс на диск
+    """
+
+    def __init__(
+        self,
+        address: str,
+        path: Optional[str] = None,
+        fsync: str = FSYNC_ALWAYS,
+        fsync_interval: float = 1.0,
+        commit_delay: float = 0.0,
+        index_every: int = 256
+    ):
+        if fsync not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Неизвестный режим fsync: {fsync}")
+        self.address = address
+        self.path = path or transaction_log_path(address)
+        self.index_path = self.path + ".idx"
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.commit_delay = commit_delay
+        self.index_every = index_every
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Dict, bytes, _Commit]] = []
+        self._appended = 0
+        # Номер последней обработанной записи (записанной или отвергнутой)
+        self._completed = 0
+        self._flushing = False
+        self._last_fsync = time.monotonic()
+        self._unsaved = 0
+
+        # Индекс: смещение в журнале и последняя запись по каждому секрету
+        self._indexed_size = 0
+        self._latest: Dict[str, Dict] = {}
+        self._load_index()
+        with self._cond:
+            self._catch_up()
+
+    # === Запись ===
+
+    def append(
+        self,
+        tx_hash: str,
+        amount: int,
+        height: Optional[int] = None,
+        secret: Optional[str] = None,
+        chunks: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Добавляет запись о транзакции. Возвращается, когда пачка с записью
+        записана (и при fsync="always" - сброшена на диск).
+
+        У секрета, записанного чанками, одна запись на весь секрет:
+        tx_hash - последний чанк, chunks - хэши всех чанков по порядку.
+        """
+        record = {"tx": tx_hash, "amount": int(amount), "height": height, "secret": secret}
+        if chunks:
+            record["chunks"] = list(chunks)
+        line = _encode_record(record)
+        commit = _Commit()
+
+        with self._cond:
+            self._pending.append((record, line, commit))
+            self._appended += 1
+            lsn = self._appended
+            while self._completed < lsn and self._flushing:
+                self._cond.wait()
+            if self._completed >= lsn:
+                if commit.error is not None:
+                    raise OSError(f"Пачка журнала не записана: {commit.error!r}") from commit.error
+                return record
+            # Никто не пишет - этот поток становится лидером пачки
+            self._flushing = True
+
+        self._flush_as_leader()
+        return record
+
+    def _flush_as_leader(self):
+        if self.commit_delay:
+            time.sleep(self.commit_delay)
+
+        with self._cond:
+            batch, self._pending = self._pending, []
+            upto = self._appended
+
+        try:
+            self._write_batch(batch)
+        except BaseException as e:
+            with self._cond:
+                # Пачка отвергается целиком: все ее авторы получают ошибку,
+                # и следующий лидер не допишет записи, о неудаче которых
+                # вызывающие уже узнали
+                for _, _, commit in batch:
+                    commit.error = e
+                self._completed = upto
+                self._flushing = False
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._completed = upto
+            self._flushing = False
+            self._cond.notify_all()
+
+    def _write_batch(self, batch: List[Tuple[Dict, bytes, "_Commit"]]):
+        if not batch:
+            return
+        data = b"".join(line for _, line, _ in batch)
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            with self._cond:
+                # Записи других процессов, появившиеся после нашего индекса
+                self._catch_up()
+            size = os.fstat(self._fd).st_size
+            if size and os.pread(self._fd, 1, size - 1) != b"\n":
+                # Оборванная при сбое последняя строка - начинаем с новой
+                data = b"\n" + data
+            os.write(self._fd, data)
+            self._sync()
+            new_size = os.fstat(self._fd).st_size
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        with self._cond:
+            for record, _, _ in batch:
+                self._index_record(record)
+            self._indexed_size = new_size
+            self._unsaved += len(batch)
+            if self._unsaved >= self.index_every:
+                self._save_index()
+
+    def _sync(self):
+        if self.fsync == FSYNC_NEVER:
+            return
+        now = time.monotonic()
+        if self.fsync == FSYNC_ALWAYS or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._fd)
+            self._last_fsync = now
+
+    # === Индекс ===
+
+    def _index_record(self, record: Dict):
+        secret = record.get("secret")
+        if not secret:
+            return
+        current = self._latest.get(secret)
+        # Запись без высоты (еще не подтверждена) не вытесняет подтвержденную
+        if current is None or (record.get("height") or 0) >= (current.get("height") or 0):
+            self._latest[secret] = record
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            size = int(index["size"])
+            latest = dict(index["latest"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if size > os.path.getsize(self.path):
+            # Журнал короче индекса (пересоздан) - индекс устарел
+            return
+        self._indexed_size = size
+        self._latest = latest
+
+    def _catch_up(self):
+        """Дочитывает записи журнала после проиндексированного смещения."""
+        size = os.path.getsize(self.path)
+        if size <= self._indexed_size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_size)
+            tail = f.read(size - self._indexed_size)
+        # Индексируем только целые строки; оборванная допишется позже
+        complete = tail.rfind(b"\n") + 1
+        for line in tail[:complete].decode(errors="replace").splitlines():
+            record = _decode_line(line)
+            if record is not None:
+                self._index_record(record)
+        self._indexed_size += complete
+        if complete:
+            self._unsaved += 1
+
+    def _save_index(self):
+        """Атомарно сохраняет индекс: временный файл + rename."""
+        directory = os.path.dirname(os.path.abspath(self.index_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".uaia_txlog_idx.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"size": self._indexed_size, "latest": self._latest}, f)
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._unsaved = 0
+
+    # === Чтение ===
+
+    def latest(self, secret: str) -> Optional[Dict]:
+        """Последняя запись секрета (сервиса) или None - без чтения журнала."""
+        with self._cond:
+            self._catch_up()
+            return self._latest.get(secret)
+
+    def latest_all(self) -> Dict[str, Dict]:
+        """Последние записи всех секретов из журнала."""
+        with self._cond:
+            self._catch_up()
+            return dict(self._latest)
+
+    def records(self) -> List[Dict]:
+        """Все целые записи журнала в порядке записи (битые пропускаются)."""
+        return read_transaction_records(self.address, self.path, include_legacy=False)
+
+    def records_from(self, offset: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Целые записи журнала после байтового смещения offset и смещение
+        за последней из них - читается только хвост журнала. Смещение
+        внутри строки сдвигается к началу следующей; смещение за концом
+        файла (журнал пересоздан) - к началу журнала.
+        """
+        with open(self.path, "rb") as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0
+            if offset:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    f.readline()
+            start = f.tell()
+            tail = f.read()
+        complete = tail.rfind(b"\n") + 1
+        records = []
+        for line in tail[:complete].decode(errors="replace").splitlines():
+            record = _decode_line(line)
+            if record is not None:
+                records.append(record)
+        return records, start + complete
+
+    def close(self):
+        with self._cond:
+            # Дожидаемся пачки, которую сейчас пишет лидер
+            while self._flushing:
+                self._cond.wait()
+            if self._fd is None:
+                return
+            if self._unsaved:
+                self._save_index()
+            if self.fsync != FSYNC_NEVER:
+                # В режиме interval пачки после последнего fsync еще не на диске
+                os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Открытые журналы процесса: все потоки пишут в общий group commit
+_open_logs: Dict[str, TransactionLog] = {}
+_open_logs_lock = threading.Lock()
+
+
+@atexit.register
+def _close_open_logs():
+    """
+    Закрывает общие журналы при выходе: в режиме fsync="interval"
+    последняя пачка после очередного интервала сбрасывается на диск в close.
+    """
+    with _open_logs_lock:
+        for log in _open_logs.values():
+            log.close()
+        _open_logs.clear()
+
+
+def open_transaction_log(address: str, path: Optional[str] = None, **kwargs) -> TransactionLog:
+    """Возвращает общий для процесса TransactionLog кошелька."""
+    path = os.path.abspath(path or transaction_log_path(address))
+    with _open_logs_lock:
+        log = _open_logs.get(path)
+        if log is None:
+            log = _open_logs[path] = TransactionLog(address, path, **kwargs)
+        return log
+
+
+def log_transaction(
+    address: str,
+    tx_hash: str,
+    amount: int,
+    height: Optional[int] = None,
+    secret: Optional[str] = None,
+    chunks: Optional[List[str]] = None
+):
+    """Записывает хэш транзакции в журнал агента (group commit + fsync)."""
+    open_transaction_log(address).append(tx_hash, amount, height, secret, chunks)
+
+
+def read_transaction_records(
+    address: str,
+    path: Optional[str] = None,
+    include_legacy: bool = True
+) -> List[Dict]:
+    """
+    Читает записи журнала (и старого CSV-лога, если путь не задан явно).
+
+    Returns:
+        Записи {tx, amount, height, secret} в порядке записи; у строк CSV
+        height и secret равны None. Битые и оборванные строки пропускаются.
+    """
+    paths = [path] if path else [transaction_log_path(address)]
+    if include_legacy and not path:
+        paths.insert(0, legacy_transaction_log_path(address))
+
+    records = []
+    for log_path in paths:
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, "r", errors="replace") as f:
+            for line in f:
+                # Строка без перевода строки в конце - незавершенная запись
+                if not line.endswith("\n"):
+                    continue
+                record = _decode_line(line)
+                if record is not None:
+                    records.append(record)
+    return records
+
+
+def read_transaction_log(address: str, path: str = None) -> List[Tuple[str, int]]:
+    """
+    Читает лог транзакций агента.
+
+    Returns:
+        Список (tx_hash, amount) в порядке записи. Битые строки пропускаются.
+    """
+    return [(record["tx"], record["amount"]) for record in read_transaction_records(address, path)]
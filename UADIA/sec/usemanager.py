@@ -1,9 +1,15 @@
+import asyncio
+
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_kdf import derive_key_from_seed
+
+
 async def main():
     """Пример использования менеджера секретов."""
     
     # 1. Инициализация
     print("🚀 Инициализация менеджера секретов УАДИА...")
-    secret_manager = UaiaBlockchainSecretManager(
+    secret_manager = UadiaBlockchainSecretManager(
         rpc_url="https://rpc.akashnet.net:443"  # Можно заменить на резервную ноду
     )
     
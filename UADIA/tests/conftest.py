@@ -0,0 +1,15 @@
+"""
+Общие настройки тестов УАДИА.
+
+Модули sec/ импортируют друг друга плоско (from uadia_memo import ...),
+поэтому папки UADIA и UADIA/sec добавляются в конец sys.path: так
+локальный sec/secrets.py не перекрывает стандартный модуль secrets.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (ROOT, os.path.join(ROOT, "sec")):
+    if path not in sys.path:
+        sys.path.append(path)
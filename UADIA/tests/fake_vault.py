@@ -0,0 +1,168 @@
+"""
+Локальный фейковый сервер Vault (KV v2) для проверки uadia_vault.py.
+
+Поддерживает только то, что использует UadiaVault: чтение/запись секретов,
+метаданные с current_version, lookup-self/renew-self токена и продление
+аренд. Задержка каждого ответа задается параметром latency, а счетчики
+запросов по маршрутам лежат в FakeVaultServer.requests.
+
+Example:
+    >>> with FakeVaultServer(latency=0.02) as server:
+    ...     vault = UadiaVault(server.url, token="root")
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeVaultServer:
+    """
+    Args:
+        latency: Задержка каждого ответа (сек)
+        token_ttl: TTL токена в lookup-self/renew-self (0 = бессрочный)
+        lease_duration: Срок, на который продлевается аренда
+        mount_point: Точка монтирования KV v2
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        token_ttl: int = 0,
+        lease_duration: int = 60,
+        mount_point: str = "secret"
+    ):
+        self.latency = latency
+        self.token_ttl = token_ttl
+        self.lease_duration = lease_duration
+        self.mount_point = mount_point
+        # {путь: [данные версии 1, версии 2, ...]}
+        self.secrets: Dict[str, list] = {}
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def put(self, path: str, data: Dict) -> int:
+        """Записывает версию секрета в обход HTTP (как другой клиент Vault)."""
+        with self._lock:
+            versions = self.secrets.setdefault(path, [])
+            versions.append(dict(data))
+            return len(versions)
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _route(self, method: str, path: str, query: Dict, body: Dict):
+        data_prefix = f"/v1/{self.mount_point}/data/"
+        metadata_prefix = f"/v1/{self.mount_point}/metadata/"
+
+        if path.startswith(data_prefix):
+            secret_path = path[len(data_prefix):]
+            if method == "GET":
+                self._count("read")
+                with self._lock:
+                    versions = self.secrets.get(secret_path)
+                    if not versions:
+                        return 404, {"errors": []}
+                    version = int(query.get("version", [len(versions)])[0]) or len(versions)
+                    if version > len(versions):
+                        return 404, {"errors": []}
+                    return 200, {"data": {
+                        "data": versions[version - 1],
+                        "metadata": {"version": version, "deletion_time": "", "destroyed": False},
+                    }}
+            self._count("write")
+            with self._lock:
+                versions = self.secrets.setdefault(secret_path, [])
+                cas = body.get("options", {}).get("cas")
+                if cas is not None and cas != len(versions):
+                    return 400, {"errors": ["check-and-set parameter did not match the current version"]}
+                versions.append(body.get("data", {}))
+                return 200, {"data": {"version": len(versions), "deletion_time": "", "destroyed": False}}
+
+        if path.startswith(metadata_prefix):
+            self._count("metadata")
+            with self._lock:
+                versions = self.secrets.get(path[len(metadata_prefix):])
+                if not versions:
+                    return 404, {"errors": []}
+                return 200, {"data": {
+                    "current_version": len(versions),
+                    "versions": {str(i + 1): {"destroyed": False} for i in range(len(versions))},
+                }}
+
+        if path == "/v1/auth/token/lookup-self":
+            self._count("lookup_self")
+            return 200, {"data": {"ttl": self.token_ttl, "renewable": bool(self.token_ttl)}}
+
+        if path == "/v1/auth/token/renew-self":
+            self._count("renew_self")
+            return 200, {"auth": {"lease_duration": self.token_ttl, "renewable": True}}
+
+        if path == "/v1/sys/leases/renew":
+            self._count("renew_lease")
+            return 200, {"lease_id": body.get("lease_id"), "lease_duration": self.lease_duration,
+                         "renewable": True}
+
+        return 404, {"errors": [f"unsupported path {path}"]}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else {}
+                parsed = urlparse(self.path)
+                if server.latency:
+                    time.sleep(server.latency)
+                status, payload = server._route(method, parsed.path, parse_qs(parsed.query), body)
+                encoded = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def do_PUT(self):
+                self._respond("PUT")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
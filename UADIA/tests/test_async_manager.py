@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from cryptography.fernet import Fernet
+
+from fake_chain import FakeLcdServer, FakeLedgerClient, make_tx
+from uadia_async_manager import AsyncUadiaBlockchainSecretManager
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_memo import encode_memo
+
+WALLET = "akash1asyncwallet"
+
+
+def history(count, wallet=WALLET, start_height=1000):
+    txs = []
+    for i in range(count):
+        txs.append(make_tx(start_height + 2 * i, wallet, wallet, f"memo-{i}"))
+        # Перевод другому адресу приходит в ответе, но не в результате
+        txs.append(make_tx(start_height + 2 * i + 1, wallet, "akash1other", "payment"))
+    return txs
+
+
+def run(server, method, *args, **options):
+    async def call():
+        async with AsyncUadiaBlockchainSecretManager(server.url, **options) as manager:
+            return await getattr(manager, method)(*args)
+    return asyncio.run(call())
+
+
+@pytest.mark.parametrize("query_param", ["events", "query"])
+def test_concurrent_pages_match_sync_manager(query_param):
+    txs = history(230)
+    with FakeLcdServer(txs) as server:
+        found = run(server, "find_self_transfers", WALLET, None, 10, query_param=query_param)
+        calls = server.calls
+
+    expected = UadiaBlockchainSecretManager(client=FakeLedgerClient(txs)).find_self_transfers(WALLET)
+    assert [tx["hash"] for tx in found] == [tx["hash"] for tx in expected]
+    assert len(found) == 230
+    # 460 транзакций кошелька - первая страница и еще 9 конкурентно
+    assert calls == 10
+
+
+@pytest.mark.parametrize("query_param", ["events", "query"])
+def test_start_height_limits_the_search(query_param):
+    with FakeLcdServer(history(100)) as server:
+        found = run(server, "find_self_transfers", WALLET, 1100, 10, query_param=query_param)
+
+    assert [tx["height"] for tx in found] == list(range(1198, 1099, -2))
+
+
+class FailingServer(FakeLcdServer):
+    """Отвечает status на первые failures запросов поиска."""
+
+    def __init__(self, history, status, failures):
+        super().__init__(history)
+        self.status = status
+        self.failures = failures
+
+    def _route(self, path, query):
+        if path == "/cosmos/tx/v1beta1/txs" and self.failures:
+            self.failures -= 1
+            return self.status, {"message": "injected"}
+        return super()._route(path, query)
+
+
+def test_client_error_fails_fast():
+    with FailingServer(history(10), 400, failures=10) as server:
+        found = run(server, "find_self_transfers", WALLET, page_retries=2, retry_backoff=0)
+        assert found == []
+        assert server.calls == 1
+
+
+def test_server_error_is_retried():
+    with FailingServer(history(10), 503, failures=2) as server:
+        found = run(server, "find_self_transfers", WALLET, page_retries=2, retry_backoff=0)
+        assert len(found) == 10
+        assert server.calls == 3
+
+    with FailingServer(history(10), 503, failures=10) as server:
+        found = run(server, "find_self_transfers", WALLET, page_retries=2, retry_backoff=0)
+        assert found == []
+        assert server.calls == 3
+
+
+def test_missing_hash_is_not_retried():
+    txs = history(3)
+    with FakeLcdServer(txs) as server:
+        found = run(
+            server, "fetch_transactions_by_hash", WALLET, [txs[0].hash, "MISSING"], page_retries=2
+        )
+        assert [tx["hash"] for tx in found] == [txs[0].hash]
+        assert server.calls == 2
+
+
+def test_restore_wallets_decrypts_each_wallet():
+    wallets = {f"akash1asyncfleet{i}": Fernet.generate_key() for i in range(3)}
+    txs = []
+    for n, (wallet, key) in enumerate(wallets.items()):
+        for i in range(4):
+            secret = {"service": f"svc{i}", "token": f"{wallet}-{i}"}
+            txs.append(make_tx(1000 + 10 * i + n, wallet, wallet, encode_memo(secret, key)))
+
+    with FakeLcdServer(txs) as server:
+        restored = run(server, "restore_wallets", wallets)
+
+    for wallet in wallets:
+        assert sorted(secret["data"]["token"] for secret in restored[wallet]) == [
+            f"{wallet}-{i}" for i in range(4)
+        ]
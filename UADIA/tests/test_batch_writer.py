@@ -0,0 +1,92 @@
+import os
+
+from cosmpy.aerial.wallet import LocalWallet
+from cryptography.fernet import Fernet
+
+from fake_chain import FakeSigningLedger
+from uadia_batch_writer import BatchSecretWriter
+from uadia_tx_log import read_transaction_records
+
+
+def test_chunked_secret_is_pipelined_and_logged_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ledger = FakeSigningLedger(block_time=0.05)
+    wallet = LocalWallet.generate()
+    secret = {"service": "tls_bundle", "cert": os.urandom(1000).hex()}
+
+    hashes = BatchSecretWriter(ledger, wallet).write_chunked(
+        secret, Fernet.generate_key(), max_memo_length=256
+    )
+
+    assert hashes and len(hashes) > 1
+    assert ledger.rejected == 0
+    # Один запрос аккаунта на весь секрет, без подтверждения каждого чанка
+    assert ledger.calls == 1 + 2 * len(hashes)
+    records = read_transaction_records(str(wallet.address()))
+    assert len(records) == 1
+    assert records[0]["secret"] == "tls_bundle"
+    assert records[0]["chunks"] == hashes
+    assert records[0]["tx"] == hashes[-1]
+
+
+class RecordingLedger(FakeSigningLedger):
+    """Запоминает sequence отправок; перед первыми bumps отправками в мемпул попадает чужая транзакция."""
+
+    def __init__(self, bumps=0):
+        super().__init__(block_time=0.05)
+        self.sequences = []
+        self.bumps = bumps
+
+    def broadcast_tx(self, tx):
+        self.sequences.append(tx.tx.auth_info.signer_infos[0].sequence)
+        if self.bumps:
+            self.bumps -= 1
+            with self._lock:
+                self._next_sequence += 1
+        return super().broadcast_tx(tx)
+
+
+def payloads(count):
+    return [(f"memo-{i}", 1000, f"svc{i}") for i in range(count)]
+
+
+def test_write_many_pipelines_sequences(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ledger = RecordingLedger()
+    wallet = LocalWallet.generate()
+
+    hashes = BatchSecretWriter(ledger, wallet).write_many(payloads(5))
+
+    assert all(hashes) and len(set(hashes)) == 5
+    assert ledger.sequences == [0, 1, 2, 3, 4]
+    assert ledger.rejected == 0
+    # Один запрос аккаунта, затем отправка и подтверждение каждой транзакции
+    assert ledger.calls == 1 + 2 * 5
+    records = read_transaction_records(str(wallet.address()))
+    assert [record["tx"] for record in records] == hashes
+    assert [record["secret"] for record in records] == [f"svc{i}" for i in range(5)]
+
+
+def test_sequence_mismatch_is_retried_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ledger = RecordingLedger()
+    # Чужая транзакция в мемпуле: нода ждет sequence 1, а аккаунт сообщает 0
+    ledger._next_sequence = 1
+
+    hashes = BatchSecretWriter(ledger, LocalWallet.generate()).write_many(payloads(3))
+
+    assert all(hashes)
+    assert ledger.rejected == 1
+    assert ledger.sequences == [0, 1, 2, 3]
+
+
+def test_second_mismatch_fails_only_that_secret(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ledger = RecordingLedger(bumps=2)
+
+    hashes = BatchSecretWriter(ledger, LocalWallet.generate()).write_many(payloads(3))
+
+    assert hashes[0] is None
+    assert all(hashes[1:])
+    assert ledger.rejected == 3
+    assert ledger.sequences == [0, 1, 1, 2, 3]
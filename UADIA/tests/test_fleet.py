@@ -0,0 +1,61 @@
+from cryptography.fernet import Fernet
+
+from fake_chain import FakeLedgerClient, make_tx
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_fleet import FleetRestorer
+from uadia_memo import encode_memo
+
+WALLETS = [f"akash1fleet{i}" for i in range(3)]
+
+
+def fleet_history(per_wallet, key, start_height=1_000_000):
+    history = []
+    for i in range(per_wallet):
+        for n, wallet in enumerate(WALLETS):
+            secret = {"service": f"svc-{i % 4}", "token": f"{wallet}-{i}"}
+            history.append(make_tx(start_height + 3 * i + n, wallet, wallet, encode_memo(secret, key)))
+    return history
+
+
+def test_fleet_without_start_height_pages_newest_first():
+    key = Fernet.generate_key()
+    ledger = FakeLedgerClient(fleet_history(80, key, start_height=20_000_000))
+    manager = UadiaBlockchainSecretManager(client=ledger)
+
+    found = FleetRestorer(manager).find_fleet_transfers(WALLETS, max_pages=2)
+
+    # Две страницы на кошелек, как у find_self_transfers, без обхода окнами от генезиса
+    assert ledger.calls == 2 * len(WALLETS)
+    for wallet in WALLETS:
+        expected = manager.find_self_transfers(wallet, max_pages=2)
+        assert len(found[wallet]) == 80
+        assert [tx["hash"] for tx in found[wallet]] == [tx["hash"] for tx in expected]
+
+
+def test_fleet_with_start_height_shares_one_tip_query():
+    key = Fernet.generate_key()
+    ledger = FakeLedgerClient(fleet_history(80, key, start_height=20_000_000))
+    manager = UadiaBlockchainSecretManager(client=ledger)
+
+    found = FleetRestorer(manager).find_fleet_transfers(WALLETS, start_height=19_950_000)
+
+    # Одна высота на всех; на кошелек - пустое окно и две страницы второго
+    assert ledger.calls == 1 + 3 * len(WALLETS)
+    assert all(len(found[wallet]) == 80 for wallet in WALLETS)
+
+
+def test_restore_splits_secrets_by_wallet():
+    key = Fernet.generate_key()
+    manager = UadiaBlockchainSecretManager(client=FakeLedgerClient(fleet_history(10, key)))
+
+    secrets = FleetRestorer(manager).restore([(wallet, key) for wallet in WALLETS], start_height=0)
+
+    for wallet in WALLETS:
+        assert len(secrets[wallet]) == 4
+        assert all(secret["data"]["token"].startswith(wallet) for secret in secrets[wallet])
+
+
+def test_empty_fleet():
+    restorer = FleetRestorer(UadiaBlockchainSecretManager(client=FakeLedgerClient([])))
+    assert restorer.restore([]) == {}
+    assert restorer.find_fleet_transfers([]) == {}
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+import uadia_kdf
+from uadia_kdf import clear_kdf_cache, derive_key_from_seed, kdf_cache_info
+
+SEED = "abandon ability able about above absent absorb abstract absurd abuse access accident"
+
+
+@pytest.fixture
+def pbkdf2_runs(monkeypatch):
+    """Считает запуски PBKDF2 и замедляет их, чтобы промахи пересекались."""
+    runs = []
+    original = uadia_kdf.PBKDF2HMAC
+
+    class CountingPBKDF2:
+        def __init__(self, **kwargs):
+            self._kdf = original(**kwargs)
+            self.salt = kwargs["salt"]
+
+        def derive(self, material):
+            runs.append(self.salt)
+            time.sleep(0.05)
+            return self._kdf.derive(material)
+
+    monkeypatch.setattr(uadia_kdf, "PBKDF2HMAC", CountingPBKDF2)
+    clear_kdf_cache()
+    yield runs
+    clear_kdf_cache()
+
+
+def test_one_pbkdf2_run_per_arguments(pbkdf2_runs):
+    first = derive_key_from_seed(SEED, b"salt-a", 1000)
+    assert derive_key_from_seed(SEED, b"salt-a", 1000) == first
+    assert derive_key_from_seed(SEED, b"salt-a", 1001) != first
+    assert derive_key_from_seed(SEED, b"salt-b", 1000) != first
+
+    assert len(pbkdf2_runs) == 3
+    info = kdf_cache_info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 3, 3)
+
+
+def test_concurrent_misses_run_pbkdf2_once(pbkdf2_runs):
+    barrier = threading.Barrier(8)
+    keys = []
+
+    def derive():
+        barrier.wait()
+        keys.append(derive_key_from_seed(SEED, b"salt-c", 1000))
+
+    threads = [threading.Thread(target=derive) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(keys)) == 1 and len(keys) == 8
+    assert pbkdf2_runs == [b"salt-c"]
+    assert kdf_cache_info()["misses"] == 1
+
+
+def test_eviction_wipes_cached_buffer(monkeypatch):
+    cache = uadia_kdf._DerivedKeyCache(2)
+    monkeypatch.setattr(uadia_kdf, "_cache", cache)
+
+    key = derive_key_from_seed(SEED, b"salt-0", 1000)
+    buffer = next(iter(cache._keys.values()))
+    assert bytes(buffer) == key
+
+    derive_key_from_seed(SEED, b"salt-1", 1000)
+    derive_key_from_seed(SEED, b"salt-2", 1000)
+
+    assert len(cache._keys) == 2
+    assert buffer == bytearray(len(key))
+    # Отданная копия не затирается - это ограничение описано в модуле
+    assert key != bytes(len(key))
+
+
+def test_clear_resets_counters(pbkdf2_runs):
+    derive_key_from_seed(SEED, b"salt-d", 1000)
+    derive_key_from_seed(SEED, b"salt-d", 1000)
+    buffer = next(iter(uadia_kdf._cache._keys.values()))
+
+    clear_kdf_cache()
+
+    assert buffer == bytearray(len(buffer))
+    info = kdf_cache_info()
+    assert (info["hits"], info["misses"], info["size"]) == (0, 0, 0)
@@ -0,0 +1,100 @@
+from cryptography.fernet import Fernet
+
+from fake_chain import FakeLedgerClient, make_tx
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_lazy_store import LazySecretStore
+from uadia_memo import encode_memo
+from uadia_tx_log import TransactionLog
+
+WALLET = "akash1lazystorewallet"
+KEY = Fernet.generate_key()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def history(count):
+    """count self-транзакций: svc0 - самая старая, svc{count-1} - самая новая."""
+    return [
+        make_tx(1000 + i, WALLET, WALLET, encode_memo({"service": f"svc{i}", "token": str(i)}, KEY))
+        for i in range(count)
+    ]
+
+
+def make_store(tmp_path, txs, logged=(), **options):
+    with TransactionLog(WALLET, str(tmp_path / "tx.wal")) as log:
+        for tx, service in logged:
+            log.append(tx.hash, 1000, tx.height, service)
+    ledger = FakeLedgerClient(txs)
+    clock = Clock()
+    store = LazySecretStore(
+        WALLET,
+        KEY,
+        chain_manager=UadiaBlockchainSecretManager(client=ledger),
+        log_path=str(tmp_path / "tx.wal"),
+        clock=clock,
+        **options
+    )
+    return store, ledger, clock
+
+
+def test_logged_secret_is_fetched_by_hash_once(tmp_path):
+    txs = history(120)
+    store, ledger, _ = make_store(tmp_path, txs, logged=[(txs[3], "svc3")])
+
+    assert store.get("svc3") == {"service": "svc3", "token": "3"}
+    assert store.get("svc3") == {"service": "svc3", "token": "3"}
+
+    # Один GetTx по хэшу из журнала, без запросов событий
+    assert ledger.calls == 1
+    stats = store.stats()
+    assert (stats["misses"], stats["log"], stats["hits"], stats["scan"]) == (1, 1, 1, 0)
+    assert stats["first_use_source"] == {"svc3": "log"}
+
+
+def test_ttl_expiry_reloads_secret(tmp_path):
+    txs = history(10)
+    store, ledger, clock = make_store(tmp_path, txs, logged=[(txs[3], "svc3")], ttl=60)
+
+    store.get("svc3")
+    clock.now = 59
+    store.get("svc3")
+    assert ledger.calls == 1
+
+    clock.now = 60
+    store.get("svc3")
+    assert ledger.calls == 2
+
+
+def test_negative_ttl_remembers_missing_service(tmp_path):
+    store, ledger, clock = make_store(tmp_path, history(10), negative_ttl=30)
+
+    assert store.get("absent") is None
+    calls = ledger.calls
+    clock.now = 29
+    assert store.get("absent") is None
+    assert ledger.calls == calls
+
+    clock.now = 30
+    assert store.get("absent") is None
+    assert ledger.calls == 2 * calls
+    assert store.stats()["not_found"] == 2
+
+
+def test_unlogged_secret_falls_back_to_bounded_scan(tmp_path):
+    txs = history(200)
+    store, ledger, _ = make_store(tmp_path, txs, scan_pages=2)
+
+    # svc120 на второй странице от новых: две страницы и без GetTx
+    assert store.get("svc120") == {"service": "svc120", "token": "120"}
+    assert ledger.calls == 2
+    assert store.stats()["first_use_source"] == {"svc120": "scan"}
+
+    # svc10 глубже scan_pages - сканирование не идет дальше двух страниц
+    assert store.get("svc10") is None
+    assert ledger.calls == 4
@@ -0,0 +1,79 @@
+import json
+
+from cryptography.fernet import Fernet
+
+import uadia_metrics
+from fake_chain import FakeLedgerClient, make_tx
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_memo import encode_memo
+from uadia_metrics import Metrics, set_quiet
+
+WALLET = "akash1metricswallet"
+
+
+def test_prometheus_exposition():
+    metrics = Metrics(prefix="test")
+    metrics.describe("rpc_page", "Задержка страницы")
+    metrics.inc("memos", 3, result="decrypted")
+    metrics.inc("memos", result="foreign")
+    metrics.observe("rpc_page", 0.25, method="query_txs")
+    metrics.observe("rpc_page", 0.5, method="query_txs")
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert lines == [
+        "# TYPE test_memos_total counter",
+        'test_memos_total{result="decrypted"} 3',
+        'test_memos_total{result="foreign"} 1',
+        "# HELP test_rpc_page_seconds Задержка страницы",
+        "# TYPE test_rpc_page_seconds summary",
+        'test_rpc_page_seconds_count{method="query_txs"} 2',
+        'test_rpc_page_seconds_sum{method="query_txs"} 0.750000',
+    ]
+
+
+def test_json_snapshot():
+    metrics = Metrics()
+    metrics.inc("txs_scanned", 50)
+    with metrics.timer("kdf"):
+        pass
+
+    snapshot = json.loads(metrics.to_json())
+
+    assert snapshot["counters"]["txs_scanned"] == [{"labels": {}, "value": 50}]
+    (kdf,) = snapshot["timers"]["kdf"]
+    assert kdf["count"] == 1 and kdf["max"] == kdf["sum"] == kdf["avg"]
+
+    metrics.reset()
+    assert json.loads(metrics.to_json()) == {"counters": {}, "timers": {}}
+
+
+def test_hit_rate():
+    metrics = Metrics()
+    assert metrics.hit_rate("cache", cache="kdf") == 0.0
+
+    metrics.inc("cache", 3, cache="kdf", result="hit")
+    metrics.inc("cache", cache="kdf", result="miss")
+    metrics.inc("cache", 5, cache="tx", result="miss")
+
+    assert metrics.hit_rate("cache", cache="kdf") == 0.75
+    assert metrics.hit_rate("cache", cache="tx") == 0.0
+
+
+def test_quiet_mode_hides_per_transaction_lines(capsys, monkeypatch):
+    monkeypatch.setattr(uadia_metrics, "_quiet", False)
+    key = Fernet.generate_key()
+    history = [
+        make_tx(1000 + i, WALLET, WALLET, encode_memo({"service": f"svc{i}"}, key))
+        for i in range(3)
+    ]
+    manager = UadiaBlockchainSecretManager(client=FakeLedgerClient(history))
+    transactions = manager.find_self_transfers(WALLET)
+
+    manager.decrypt_transactions(transactions, key)
+    assert "] svc2" in capsys.readouterr().out
+
+    set_quiet(True)
+    assert len(manager.decrypt_transactions(transactions, key)) == 3
+    out = capsys.readouterr().out
+    assert "] svc" not in out
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from API_Mintscan import AsyncUaiaSecretFinder, MintscanAPIError
+from fake_chain import FakeLcdServer, make_tx
+
+WALLET = "akash1mintscanwallet"
+
+
+def find_all(server, limit=50):
+    async def run():
+        async with AsyncUaiaSecretFinder(api_base=server.url, rate_limit=1000, burst=100) as finder:
+            return await finder.find_self_transfers(WALLET, limit=limit)
+    return asyncio.run(run())
+
+
+def test_pages_spanning_one_height_are_not_duplicated():
+    history = [make_tx(500, WALLET, WALLET, f"same-height-{i}") for i in range(120)]
+    history += [make_tx(400 + i, WALLET, WALLET, f"older-{i}") for i in range(30)]
+
+    with FakeLcdServer(history) as server:
+        found = find_all(server)
+
+    hashes = [tx["hash"] for tx in found]
+    assert len(hashes) == len(set(hashes)) == 150
+    assert set(hashes) == {tx.hash for tx in history}
+
+
+class StuckServer(FakeLcdServer):
+    """Игнорирует параметры пагинации и всегда отдает первую страницу."""
+
+    def _route(self, path, query):
+        return super()._route(path, {"limit": query["limit"]})
+
+
+def test_page_without_progress_raises():
+    history = [make_tx(500 + i, WALLET, WALLET, f"memo-{i}") for i in range(120)]
+
+    with StuckServer(history) as server, pytest.raises(MintscanAPIError):
+        find_all(server)
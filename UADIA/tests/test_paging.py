@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+from fake_chain import FakeLedgerClient, make_tx
+from uadia_blockchain_secret_manager import PAGE_LIMIT, UadiaBlockchainSecretManager
+
+WALLET = "akash1pagingwallet"
+
+
+def history(count, start_height=1000):
+    txs = []
+    for i in range(count):
+        txs.append(make_tx(start_height + 2 * i, WALLET, WALLET, f"memo-{i}"))
+        # Перевод от кошелька другому адресу попадает в ответ, но не в результат
+        txs.append(make_tx(start_height + 2 * i + 1, WALLET, "akash1other", "payment"))
+    return txs
+
+
+class PagedLedger(FakeLedgerClient):
+    """Нода, у которой страницы начиная с short_page короче заявленного total."""
+
+    def __init__(self, txs, short_page, short_size, total=1000):
+        super().__init__(txs)
+        self.short_page = short_page
+        self.short_size = short_size
+        self.total = total
+        self.pages = []
+
+    def query_txs(self, query, page=1, limit=50, order_by="desc"):
+        response = super().query_txs(query, page, limit, order_by)
+        self.pages.append(page)
+        txs = response.txs
+        if page == self.short_page:
+            txs = txs[:self.short_size]
+        elif page > self.short_page:
+            txs = []
+        return SimpleNamespace(txs=txs, total_count=self.total)
+
+
+def hashes(txs):
+    return [tx["hash"] for tx in txs]
+
+
+def test_concurrent_pages_match_serial_order():
+    ledger = FakeLedgerClient(history(230), latency=0.002)
+    manager = UadiaBlockchainSecretManager(client=ledger)
+
+    concurrent = manager.find_self_transfers(WALLET, concurrent=True)
+    serial = manager.find_self_transfers(WALLET, concurrent=False)
+
+    assert hashes(concurrent) == hashes(serial)
+    heights = [tx["height"] for tx in concurrent]
+    assert heights == sorted(heights, reverse=True)
+    # 460 транзакций кошелька - 10 страниц, self-transfer из них половина
+    assert len(concurrent) == 230
+
+
+def test_failed_page_cuts_the_result():
+    manager = UadiaBlockchainSecretManager(
+        client=FakeLedgerClient(history(230), fail_pages=[3]), page_retries=0
+    )
+
+    found = manager.find_self_transfers(WALLET)
+
+    # Страницы 1-2 (по 25 self-transfer на каждой), дальше разрыв
+    assert len(found) == PAGE_LIMIT
+    assert hashes(found) == hashes(UadiaBlockchainSecretManager(
+        client=FakeLedgerClient(history(230))
+    ).find_self_transfers(WALLET, max_pages=2))
+
+
+def test_retried_page_is_not_lost():
+    manager = UadiaBlockchainSecretManager(
+        client=FakeLedgerClient(history(230), fail_pages=[3]), retry_backoff=0
+    )
+    assert len(manager.find_self_transfers(WALLET)) == 230
+
+
+def test_empty_page_stops_paging():
+    ledger = PagedLedger(history(230), short_page=3, short_size=0)
+    manager = UadiaBlockchainSecretManager(client=ledger)
+
+    assert len(manager.find_self_transfers(WALLET, concurrent=False)) == PAGE_LIMIT
+    assert ledger.pages == [1, 2, 3]
+
+    ledger.pages.clear()
+    assert len(manager.find_self_transfers(WALLET, concurrent=True)) == PAGE_LIMIT
+
+
+def test_short_page_stops_paging():
+    ledger = PagedLedger(history(230), short_page=2, short_size=10)
+    manager = UadiaBlockchainSecretManager(client=ledger)
+
+    serial = manager.find_self_transfers(WALLET, concurrent=False)
+    assert ledger.pages == [1, 2]
+    assert len(serial) == PAGE_LIMIT // 2 + 5
+
+    concurrent = manager.find_self_transfers(WALLET, concurrent=True)
+    assert hashes(concurrent) == hashes(serial)
@@ -0,0 +1,111 @@
+import os
+
+from cryptography.fernet import Fernet
+
+from APIonCosm import UaiaSecretManager
+from fake_chain import FakeLedgerClient, make_tx
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+from uadia_memo import encode_memo, encode_memo_chunks
+from uadia_tx_log import TransactionLog
+
+WALLET = "akash1restorewallet"
+KEY = Fernet.generate_key()
+
+
+def secret_history(count, start_height=1000):
+    return [
+        make_tx(start_height + i, WALLET, WALLET, encode_memo({"service": f"s{i}", "token": str(i)}, KEY))
+        for i in range(count)
+    ]
+
+
+def make_agent(tmp_path, history, **ledger_options):
+    manager = UadiaBlockchainSecretManager(
+        client=FakeLedgerClient(history, **ledger_options), retry_backoff=0
+    )
+    return UaiaSecretManager(
+        WALLET,
+        KEY,
+        checkpoint_path=str(tmp_path / "checkpoint.json"),
+        chain_manager=manager,
+        log_path=str(tmp_path / "tx.log")
+    )
+
+
+def write_log(tmp_path, entries, chunks=None):
+    with TransactionLog(WALLET, str(tmp_path / "tx.log")) as log:
+        for tx_hash, height, secret in entries:
+            log.append(tx_hash, 1000, height, secret, chunks)
+
+
+def test_fetch_by_hash_reads_tx_body():
+    history = secret_history(3)
+    history.append(make_tx(1003, "akash1stranger", WALLET, "payment"))
+    manager = UadiaBlockchainSecretManager(client=FakeLedgerClient(history))
+
+    found = manager.fetch_transactions_by_hash(WALLET, [tx.hash for tx in history] + ["MISSING"])
+
+    assert [tx["height"] for tx in found] == [1002, 1001, 1000]
+    assert found[0]["memo"] == history[2].tx.body.memo
+    secrets = manager.decrypt_transactions(found, KEY)
+    assert {secret["data"]["service"] for secret in secrets} == {"s0", "s1", "s2"}
+
+
+def test_cold_start_with_partial_log_scans_full_history(tmp_path):
+    history = secret_history(30)
+    write_log(tmp_path, [(history[-1].hash, history[-1].height, "s29")])
+
+    restored = make_agent(tmp_path, history).restore_all_secrets()
+
+    assert set(restored) == {f"s{i}" for i in range(30)}
+
+
+def test_rpc_error_on_log_hash_does_not_advance_scan(tmp_path):
+    history = secret_history(30)
+    make_agent(tmp_path, history[:10]).restore_all_secrets()
+    write_log(tmp_path, [
+        (history[15].hash, None, None),
+        (history[-1].hash, history[-1].height, "s29"),
+    ])
+
+    agent = make_agent(tmp_path, history, fail_hashes=[history[15].hash])
+    assert agent.last_scanned_block == 1009
+    restored = agent.restore_all_secrets()
+
+    assert set(restored) == {f"s{i}" for i in range(30)}
+    assert agent.log_offset == 0
+
+
+def test_missing_log_hash_is_skipped(tmp_path):
+    history = secret_history(12)
+    make_agent(tmp_path, history[:10]).restore_all_secrets()
+    write_log(tmp_path, [
+        ("UNKNOWN", None, None),
+        (history[10].hash, history[10].height, "s10"),
+        (history[11].hash, history[11].height, "s11"),
+    ])
+
+    agent = make_agent(tmp_path, history)
+    assert agent.restore_from_log("unused") == 1011
+    assert agent.log_offset == os.path.getsize(tmp_path / "tx.log")
+    assert {"s10", "s11"} <= set(agent.secrets)
+
+    # Повторный запуск: известные версии из индекса не загружаются, хвост пуст
+    ledger = agent.chain_manager.client
+    calls = ledger.calls
+    assert agent.restore_from_log("unused") == 0
+    assert ledger.calls == calls
+
+
+def test_chunked_secret_restored_from_log(tmp_path):
+    secret = {"service": "tls_bundle", "cert": os.urandom(1000).hex()}
+    chunks = encode_memo_chunks(secret, KEY, max_length=256)
+    history = [make_tx(1000 + i, WALLET, WALLET, memo) for i, memo in enumerate(chunks)]
+    hashes = [tx.hash for tx in history]
+    write_log(tmp_path, [(hashes[-1], history[-1].height, "tls_bundle")], chunks=hashes)
+
+    agent = make_agent(tmp_path, history)
+    agent.restore_from_log("unused")
+
+    assert agent.secrets["tls_bundle"]["data"] == secret
+    assert agent.log_offset == os.path.getsize(tmp_path / "tx.log")
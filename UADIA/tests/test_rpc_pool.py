@@ -0,0 +1,117 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from uadia_rpc_pool import PooledLedgerClient, RpcEndpointPool
+
+
+class FakeNode:
+    """Нода с задержкой, считающая вызовы каждого метода."""
+
+    def __init__(self, latency=0.0, fail_broadcast=False, fail_reads=False):
+        self.latency = latency
+        self.fail_broadcast = fail_broadcast
+        self.fail_reads = fail_reads
+        self.network_config = SimpleNamespace(chain_id="akashnet-2")
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _tick(self, method):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        time.sleep(self.latency)
+
+    def query_height(self):
+        self._tick("query_height")
+        if self.fail_reads:
+            raise ConnectionError("node unavailable")
+        return 100
+
+    def broadcast_tx(self, tx):
+        self._tick("broadcast_tx")
+        if self.fail_broadcast:
+            raise RuntimeError("node unavailable")
+        return f"submitted-{tx}"
+
+
+def make_client(*nodes, default_hedge_delay=0.01):
+    pool = RpcEndpointPool(
+        {f"node-{i}": node for i, node in enumerate(nodes)},
+        default_hedge_delay=default_hedge_delay
+    )
+    return PooledLedgerClient(pool)
+
+
+def test_slow_reads_are_hedged():
+    slow, fast = FakeNode(latency=0.2), FakeNode(latency=0.2)
+    client = make_client(slow, fast)
+
+    assert client.query_height() == 100
+    assert slow.calls["query_height"] + fast.calls["query_height"] == 2
+
+
+def test_writes_go_to_one_node_once():
+    nodes = [FakeNode(latency=0.2), FakeNode(latency=0.2)]
+    client = make_client(*nodes)
+
+    assert client.broadcast_tx("tx1") == "submitted-tx1"
+    assert sum(node.calls.get("broadcast_tx", 0) for node in nodes) == 1
+    assert client.network_config.chain_id == "akashnet-2"
+
+
+def test_failed_write_is_not_retried_elsewhere():
+    nodes = [FakeNode(fail_broadcast=True), FakeNode(fail_broadcast=True)]
+    client = make_client(*nodes)
+
+    with pytest.raises(RuntimeError):
+        client.broadcast_tx("tx1")
+    assert sum(node.calls.get("broadcast_tx", 0) for node in nodes) == 1
+
+
+def test_reads_move_off_a_failing_node():
+    broken, healthy = FakeNode(fail_reads=True), FakeNode()
+    client = make_client(broken, healthy)
+
+    for _ in range(10):
+        assert client.query_height() == 100
+
+    # Ошибка первого запроса переводит его на здоровую ноду, дальше
+    # оценка сломанной ноды не дает ей получать запросы
+    assert broken.calls["query_height"] == 1
+    assert healthy.calls["query_height"] == 10
+    assert client.pool.best_endpoint() == "node-1"
+
+
+def test_reads_prefer_the_faster_node():
+    slow, fast = FakeNode(latency=0.05), FakeNode(latency=0.001)
+    client = make_client(slow, fast, default_hedge_delay=1.0)
+    client.pool.probe()
+
+    for _ in range(10):
+        client.query_height()
+
+    assert slow.calls["query_height"] == 1
+    assert fast.calls["query_height"] == 11
+
+
+def test_hedge_fires_only_above_p95():
+    primary, backup = FakeNode(latency=0.02), FakeNode(latency=0.05)
+    client = make_client(primary, backup, default_hedge_delay=1.0)
+    for _ in range(5):
+        client.pool.probe()
+    assert client.pool.best_endpoint() == "node-0"
+    threshold = client.pool.stats["node-0"].percentile(0.95)
+    assert threshold >= 0.02
+
+    primary.latency = 0.005
+    client.query_height()
+    assert backup.calls["query_height"] == 5
+
+    primary.latency = threshold + 0.3
+    started = time.perf_counter()
+    client.query_height()
+    assert backup.calls["query_height"] == 6
+    # Ответ дубля приходит раньше, чем ответ медленной основной ноды
+    assert time.perf_counter() - started < primary.latency
@@ -0,0 +1,66 @@
+import re
+
+from fake_chain import FakeLedgerClient, make_tx
+from uadia_blockchain_secret_manager import UadiaBlockchainSecretManager
+
+WALLET = "akash1scanwallet"
+
+
+class RecordingLedger(FakeLedgerClient):
+    """Запоминает окна высот, которые запрашивал сканер."""
+
+    _WINDOW = re.compile(r"tx\.height>=(\d+) AND tx\.height<(\d+)")
+
+    def __init__(self, history, **options):
+        super().__init__(history, **options)
+        self.windows = []
+
+    def query_txs(self, query, page=1, limit=50, order_by="desc"):
+        window = self._WINDOW.search(query)
+        if window and page == 1:
+            self.windows.append((int(window.group(1)), int(window.group(2))))
+        return super().query_txs(query, page, limit, order_by)
+
+
+def history(count, start_height=1000):
+    return [make_tx(start_height + i, WALLET, WALLET, f"memo-{i}") for i in range(count)]
+
+
+def test_scan_honors_start_height():
+    ledger = RecordingLedger(history(300))
+    manager = UadiaBlockchainSecretManager(client=ledger, window_size=100)
+
+    found = manager.find_self_transfers(WALLET, start_height=1150)
+
+    assert [tx["height"] for tx in found] == list(range(1299, 1149, -1))
+    assert sorted(ledger.windows) == [(1150, 1250), (1250, 1300)]
+
+
+def test_overflowing_window_is_split_in_half():
+    ledger = RecordingLedger(history(300))
+    manager = UadiaBlockchainSecretManager(
+        client=ledger, window_size=1000, max_window_results=100
+    )
+
+    found = manager.find_self_transfers(WALLET, start_height=1000)
+
+    assert [tx["height"] for tx in found] == list(range(1299, 999, -1))
+    # [1000, 1300) -> 150 + 150 -> четыре окна по 75 транзакций
+    assert sorted(ledger.windows) == [
+        (1000, 1075), (1000, 1150), (1000, 1300), (1075, 1150),
+        (1150, 1225), (1150, 1300), (1225, 1300),
+    ]
+
+
+def test_failed_window_does_not_advance_scan():
+    ledger = RecordingLedger(history(300), fail_pages=[1])
+    manager = UadiaBlockchainSecretManager(client=ledger, window_size=100, page_retries=0)
+
+    found, next_height = manager.scan_new_blocks(WALLET, 1000)
+
+    assert next_height == 1000
+    assert len(found) == 200
+
+    found, next_height = manager.scan_new_blocks(WALLET, 1000)
+    assert next_height == 1300
+    assert len(found) == 300
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from cryptography.fernet import Fernet
+
+from uadia_secret_resolver import EncryptedDiskTier, MemoryTier, SecretResolver
+
+KEY = Fernet.generate_key()
+
+
+class SourceTier:
+    """Медленный уровень только для чтения (как Vault или сеть)."""
+
+    writable = False
+
+    def __init__(self, name, secrets, ttl=300.0, delay=0.0, fail=False):
+        self.name = name
+        self.secrets = secrets
+        self.ttl = ttl
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def get(self, service):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("tier is down")
+        return self.secrets.get(service)
+
+    def invalidate(self, service=None):
+        pass
+
+
+@pytest.fixture
+def chain():
+    return SourceTier("chain", {"db": {"password": "s3cret"}})
+
+
+def test_reads_through_tiers_and_writes_back(tmp_path, chain):
+    resolver = SecretResolver([MemoryTier(), EncryptedDiskTier(str(tmp_path), KEY), chain])
+
+    assert resolver.get("db") == {"password": "s3cret"}
+    assert resolver.get("db") == {"password": "s3cret"}
+    assert chain.calls == 1
+
+    stats = resolver.stats()
+    assert (stats["memory"]["hits"], stats["memory"]["misses"]) == (1, 1)
+    assert (stats["disk"]["hits"], stats["disk"]["misses"]) == (0, 1)
+    assert (stats["chain"]["hits"], stats["chain"]["misses"]) == (1, 0)
+
+    # После перезапуска (новая память) секрет берется с диска, а не из сети
+    restarted = SecretResolver([MemoryTier(), EncryptedDiskTier(str(tmp_path), KEY), chain])
+    assert restarted.get("db") == {"password": "s3cret"}
+    assert chain.calls == 1
+    assert restarted.stats()["disk"]["hits"] == 1
+
+
+def test_unknown_service_misses_every_tier(tmp_path, chain):
+    resolver = SecretResolver([MemoryTier(), EncryptedDiskTier(str(tmp_path), KEY), chain])
+
+    assert resolver.get("missing") is None
+    assert all(tier["misses"] >= 1 for tier in resolver.stats().values())
+
+
+def test_memory_tier_returns_a_copy():
+    tier = MemoryTier()
+    data = {"password": "s3cret", "scopes": ["read"]}
+    tier.put("db", data)
+    data["scopes"].append("admin")
+
+    first = tier.get("db")
+    first["scopes"].append("write")
+
+    assert tier.get("db") == {"password": "s3cret", "scopes": ["read"]}
+
+
+def test_each_tier_expires_by_its_own_ttl(tmp_path, chain):
+    memory = MemoryTier(ttl=0)
+    disk = EncryptedDiskTier(str(tmp_path), KEY, ttl=60)
+    resolver = SecretResolver([memory, disk, chain])
+
+    resolver.get("db")
+    resolver.get("db")
+
+    # Память истекает сразу, диск еще свеж - сеть опрошена один раз
+    assert memory.get("db") is None
+    assert chain.calls == 1
+    assert resolver.stats()["disk"]["hits"] == 1
+
+    disk.ttl = 0
+    resolver.get("db")
+    assert chain.calls == 2
+
+
+def test_failing_tier_is_counted_and_skipped(chain):
+    down = SourceTier("vault", {}, delay=0.01, fail=True)
+    resolver = SecretResolver([MemoryTier(), down, chain])
+
+    assert resolver.get("db") == {"password": "s3cret"}
+
+    stats = resolver.stats()
+    assert stats["vault"]["errors"] == 1
+    assert stats["vault"]["avg_ms"] >= 10
+    assert stats["chain"]["ttl"] == 300.0
@@ -0,0 +1,144 @@
+import io
+import os
+
+import pytest
+
+from sss import UaiaShamirSecretManager
+from uadia_gf256 import combine_stream, split_stream
+
+SEED = "abandon ability able about above absent absorb abstract absurd abuse access accident"
+
+# Доли 2 из 3, созданные secretsharing 0.2.6 (SecretSharer.split_secret от hex сид-фразы)
+LEGACY_SHARES = {
+    "architect": (
+        "1-2f82fbd57eae5f57e3eac168b5c5130322935e1736873c770e6031040f84e44cc07a16ca3f6432d9"
+        "46a5366bd37554954953785c1663b55142556215a43319a23033cf5222379e4f8f6f3042d7cda37039"
+        "721d1fb0f881b0d8149c8f660a94e6eb6fcefc3ef502a73f457fa3983913bd9d2269130a59e40a20cf"
+        "26c1fc996190726028fb6d2cb65dc9688cdc5468230824daa6b2f51468769fff43a40b9ed57"
+    ),
+    "security": (
+        "3-8e88f3807c0b1e07abc0443a214f390967ba1a45a395b5652b20930c2e8eace6416e445ebe2c988b"
+        "d3efa3437a5ffdbfdbfa6914432b1ff3c7002640ec994ce6909b6df666a6daeeae4d90bc5b1cbc841e"
+        "689352e69c578559aeb1a205d23210b6231f060e5afbc96fe1b246bc7eeccc2998b72cf2bf3e301629"
+        "6819a75d96652ab1f6e61b37b46b0fb59a68ae89fc74626387ac30ced557b3915dbf962eb1d"
+    ),
+}
+
+
+def test_recovers_legacy_secretsharing_shares():
+    assert UaiaShamirSecretManager(k=2, n=3).recover_master_seed(LEGACY_SHARES) == SEED
+
+
+def test_split_and_recover_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = UaiaShamirSecretManager(k=3, n=5)
+    shares = manager.split_master_seed(SEED, ["a", "b", "c", "d", "e"])
+
+    quorum = {name: shares[name] for name in ("e", "b", "d")}
+    assert manager.recover_master_seed(quorum) == SEED
+
+
+def test_mixed_share_formats_are_rejected():
+    with pytest.raises(ValueError):
+        UaiaShamirSecretManager._combine_shares(["gf-1-00", LEGACY_SHARES["architect"]])
+
+
+SHARES = {"architect": "gf-1-aa", "infra": "gf-2-bb", "security": "gf-3-cc"}
+PASSWORDS = {"architect": "pw-architect", "infra": "pw-infra", "security": "pw-security"}
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_batch_packages_match_single_agent_packages(use_processes):
+    manager = UaiaShamirSecretManager(k=2, n=3)
+
+    batch = manager.create_agent_key_packages(SHARES, PASSWORDS, use_processes=use_processes)
+    opened = manager.decrypt_agent_packages(batch, PASSWORDS, use_processes=use_processes)
+
+    for agent, share in SHARES.items():
+        single = manager.create_agent_key_package(agent, share, PASSWORDS[agent])
+        assert {k: v for k, v in batch[agent].items() if k != "data"} == {
+            k: v for k, v in single.items() if k != "data"
+        }
+        expected = manager.decrypt_agent_package(single, PASSWORDS[agent])
+        assert manager.decrypt_agent_package(batch[agent], PASSWORDS[agent]) == expected
+        assert opened[agent] == expected
+
+
+def test_agent_without_password_does_not_fail_the_batch():
+    manager = UaiaShamirSecretManager(k=2, n=3)
+    passwords = {agent: PASSWORDS[agent] for agent in ("architect", "security")}
+
+    packages = manager.create_agent_key_packages(SHARES, passwords)
+    assert set(packages) == {"architect", "security"}
+
+    packages["infra"] = manager.create_agent_key_package("infra", SHARES["infra"], PASSWORDS["infra"])
+    packages["broken"] = {"agent": "broken", "data": "", "salt": "!"}
+    opened = manager.decrypt_agent_packages(packages, {**passwords, "broken": "pw"})
+
+    assert set(opened) == {"architect", "security"}
+    assert opened["security"]["share"] == SHARES["security"]
+
+
+def split_blob(manager, blob, agents, chunk_size=64):
+    outputs = {agent: io.BytesIO() for agent in agents}
+    assert manager.split_blob(io.BytesIO(blob), outputs, chunk_size) == len(blob)
+    return {agent: out.getvalue() for agent, out in outputs.items()}
+
+
+def combine_blob(manager, shares, chunk_size=64):
+    output = io.BytesIO()
+    inputs = {agent: io.BytesIO(share) for agent, share in shares.items()}
+    assert manager.combine_blob(inputs, output, chunk_size) == len(output.getvalue())
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("size", [0, 1, 63, 64, 128, 64 * 3 + 1])
+def test_blob_roundtrip_across_chunk_boundaries(size):
+    manager = UaiaShamirSecretManager(k=3, n=5)
+    blob = os.urandom(size)
+    shares = split_blob(manager, blob, ["a", "b", "c", "d", "e"])
+
+    quorum = {agent: shares[agent] for agent in ("e", "a", "c")}
+    # Другой размер куска при сборке не влияет на результат
+    assert combine_blob(manager, quorum, chunk_size=50) == blob
+
+
+def test_stream_roundtrip_from_bytes_buffer():
+    blob = os.urandom(1000)
+    outputs = [io.BytesIO() for _ in range(3)]
+    assert split_stream(blob, outputs, 2, chunk_size=128) == 1000
+
+    restored = io.BytesIO()
+    inputs = [io.BytesIO(outputs[2].getvalue()), io.BytesIO(outputs[0].getvalue())]
+    assert combine_stream(inputs, restored, chunk_size=100) == 1000
+    assert restored.getvalue() == blob
+
+
+def test_blob_needs_threshold_shares():
+    manager = UaiaShamirSecretManager(k=3, n=5)
+    shares = split_blob(manager, os.urandom(200), ["a", "b", "c", "d", "e"])
+
+    with pytest.raises(ValueError, match="Недостаточно долей"):
+        combine_blob(manager, {agent: shares[agent] for agent in ("a", "b")})
+
+
+def test_tampered_and_mismatched_shares():
+    manager = UaiaShamirSecretManager(k=2, n=3)
+    blob = os.urandom(200)
+    shares = split_blob(manager, blob, ["a", "b", "c"])
+
+    # Shamir не проверяет целостность: испорченный байт дает другой результат
+    tampered = bytearray(shares["b"])
+    tampered[-1] ^= 0xFF
+    restored = combine_blob(manager, {"a": shares["a"], "b": bytes(tampered)})
+    assert restored != blob and restored[:-1] == blob[:-1]
+
+    with pytest.raises(ValueError, match="разную длину"):
+        combine_blob(manager, {"a": shares["a"], "b": shares["b"][:-1]})
+
+    other = split_blob(UaiaShamirSecretManager(k=3, n=3), blob, ["a", "b", "c"])
+    with pytest.raises(ValueError, match="разным схемам"):
+        combine_blob(manager, {"a": shares["a"], "b": other["b"]})
+
+    with pytest.raises(ValueError, match="не является долей"):
+        combine_blob(manager, {"a": shares["a"], "b": b"not a share"})
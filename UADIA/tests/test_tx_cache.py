@@ -0,0 +1,37 @@
+from fake_chain import FakeLedgerClient, make_history
+from uadia_blockchain_secret_manager import PAGE_LIMIT, UadiaBlockchainSecretManager
+from uadia_tx_cache import UadiaTxCache
+
+WALLET = "akash1cachewallet"
+
+
+def test_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = UadiaBlockchainSecretManager(client=FakeLedgerClient([]))
+    assert manager._tx_cache is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_separates_chains(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    mainnet = UadiaTxCache(path, "akashnet-2")
+    testnet = UadiaTxCache(path, "sandbox-01")
+    txs = [{"hash": "A", "height": 10, "amount": "1", "memo": "m"}]
+    mainnet.put_many(WALLET, txs)
+    mainnet.set_sync_state(WALLET, 0, 11)
+
+    assert [tx["hash"] for tx in mainnet.load(WALLET)] == ["A"]
+    assert testnet.load(WALLET) == []
+    assert testnet.sync_state(WALLET) is None
+
+
+def test_cached_history_respects_max_pages(tmp_path):
+    history = make_history(WALLET, 3 * PAGE_LIMIT)
+    manager = UadiaBlockchainSecretManager(
+        client=FakeLedgerClient(history), cache_path=str(tmp_path / "cache.sqlite")
+    )
+    assert len(manager.find_self_transfers(WALLET, max_pages=10)) == 3 * PAGE_LIMIT
+
+    cached = manager.find_self_transfers(WALLET, max_pages=1)
+    assert len(cached) == PAGE_LIMIT
+    assert cached[0]["height"] == history[-1].height
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+
+import uadia_tx_log
+from uadia_tx_log import FSYNC_INTERVAL, TransactionLog, open_transaction_log
+
+WALLET = "akash1txlogwallet"
+
+
+def test_failed_batch_is_not_written_by_next_leader(tmp_path):
+    log = TransactionLog(WALLET, str(tmp_path / "tx.wal"))
+    write_batch = log._write_batch
+    release = threading.Event()
+    calls = []
+
+    def gated(batch):
+        calls.append([record["tx"] for record, _, _ in batch])
+        if len(calls) == 1:
+            # Первая пачка держится, пока остальные записи не встанут в очередь
+            assert release.wait(5)
+        elif len(calls) == 2:
+            raise OSError("disk full")
+        write_batch(batch)
+
+    log._write_batch = gated
+    results = {}
+
+    def append(tx_hash):
+        try:
+            log.append(tx_hash, 1000)
+            results[tx_hash] = True
+        except OSError:
+            results[tx_hash] = False
+
+    threads = [threading.Thread(target=append, args=(f"TX{i}",)) for i in range(5)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    while True:
+        with log._cond:
+            if log._appended == 5:
+                break
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    log.append("AFTER", 1000)
+    log.close()
+
+    written = [record["tx"] for record in log.records()]
+    assert calls[0] == ["TX0"]
+    assert sorted(calls[1]) == ["TX1", "TX2", "TX3", "TX4"]
+    assert results == {"TX0": True, "TX1": False, "TX2": False, "TX3": False, "TX4": False}
+    assert written == ["TX0", "AFTER"]
+
+
+def test_interval_log_is_synced_on_exit(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(uadia_tx_log.os, "fsync", lambda fd: synced.append(fd))
+    log = open_transaction_log(
+        WALLET, str(tmp_path / "tx.wal"), fsync=FSYNC_INTERVAL, fsync_interval=3600
+    )
+
+    fd = log._fd
+    log.append("TX1", 1000)
+    assert fd not in synced
+
+    uadia_tx_log._close_open_logs()
+    assert synced.count(fd) == 1
+    assert os.path.exists(log.index_path)
+
+
+def test_records_from_reads_only_the_tail(tmp_path):
+    with TransactionLog(WALLET, str(tmp_path / "tx.wal")) as log:
+        log.append("TX1", 1000)
+        records, offset = log.records_from(0)
+        log.append("TX2", 1000, 10, "db")
+
+        assert [record["tx"] for record in records] == ["TX1"]
+        assert [record["tx"] for record in log.records_from(offset)[0]] == ["TX2"]
+        # Смещение внутри строки сдвигается к следующей, за концом файла - в начало
+        assert [record["tx"] for record in log.records_from(offset - 3)[0]] == ["TX2"]
+        assert len(log.records_from(10 ** 6)[0]) == 2
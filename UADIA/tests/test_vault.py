@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from hvac.exceptions import InvalidPath
+
+from fake_vault import FakeVaultServer
+from uadia_vault import UadiaVault
+
+
+@pytest.fixture
+def server():
+    with FakeVaultServer(token_ttl=1) as server:
+        yield server
+
+
+@pytest.fixture
+def vault(server):
+    vault = UadiaVault(server.url, token="root", cache_ttl=60)
+    yield vault
+    vault.close()
+
+
+def test_read_returns_a_copy(server, vault):
+    server.put("uaia/agents/architect", {"token": "abc", "scopes": ["read"]})
+
+    first = vault.read("uaia/agents/architect")
+    first["token"] = "changed"
+    first["scopes"].append("write")
+
+    assert vault.read("uaia/agents/architect") == {"token": "abc", "scopes": ["read"]}
+    assert server.requests["read"] == 1
+    assert vault.stats()["hits"] == 1
+
+
+def test_stale_entry_is_revalidated_by_version(server, vault):
+    server.put("uaia/agents/infra", {"token": "v1"})
+    vault.cache_ttl = 0
+
+    assert vault.read("uaia/agents/infra") == {"token": "v1"}
+    assert vault.read("uaia/agents/infra") == {"token": "v1"}
+    assert (server.requests["read"], server.requests["metadata"]) == (1, 1)
+
+    server.put("uaia/agents/infra", {"token": "v2"})
+    assert vault.read("uaia/agents/infra") == {"token": "v2"}
+    assert server.requests["read"] == 2
+
+
+def test_read_many_reports_missing_paths(server, vault):
+    paths = [f"uaia/agents/a{i}" for i in range(20)]
+    for path in paths:
+        server.put(path, {"name": path})
+
+    found = vault.read_many(paths + ["uaia/agents/missing"])
+
+    assert all(found[path] == {"name": path} for path in paths)
+    assert found["uaia/agents/missing"] is None
+    with pytest.raises(InvalidPath):
+        vault.read("uaia/agents/missing")
+
+
+def test_write_updates_cache(server, vault):
+    assert vault.write("uaia/agents/deploy", {"key": "k1"}) == 1
+    assert vault.read("uaia/agents/deploy") == {"key": "k1"}
+    assert server.requests["read"] == 0
+
+
+def test_token_and_leases_are_renewed():
+    with FakeVaultServer(token_ttl=1, lease_duration=1) as server:
+        vault = UadiaVault(server.url, token="root", renew_fraction=0.1)
+        try:
+            vault.start_renewal()
+            vault.register_lease("database/creds/uaia/1", 1)
+            time.sleep(0.5)
+        finally:
+            vault.close()
+
+    assert server.requests["renew_self"] >= 2
+    assert server.requests["renew_lease"] >= 2
+    assert vault.stats()["leases"] == 1
@@ -0,0 +1,269 @@
+"""
+Слой доступа к HashiCorp Vault для агентов УАДИА.
+
+В отличие от client_vault.py (новый hvac.Client и чтение на каждый
+запрос) здесь:
+- одна requests.Session с пулом соединений на все потоки;
+- кэш KV v2 с учетом версий: пока запись свежая, значение отдается из
+  памяти; после TTL проверяется только current_version в метаданных, и
+  данные перечитываются, лишь если версия изменилась;
+- пакетное чтение многих путей параллельно через общий пул;
+- фоновое продление токена и аренд (leases) динамических секретов.
+"""
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import hvac
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class UadiaVault:
+    """
+    Кэширующий клиент KV v2.
+
+    Args:
+        url: Адрес сервера Vault
+        token: Токен Vault
+        mount_point: Точка монтирования KV v2
+        pool_size: Размер пула соединений и потоков пакетного чтения
+        cache_ttl: Сколько секунд значение отдается без обращения к Vault
+        renew_fraction: Доля TTL токена/аренды, после которой они продлеваются
+        timeout: Таймаут HTTP-запроса (сек)
+        client: Готовый hvac.Client (например, с AppRole-аутентификацией)
+
+    Example:
+        >>> with UadiaVault("http://127.0.0.1:8200", token="...") as vault:
+        ...     secrets = vault.read_many(["uaia/agents/architect", "uaia/agents/infra"])
+    """
+
+    def __init__(
+        self,
+        url: str = "http://127.0.0.1:8200",
+        token: Optional[str] = None,
+        mount_point: str = "secret",
+        pool_size: int = 16,
+        cache_ttl: float = 30.0,
+        renew_fraction: float = 0.5,
+        timeout: float = 10.0,
+        client: Optional[hvac.Client] = None
+    ):
+        if client is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            client = hvac.Client(url=url, token=token, session=session, timeout=timeout)
+        self.client = client
+        self.mount_point = mount_point
+        self.cache_ttl = cache_ttl
+        self.renew_fraction = renew_fraction
+
+        # {путь: {"data", "version", "checked_at"}}
+        self._cache: Dict[str, Dict] = {}
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+        self.counters = {"hits": 0, "revalidated": 0, "fetched": 0, "renewals": 0, "errors": 0}
+
+        # Фоновое продление: {lease_id: следующее продление}, токен - отдельно
+        self._leases: Dict[str, float] = {}
+        self._token_renew_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+
+    # === Чтение и запись ===
+
+    def read(self, path: str) -> Dict:
+        """
+        Возвращает данные секрета (последняя версия) через кэш.
+        Отдается копия: изменения вызывающего не попадают в кэш.
+
+        Raises:
+            hvac.exceptions.InvalidPath: секрета нет
+        """
+        entry = self._fresh_entry(path)
+        if entry is not None:
+            self._count("hits")
+            return copy.deepcopy(entry["data"])
+
+        with self._path_lock(path):
+            # Пока ждали, значение мог обновить другой поток
+            entry = self._fresh_entry(path)
+            if entry is not None:
+                self._count("hits")
+                return copy.deepcopy(entry["data"])
+
+            with self._lock:
+                entry = self._cache.get(path)
+            if entry is not None:
+                # Запись устарела - сравниваем только номер версии
+                metadata = self.client.secrets.kv.v2.read_secret_metadata(
+                    path=path, mount_point=self.mount_point
+                )
+                if metadata["data"]["current_version"] == entry["version"]:
+                    with self._lock:
+                        entry["checked_at"] = time.monotonic()
+                    self._count("revalidated")
+                    return copy.deepcopy(entry["data"])
+
+            response = self.client.secrets.kv.v2.read_secret_version(
+                path=path, mount_point=self.mount_point, raise_on_deleted_version=True
+            )
+            self._count("fetched")
+            data = response["data"]["data"]
+            self._store(path, data, response["data"]["metadata"]["version"])
+            return copy.deepcopy(data)
+
+    def read_many(self, paths: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Читает много путей параллельно через общий пул соединений.
+
+        Returns:
+            {путь: данные}; None, если путь прочитать не удалось
+        """
+        paths = list(paths)
+
+        def safe_read(path: str) -> Optional[Dict]:
+            try:
+                return self.read(path)
+            except Exception as e:
+                self._count("errors")
+                print(f"❌ Vault: не удалось прочитать {path}: {e}")
+                return None
+
+        return dict(zip(paths, self._executor.map(safe_read, paths)))
+
+    def write(self, path: str, data: Dict, cas: Optional[int] = None) -> int:
+        """Записывает секрет и сразу кладет новую версию в кэш. Возвращает версию."""
+        response = self.client.secrets.kv.v2.create_or_update_secret(
+            path=path, secret=data, cas=cas, mount_point=self.mount_point
+        )
+        version = response["data"]["version"]
+        self._store(path, copy.deepcopy(data), version)
+        return version
+
+    def invalidate(self, path: Optional[str] = None):
+        """Сбрасывает кэш пути (или весь кэш)."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self.counters, "cached": len(self._cache), "leases": len(self._leases)}
+
+    def _fresh_entry(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None and time.monotonic() - entry["checked_at"] < self.cache_ttl:
+                return entry
+        return None
+
+    def _store(self, path: str, data: Dict, version: int):
+        with self._lock:
+            self._cache[path] = {"data": data, "version": version, "checked_at": time.monotonic()}
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            return self._path_locks.setdefault(path, threading.Lock())
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    # === Продление токена и аренд ===
+
+    def register_lease(self, lease_id: str, lease_duration: float):
+        """Добавляет аренду динамического секрета (например, учетки БД) в продление."""
+        with self._lock:
+            self._leases[lease_id] = time.monotonic() + lease_duration * self.renew_fraction
+        self._wakeup.set()
+
+    def release_lease(self, lease_id: str):
+        with self._lock:
+            self._leases.pop(lease_id, None)
+
+    def start_renewal(self):
+        """Запускает фоновый поток продления токена и аренд."""
+        if self._renewer is not None:
+            return
+        ttl = self.client.auth.token.lookup_self()["data"].get("ttl") or 0
+        # ttl == 0 - бессрочный токен (например, root), продлевать нечего
+        if ttl:
+            with self._lock:
+                self._token_renew_at = time.monotonic() + ttl * self.renew_fraction
+        self._stop.clear()
+        self._renewer = threading.Thread(target=self._renew_loop, name="uaia-vault-renew", daemon=True)
+        self._renewer.start()
+
+    def _renew_loop(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due_leases = [lease for lease, at in self._leases.items() if at <= now]
+                deadlines = list(self._leases.values())
+                token_renew_at = self._token_renew_at
+            token_due = token_renew_at is not None and token_renew_at <= now
+            if token_renew_at is not None:
+                deadlines.append(token_renew_at)
+
+            if token_due:
+                self._renew_token()
+            for lease_id in due_leases:
+                self._renew_lease(lease_id)
+
+            if due_leases or token_due:
+                continue
+            timeout = max(0.0, min(deadlines) - now) if deadlines else None
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    def _renew_token(self):
+        try:
+            response = self.client.auth.token.renew_self()
+            ttl = response["auth"]["lease_duration"]
+            with self._lock:
+                self._token_renew_at = time.monotonic() + ttl * self.renew_fraction if ttl else None
+            self._count("renewals")
+        except Exception as e:
+            self._count("errors")
+            print(f"❌ Vault: не удалось продлить токен: {e}")
+            # Повторяем через короткую паузу, пока токен еще жив
+            with self._lock:
+                self._token_renew_at = time.monotonic() + 5.0
+
+    def _renew_lease(self, lease_id: str):
+        try:
+            response = self.client.sys.renew_lease(lease_id=lease_id)
+            duration = response["lease_duration"]
+            with self._lock:
+                if lease_id in self._leases:
+                    self._leases[lease_id] = time.monotonic() + duration * self.renew_fraction
+            self._count("renewals")
+        except Exception as e:
+            self._count("errors")
+            print(f"❌ Vault: не удалось продлить аренду {lease_id}: {e}")
+            # Аренда истекла или отозвана - больше не продлеваем
+            self.release_lease(lease_id)
+
+    def close(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._renewer is not None:
+            self._renewer.join(timeout=5)
+            self._renewer = None
+        self._executor.shutdown(wait=False)
+        self.client.adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()